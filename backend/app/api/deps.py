@@ -1,6 +1,10 @@
 """FastAPI dependency factories."""
+import secrets
 from functools import lru_cache
 
+from fastapi import Header, HTTPException
+
+from app.core.settings import get_settings
 from app.services.chat import ChatService
 from app.services.ingestion import IngestionService
 
@@ -13,3 +17,16 @@ def get_chat_service() -> ChatService:
 @lru_cache
 def get_ingestion_service() -> IngestionService:
     return IngestionService()
+
+
+def is_admin_token(token: str | None) -> bool:
+    expected = get_settings().admin_token
+    return bool(expected and token and secrets.compare_digest(token.encode(), expected.encode()))
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    """Guard operator-only routes; they do not exist unless `ADMIN_TOKEN` is configured."""
+    if not get_settings().admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
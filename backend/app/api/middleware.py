@@ -0,0 +1,207 @@
+"""ASGI middleware shared by all routes."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.deps import is_admin_token
+from app.core.profiling import SamplingProfiler, profile_path
+from app.core.settings import get_settings
+from app.core.telemetry import HTTP_LATENCY, HTTP_REQUESTS, begin_request, end_request
+
+logger = logging.getLogger("app.requests")
+
+GZIP_LEVEL = 6
+# Low brotli quality keeps compression cheaper than gzip -6 while still producing smaller bodies.
+BROTLI_QUALITY = 4
+
+
+class TelemetryMiddleware:
+    """Attach a `Server-Timing` header, Prometheus request metrics and one structured log line per request."""
+
+    def __init__(self, app: ASGIApp, excluded_paths: tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = begin_request()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            elapsed_ms = timings.elapsed_ms()
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed_ms / 1000.0)
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request",
+                        "method": method,
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round(elapsed_ms, 1),
+                        "stages_ms": {stage: round(value, 1) for stage, value in timings.stages.items()},
+                    }
+                )
+            )
+
+
+class ProfilingMiddleware:
+    """Capture a sampling profile of a single request when an admin sends `X-Profile: 1`.
+
+    Samples cover every worker thread while the request is in flight (including
+    the model executor), so concurrent requests show up too; the file name is
+    returned in `X-Profile-File` and the profile is written once the body is sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if headers.get("x-profile", "").lower() not in {"1", "true"} or not is_admin_token(
+            headers.get("x-admin-token")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        path = profile_path("request", settings)
+        profiler = SamplingProfiler(interval=settings.profile_interval_ms / 1000.0)
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-file", path.name.encode())]}
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
+            await asyncio.to_thread(profiler.write, path)
+            logger.info("Wrote %d profile samples for %s to %s", profiler.sample_count, scope["path"], path)
+
+
+class CompressionMiddleware:
+    """Brotli/gzip response compression, negotiated from `Accept-Encoding`.
+
+    Single-body responses are compressed only past `minimum_size`; streamed
+    responses (NDJSON batches) are compressed incrementally and flushed per chunk
+    so clients still see results as they complete.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _StreamCompressor | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=list(start["headers"]))
+                skip = "content-encoding" in headers or not more_body and len(body) < self.minimum_size
+                if skip:
+                    await send(start)
+                    start = None  # pass the rest through untouched
+                    await send(message)
+                    return
+                compressor = _StreamCompressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                if not more_body:
+                    compressed = compressor.finish(body)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send({**start, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send({**start, "headers": headers.raw})
+            chunk = compressor.finish(body) if not more_body else compressor.flush(body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def flush(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_FINISH)
+
+
+def _negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick `br` over `gzip` among encodings the client accepts with q > 0."""
+    accepted: set[str] = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            return encoding
+    return None
@@ -0,0 +1,113 @@
+"""Lean JSON rendering and payload shaping for chat responses."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+from app.models.schemas import ChatResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Citation metadata kept at "standard" verbosity; "full" keeps everything (still size-capped).
+STANDARD_CITATION_KEYS = (
+    "doc_type",
+    "version",
+    "effective_date",
+    "chunk_index",
+    "section_path",
+    "page_start",
+    "page_end",
+    "also_in",
+)
+STANDARD_STRUCTURED_KEYS = ("summary", "severity", "fix", "monthly_price", "effective_date", "path_params")
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson, skipping pydantic serialization."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS, default=str)
+
+
+def shape_chat_response(
+    response: ChatResponse,
+    fields: Iterable[str] | None = None,
+    verbosity: str = "standard",
+    max_value_bytes: int = 2048,
+) -> dict[str, Any]:
+    """Project a `ChatResponse` onto the fields and detail level the client asked for.
+
+    - `minimal`: citations are `doc_id` + snippet, structured results are source/identifier/content.
+    - `standard`: adds a small whitelist of metadata keys.
+    - `full`: all metadata.
+
+    At every level, metadata values whose JSON exceeds `max_value_bytes` are
+    replaced by a truncation marker so one policy payload or OpenAPI tree cannot
+    dominate the response. `degraded` is always included when non-empty, whatever
+    `fields` asks for, so clients can tell a fallback answer from a full one.
+    """
+    wanted = set(fields) if fields else {"answer", "citations", "structured_results", "session_id"}
+    shaped: dict[str, Any] = {}
+    if "answer" in wanted:
+        shaped["answer"] = response.answer
+    if "citations" in wanted:
+        shaped["citations"] = [
+            {
+                "doc_id": citation.doc_id,
+                "snippet": citation.snippet,
+                **_metadata(citation.metadata, verbosity, STANDARD_CITATION_KEYS, max_value_bytes),
+            }
+            for citation in response.citations
+        ]
+    if "structured_results" in wanted:
+        shaped["structured_results"] = [
+            _structured(result, verbosity, max_value_bytes) for result in response.structured_results
+        ]
+    if "session_id" in wanted:
+        shaped["session_id"] = response.session_id
+    if response.degraded:
+        shaped["degraded"] = list(response.degraded)
+    return shaped
+
+
+def _structured(result: dict[str, Any], verbosity: str, max_value_bytes: int) -> dict[str, Any]:
+    core = {key: result.get(key) for key in ("source", "identifier", "content")}
+    if verbosity == "minimal":
+        return core
+    extra = {key: value for key, value in result.items() if key not in core}
+    keys = None if verbosity == "full" else STANDARD_STRUCTURED_KEYS
+    return {**core, **_cap({key: value for key, value in extra.items() if keys is None or key in keys}, max_value_bytes)}
+
+
+def _metadata(
+    metadata: dict[str, Any] | None,
+    verbosity: str,
+    standard_keys: tuple[str, ...],
+    max_value_bytes: int,
+) -> dict[str, Any]:
+    if not metadata or verbosity == "minimal":
+        return {}
+    if verbosity == "standard":
+        metadata = {key: metadata[key] for key in standard_keys if metadata.get(key) not in (None, [], {})}
+    return {"metadata": _cap(metadata, max_value_bytes)}
+
+
+def _cap(values: dict[str, Any], max_value_bytes: int) -> dict[str, Any]:
+    capped: dict[str, Any] = {}
+    for key, value in values.items():
+        if isinstance(value, str):
+            encoded = value.encode("utf-8")
+            # Cut on bytes, then drop any multi-byte character the cut split.
+            truncated = encoded[:max_value_bytes].decode("utf-8", "ignore") + "…"
+            capped[key] = value if len(encoded) <= max_value_bytes else truncated
+            continue
+        size = len(dumps(value))
+        capped[key] = value if size <= max_value_bytes else {"truncated": True, "size_bytes": size}
+    return capped
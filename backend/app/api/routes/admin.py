@@ -0,0 +1,65 @@
+"""Operator-only diagnostics: on-demand profiles and event-loop stalls."""
+from dataclasses import asdict
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.api.deps import require_admin
+from app.core.paths import PROFILE_DIR
+from app.core.profiling import get_loop_monitor, profile_for, profile_path
+from app.core.settings import get_settings
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+def _profile_dir() -> Path:
+    return get_settings().profile_dir or PROFILE_DIR
+
+
+@router.post("/profile", summary="Sample this worker for N seconds")
+async def capture_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float | None = Query(None, gt=0),
+) -> PlainTextResponse:
+    """Return the collapsed stacks of every thread sampled while the worker keeps serving traffic."""
+    settings = get_settings()
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(status_code=422, detail=f"seconds must be <= {settings.profile_max_seconds:g}")
+    interval = (interval_ms or settings.profile_interval_ms) / 1000.0
+    path = profile_path("worker", settings)
+    profiler = await profile_for(seconds, interval, path)
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"X-Profile-File": path.name, "X-Profile-Samples": str(profiler.sample_count)},
+    )
+
+
+@router.get("/profiles", summary="List captured profiles")
+async def list_profiles() -> list[dict]:
+    directory = _profile_dir()
+    if not directory.is_dir():
+        return []
+    files = sorted(directory.glob("*.collapsed"), key=lambda path: path.stat().st_mtime, reverse=True)
+    return [{"name": path.name, "size_bytes": path.stat().st_size} for path in files]
+
+
+@router.get("/profiles/{name}", summary="Download a captured profile")
+async def download_profile(name: str) -> FileResponse:
+    directory = _profile_dir()
+    path = directory / name
+    if path.suffix != ".collapsed" or path.parent != directory or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@router.get("/loop-lag", summary="Recent event-loop stalls")
+async def loop_lag() -> dict:
+    monitor = get_loop_monitor()
+    if monitor is None:
+        return {"enabled": False, "stalls": []}
+    return {
+        "enabled": True,
+        "threshold_ms": monitor.threshold * 1000.0,
+        "stalls": [asdict(stall) for stall in reversed(monitor.stalls)],
+    }
@@ -1,14 +1,74 @@
 """Chat inference routes."""
-from fastapi import APIRouter, Depends
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_chat_service
-from app.models.schemas import ChatRequest, ChatResponse
+from app.api.responses import OrjsonResponse, dumps, shape_chat_response
+from app.core.admission import AdmissionRejected
+from app.models.schemas import ChatBatchRequest, ChatRequest, ChatResponse, ShapedChatResponse
 from app.services.chat import ChatService
+from app.services.sessions import SessionNotFound
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-@router.post("", response_model=ChatResponse, summary="Run hybrid RAG chat pipeline")
-async def chat_endpoint(payload: ChatRequest, service: ChatService = Depends(get_chat_service)) -> ChatResponse:
-    """Execute the hybrid retrieval + generation pipeline for a user query."""
-    return await service.answer(payload)
+@router.post(
+    "",
+    response_model=None,
+    responses={200: {"model": ShapedChatResponse, "description": "The answer, shaped by `fields` and `verbosity`"}},
+    summary="Run hybrid RAG chat pipeline",
+)
+async def chat_endpoint(payload: ChatRequest, service: ChatService = Depends(get_chat_service)) -> OrjsonResponse:
+    """Execute the hybrid retrieval + generation pipeline for a user query.
+
+    The body is shaped by `fields`/`verbosity` and rendered with orjson; keys left
+    out by `fields` are omitted rather than returned as null.
+    """
+    response = await service.answer(payload)
+    return OrjsonResponse(_shape(response, payload, service))
+
+
+@router.post("/batch", summary="Answer many questions, streaming NDJSON results as they complete")
+async def chat_batch_endpoint(
+    payload: ChatBatchRequest, service: ChatService = Depends(get_chat_service)
+) -> StreamingResponse:
+    """Run a batch through shared embedding/retrieval; each line is a `ChatBatchItem` (shaped per request)."""
+    limit = service.settings.batch_max_questions
+    if len(payload.requests) > limit:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {limit} questions")
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for index, result in service.answer_many(payload.requests):
+            if isinstance(result, Exception):
+                item = {"index": index, "response": None, "error": _batch_error(index, result)}
+            else:
+                item = {"index": index, "response": _shape(result, payload.requests[index], service), "error": None}
+            yield dumps(item) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _batch_error(index: int, exc: Exception) -> str:
+    """Stable error code for a failed batch item; details stay in the server log, not the response."""
+    if isinstance(exc, SessionNotFound):
+        return "session_not_found"
+    if isinstance(exc, AdmissionRejected):
+        logger.warning("Batch request %d shed: %s", index, exc)
+        return "overloaded"
+    logger.error("Batch request %d failed", index, exc_info=exc)
+    return "internal_error"
+
+
+def _shape(response: ChatResponse, request: ChatRequest, service: ChatService) -> dict[str, Any]:
+    return shape_chat_response(
+        response,
+        fields=request.fields,
+        verbosity=request.verbosity,
+        max_value_bytes=service.settings.response_max_value_bytes,
+    )
@@ -0,0 +1,10 @@
+"""Prometheus metrics endpoint."""
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", summary="Prometheus metrics exposition")
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,142 @@
+"""Admission control and a dedicated executor for upstream model calls.
+
+Each model gets an `AdmissionController`: a concurrency limit plus a bounded wait
+queue. Callers that would exceed the queue, or that wait past their deadline, are
+shed immediately with `AdmissionRejected` so the API can answer 503 + Retry-After
+instead of piling up latency behind a saturated upstream.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.settings import AppSettings, get_settings
+
+T = TypeVar("T")
+
+QUEUE_DEPTH = Gauge("quantleaves_admission_queue_depth", "Callers waiting for a model slot", ["controller"])
+IN_FLIGHT = Gauge("quantleaves_admission_in_flight", "Model calls currently admitted", ["controller"])
+SHED = Counter("quantleaves_admission_shed_total", "Model calls rejected by admission control", ["controller", "reason"])
+WAIT_SECONDS = Histogram(
+    "quantleaves_admission_wait_seconds",
+    "Time spent queued for a model slot",
+    ["controller"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+class AdmissionRejected(RuntimeError):
+    def __init__(self, controller: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"{controller} is overloaded ({reason}); retry after {retry_after:g}s")
+        self.controller = controller
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, deadline-aware wait queue."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @asynccontextmanager
+    async def slot(self, timeout: float | None = None) -> AsyncIterator[None]:
+        """Hold one model slot for the enclosed call.
+
+        `timeout` caps the queue wait (e.g. the caller's remaining request budget);
+        it never extends the controller's own `queue_timeout`.
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                self._shed("queue_full")
+            wait = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+            if wait <= 0:
+                self._shed("deadline")
+            self._waiting += 1
+            QUEUE_DEPTH.labels(self.name).inc()
+            started = time.perf_counter()
+            try:
+                async with asyncio.timeout(wait):
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                self._shed("deadline")
+            finally:
+                self._waiting -= 1
+                QUEUE_DEPTH.labels(self.name).dec()
+                WAIT_SECONDS.labels(self.name).observe(time.perf_counter() - started)
+        else:
+            await self._semaphore.acquire()
+
+        IN_FLIGHT.labels(self.name).inc()
+        try:
+            yield
+        finally:
+            IN_FLIGHT.labels(self.name).dec()
+            self._semaphore.release()
+
+    def _shed(self, reason: str) -> None:
+        SHED.labels(self.name, reason).inc()
+        raise AdmissionRejected(self.name, reason, self.retry_after)
+
+
+_controllers: dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(kind: str, model: str, settings: AppSettings | None = None) -> AdmissionController:
+    """Return the process-wide controller for `kind` ("embeddings" or "chat") and `model`."""
+    name = f"{kind}:{model}"
+    controller = _controllers.get(name)
+    if controller is None:
+        settings = settings or get_settings()
+        default = settings.embedding_max_concurrency if kind == "embeddings" else settings.chat_max_concurrency
+        controller = AdmissionController(
+            name,
+            max_concurrency=settings.model_concurrency_limits.get(model, default),
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout_seconds,
+            retry_after=settings.admission_retry_after_seconds,
+        )
+        _controllers[name] = controller
+    return controller
+
+
+@lru_cache
+def get_model_executor() -> ThreadPoolExecutor:
+    """Dedicated pool for blocking model calls, sized independently of the default executor."""
+    return ThreadPoolExecutor(
+        max_workers=get_settings().model_executor_workers,
+        thread_name_prefix="model-call",
+    )
+
+
+async def run_in_model_executor(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking call on the model executor, preserving context variables (e.g. request timings)."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_model_executor(), functools.partial(context.run, func, *args))
@@ -0,0 +1,117 @@
+"""Per-request latency budgets for retrieval branches and LLM time-to-first-token.
+
+A `LatencyBudget` gives each component its own timeout, optionally capped by an
+overall request deadline. `within` runs one component under its timeout and,
+when it expires, records the component as degraded and returns a fallback, so
+a slow embeddings API or vector query degrades the answer instead of stalling it.
+Only timeouts degrade; other errors still propagate.
+
+`bind_budget` makes the request's budget visible to model calls it makes, so
+admission control queues a call for at most the time the request has left.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Literal, TypeVar
+
+from prometheus_client import Counter
+
+from app.core.settings import AppSettings
+
+T = TypeVar("T")
+
+Component = Literal["structured", "vector", "lexical", "llm"]
+
+DEGRADED = Counter(
+    "quantleaves_degraded_responses_total",
+    "Components that missed their deadline and were answered from a fallback",
+    ["component"],
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds(milliseconds: float | None) -> float | None:
+    return milliseconds / 1000.0 if milliseconds and milliseconds > 0 else None
+
+
+@dataclass(frozen=True, slots=True)
+class LatencyBudget:
+    """Timeouts in seconds per component (None = unbounded) and an optional absolute deadline."""
+
+    structured: float | None = None
+    vector: float | None = None
+    lexical: float | None = None
+    llm: float | None = None
+    deadline: float | None = None  # time.monotonic() value
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings, total_ms: float | None = None) -> LatencyBudget:
+        return cls(
+            structured=_seconds(settings.structured_deadline_ms),
+            vector=_seconds(settings.vector_deadline_ms),
+            lexical=_seconds(settings.lexical_deadline_ms),
+            llm=_seconds(settings.llm_ttft_deadline_ms),
+            deadline=time.monotonic() + total_ms / 1000.0 if total_ms else None,
+        )
+
+    def remaining(self) -> float | None:
+        """Seconds left before the request deadline, or None without one."""
+        return None if self.deadline is None else max(self.deadline - time.monotonic(), 0.0)
+
+    def timeout(self, component: Component) -> float | None:
+        """Seconds `component` may take from now: its own limit, capped by what is left of the request."""
+        limit: float | None = getattr(self, component)
+        remaining = self.remaining()
+        if remaining is None:
+            return limit
+        return remaining if limit is None else min(limit, remaining)
+
+
+_budget: ContextVar[LatencyBudget | None] = ContextVar("latency_budget", default=None)
+
+
+@contextmanager
+def bind_budget(budget: LatencyBudget) -> Iterator[LatencyBudget]:
+    """Make `budget` the current request's budget for the enclosed block (and tasks it starts)."""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def remaining_budget() -> float | None:
+    """Seconds the current request has left, or None outside a request or without a deadline."""
+    budget = _budget.get()
+    return None if budget is None else budget.remaining()
+
+
+def mark_degraded(component: Component, degraded: list[str]) -> None:
+    if component not in degraded:
+        degraded.append(component)
+    DEGRADED.labels(component=component).inc()
+
+
+async def within(
+    awaitable: Awaitable[T],
+    timeout: float | None,
+    component: Component,
+    degraded: list[str],
+    fallback: T,
+) -> T:
+    """Await `awaitable` for at most `timeout` seconds, returning `fallback` and marking `component` on expiry."""
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except TimeoutError:
+        logger.warning("%s missed its %.0f ms deadline; answering without it", component, timeout * 1000)
+        mark_degraded(component, degraded)
+        return fallback
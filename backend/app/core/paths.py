@@ -4,6 +4,11 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parents[2]
 CORPUS_DIR = BASE_DIR / "corpus"
 STRUCTURED_DIR = CORPUS_DIR / "structured"
+EVAL_QUESTIONS_PATH = CORPUS_DIR / "eval" / "eval_questions.json"
+BENCHMARK_RESULTS_DIR = BASE_DIR / "benchmarks"
+DOCLING_CACHE_DIR = BASE_DIR / ".cache" / "docling"
+PROFILE_DIR = BASE_DIR / "profiles"
+SNAPSHOT_DIR = BASE_DIR / "snapshots"
 UNSTRUCTURED_DIRS = [
     CORPUS_DIR / "kb",
     CORPUS_DIR / "policies",
@@ -0,0 +1,235 @@
+"""Sampling profiler and event-loop lag monitor for live workers.
+
+`SamplingProfiler` walks `sys._current_frames()` from a background thread and
+aggregates stacks in collapsed format (`frame;frame;frame count`), which
+flamegraph.pl, speedscope and inferno read directly. `LoopLagMonitor` runs a
+watchdog thread that captures the event-loop thread's stack whenever the loop
+stops ticking for longer than a threshold, i.e. while a callback is blocking it.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+
+from prometheus_client import Counter as PromCounter, Histogram
+
+from app.core.paths import BASE_DIR, PROFILE_DIR
+from app.core.settings import AppSettings, get_settings
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = Histogram(
+    "quantleaves_event_loop_lag_seconds",
+    "Delay between scheduled and actual event-loop heartbeats",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKED = PromCounter("quantleaves_event_loop_blocked_total", "Event-loop stalls longer than the lag threshold")
+
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for root in (str(BASE_DIR) + "/", *(path + "/" for path in sys.path if path.endswith("site-packages"))):
+        if filename.startswith(root):
+            filename = filename[len(root) :]
+            break
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def collapse_stack(frame: FrameType | None, thread_name: str) -> str:
+    """Render `frame` and its callers root-first as one collapsed-stack key."""
+    labels: list[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":"))
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Wall-clock sampler of every Python thread (or `thread_ids` only) at a fixed interval."""
+
+    def __init__(self, interval: float = 0.005, thread_ids: set[int] | None = None) -> None:
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.samples: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> SamplingProfiler:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed(), encoding="utf-8")
+        return path
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self.samples[collapse_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.sample_count += 1
+
+
+def profile_path(label: str, settings: AppSettings | None = None) -> Path:
+    settings = settings or get_settings()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    return (settings.profile_dir or PROFILE_DIR) / f"{label}-{stamp}.collapsed"
+
+
+async def profile_for(seconds: float, interval: float, path: Path) -> SamplingProfiler:
+    """Sample the whole process for `seconds` without blocking the event loop, then write `path`."""
+    profiler = SamplingProfiler(interval=interval).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    await asyncio.to_thread(profiler.write, path)
+    return profiler
+
+
+@dataclass(slots=True)
+class LoopStall:
+    detected_at: str
+    blocked_ms: float
+    stack: str
+
+
+class LoopLagMonitor:
+    """Flags event-loop callbacks that block longer than `threshold` seconds.
+
+    A coroutine on the loop refreshes a heartbeat every `interval`; a watchdog
+    thread that sees the heartbeat go stale samples the loop thread's stack while
+    it is still blocked, so the report names the offending call (for example a
+    synchronous Docling conversion or YAML parse).
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float | None = None, history: int = 50) -> None:
+        self.threshold = threshold
+        self.interval = interval or threshold / 4
+        self.stalls: deque[LoopStall] = deque(maxlen=history)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            LOOP_LAG.observe(max(0.0, now - expected))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        reported_for: float | None = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat
+            if blocked < self.threshold + self.interval or reported_for == heartbeat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stall = LoopStall(
+                detected_at=datetime.now(timezone.utc).isoformat(),
+                blocked_ms=round(blocked * 1000.0, 1),
+                stack=collapse_stack(frame, "event-loop"),
+            )
+            self.stalls.append(stall)
+            reported_for = heartbeat
+            LOOP_BLOCKED.inc()
+            logger.warning("Event loop blocked for %.0f ms in %s", stall.blocked_ms, stall.stack.rsplit(";", 3)[-3:])
+
+
+_monitor: LoopLagMonitor | None = None
+
+
+def get_loop_monitor() -> LoopLagMonitor | None:
+    return _monitor
+
+
+async def start_loop_monitor(settings: AppSettings | None = None) -> LoopLagMonitor | None:
+    global _monitor
+    settings = settings or get_settings()
+    if settings.loop_lag_threshold_ms <= 0:
+        return None
+    _monitor = LoopLagMonitor(threshold=settings.loop_lag_threshold_ms / 1000.0)
+    _monitor.start()
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
+
+
+def install_profile_signal(settings: AppSettings | None = None, signum: int = getattr(signal, "SIGUSR2", 0)) -> bool:
+    """Profile the process for `profile_signal_seconds` whenever it receives `signum` (SIGUSR2).
+
+    Lets an operator attach to a running ingestion worker with `kill -USR2 <pid>`.
+    Must be called from the main thread.
+    """
+    settings = settings or get_settings()
+    if not signum or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def _handler(*_: object) -> None:
+        def _profile() -> None:
+            profiler = SamplingProfiler(interval=settings.profile_interval_ms / 1000.0).start()
+            time.sleep(settings.profile_signal_seconds)
+            profiler.stop()
+            path = profiler.write(profile_path("signal", settings))
+            logger.info("Wrote %d profile samples to %s", profiler.sample_count, path)
+
+        threading.Thread(target=_profile, name="signal-profiler", daemon=True).start()
+
+    signal.signal(signum, _handler)
+    return True
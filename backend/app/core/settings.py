@@ -1,5 +1,6 @@
 """Application configuration."""
 from functools import lru_cache
+from pathlib import Path
 from typing import Literal
 
 from pydantic import AnyUrl
@@ -11,15 +12,79 @@ class AppSettings(BaseSettings):
 
     environment: Literal["local", "staging", "production"] = "local"
     database_url: AnyUrl | None = None
+    database_read_urls: list[AnyUrl] = []
+    db_write_pool_size: int = 5
+    db_read_pool_size: int = 10
+    db_replica_check_interval_seconds: float = 5.0
+    db_replica_check_timeout_seconds: float = 1.0
+    model_provider: Literal["openai", "local"] = "openai"
     openai_api_key: str | None = None
     openai_api_base: AnyUrl | None = None
     openai_chat_model: str = "gpt-4.1-mini"
     openai_embedding_model: str = "text-embedding-3-large"
+    local_embedding_dim: int = 3072
+    local_chat_latency_ms: int = 0
+    local_chat_tokens_per_second: float = 0.0
     vector_collection: str = "quantleaves_support_corpus"
     vector_table_name: str = "document_embeddings"
     chunk_size: int = 800
     chunk_overlap: int = 120
     ingestion_batch_size: int = 50
+    ingestion_commit_size: int = 500
+    pdf_window_pages: int = 20
+    dedup_enabled: bool = True
+    dedup_threshold: float = 0.85
+    dedup_num_perm: int = 128
+    dedup_bands: int = 16
+    dedup_shingle_size: int = 5
+    docling_cache_enabled: bool = True
+    docling_cache_dir: Path | None = None
+    docling_cache_max_bytes: int = 512 * 1024 * 1024
+    embedding_model_refresh_seconds: float = 30.0
+    vector_snapshot_path: Path | None = None
+    snapshot_verify: bool = True
+    reembed_batch_size: int = 64
+    reembed_pause_seconds: float = 0.5
+    retrieval_top_k: int = 6
+    mmr_lambda: float = 0.5
+    mmr_oversample: int = 4
+    structured_deadline_ms: float = 0.0
+    vector_deadline_ms: float = 0.0
+    lexical_deadline_ms: float = 0.0
+    llm_ttft_deadline_ms: float = 0.0
+    fallback_answer_hits: int = 3
+    embedding_max_concurrency: int = 16
+    chat_max_concurrency: int = 32
+    model_concurrency_limits: dict[str, int] = {}
+    admission_max_queue: int = 64
+    admission_queue_timeout_seconds: float = 2.0
+    admission_retry_after_seconds: float = 1.0
+    model_executor_workers: int = 16
+    http2_enabled: bool = True
+    http_max_connections: int = 64
+    http_max_keepalive_connections: int = 32
+    http_keepalive_expiry_seconds: float = 60.0
+    http_connect_timeout_seconds: float = 5.0
+    http_read_timeout_seconds: float = 60.0
+    http_write_timeout_seconds: float = 10.0
+    http_pool_timeout_seconds: float = 5.0
+    batch_max_questions: int = 500
+    response_max_value_bytes: int = 2048
+    response_compression_min_bytes: int = 1024
+    batch_concurrency: int = 8
+    session_max_sessions: int = 1000
+    session_max_bytes: int = 32_768
+    session_idle_ttl_seconds: int = 1800
+    session_history_turns: int = 3
+    session_summary_chars: int = 1200
+    session_context_chunks: int = 8
+    session_spill_to_postgres: bool = False
+    admin_token: str | None = None
+    profile_dir: Path | None = None
+    profile_interval_ms: float = 5.0
+    profile_max_seconds: float = 60.0
+    profile_signal_seconds: float = 30.0
+    loop_lag_threshold_ms: float = 100.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,97 @@
+"""Per-stage latency instrumentation backed by Prometheus metrics.
+
+Stages are timed with `track(...)`. Each observation feeds a process-wide
+histogram and, when a request scope is active, that request's `RequestTimings`
+so it can be reported as a `Server-Timing` header and a structured log line.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+from prometheus_client import Counter, Histogram
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_LATENCY = Histogram(
+    "quantleaves_stage_duration_seconds",
+    "Latency of individual retrieval, generation and ingestion stages",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "quantleaves_stage_errors_total",
+    "Stages that raised an exception",
+    ["stage"],
+)
+HTTP_REQUESTS = Counter(
+    "quantleaves_http_requests_total",
+    "HTTP requests served",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "quantleaves_http_request_duration_seconds",
+    "End-to-end HTTP request latency",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class RequestTimings:
+    """Accumulated stage durations (milliseconds) for one request, in first-seen order."""
+
+    __slots__ = ("started", "stages")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, duration_ms: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def server_timing(self) -> str:
+        entries = [f"{stage};dur={duration:.1f}" for stage, duration in self.stages.items()]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def begin_request() -> tuple[RequestTimings, Token]:
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a duration that was measured outside a `track` block."""
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds * 1000.0)
+
+
+@contextmanager
+def track(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage`."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - started)
@@ -0,0 +1,96 @@
+"""Binary COPY writer for bulk chunk loads.
+
+Rows are encoded straight into PostgreSQL's binary COPY format: integers as
+big-endian int4, text and JSON as UTF-8, and embeddings in pgvector's binary
+wire format (`dim`, `unused` uint16 header followed by big-endian float32s)
+taken directly from a float32 array, so vectors never become Python floats.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+CHUNK_COLUMNS = ("collection", "document_id", "chunk_index", "content", "chunk_metadata", "embedding")
+
+_INT4_FIELD = struct.Struct(">ii")
+_FIELD_LENGTH = struct.Struct(">i")
+_VECTOR_HEADER = struct.Struct(">iHH")
+_ROW_HEADER = struct.pack(">h", len(CHUNK_COLUMNS))
+_BIG_ENDIAN_FLOAT32 = np.dtype(">f4")
+
+
+def encode_vector(vector: np.ndarray) -> bytes:
+    """pgvector binary representation of a 1-d float vector, prefixed with its COPY field length."""
+    data = np.ascontiguousarray(vector, dtype=_BIG_ENDIAN_FLOAT32).tobytes()
+    return _VECTOR_HEADER.pack(4 + len(data), vector.shape[0], 0) + data
+
+
+def _encode_text(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return _FIELD_LENGTH.pack(len(data)) + data
+
+
+class ChunkCopyBuffer:
+    """Accumulates `document_chunks` rows as binary COPY data until `copy_to` flushes them."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self.rows = 0
+        self.nbytes = 0
+
+    def add(
+        self,
+        collection: str,
+        document_id: int,
+        chunk_index: int,
+        content: str,
+        metadata: dict[str, Any],
+        embedding: np.ndarray,
+    ) -> None:
+        row = b"".join(
+            (
+                _ROW_HEADER,
+                _encode_text(collection),
+                _INT4_FIELD.pack(4, document_id),
+                _INT4_FIELD.pack(4, chunk_index),
+                _encode_text(content),
+                _encode_text(json.dumps(metadata, ensure_ascii=False)),
+                encode_vector(embedding),
+            )
+        )
+        self._parts.append(row)
+        self.rows += 1
+        self.nbytes += len(row)
+
+    def getvalue(self) -> bytes:
+        return b"".join((COPY_SIGNATURE, *self._parts, COPY_TRAILER))
+
+    def clear(self) -> None:
+        self._parts.clear()
+        self.rows = 0
+        self.nbytes = 0
+
+    async def copy_to(self, session: AsyncSession, table: str = "document_chunks") -> int:
+        """COPY the buffered rows inside the session's transaction and empty the buffer.
+
+        Rows are routed to their collection's partition, which must already exist.
+        """
+        if not self.rows:
+            return 0
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_to_table(
+            table,
+            source=self.getvalue(),
+            columns=list(CHUNK_COLUMNS),
+            format="binary",
+        )
+        rows = self.rows
+        self.clear()
+        return rows
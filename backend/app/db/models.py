@@ -1,10 +1,29 @@
 """SQLAlchemy models for structured corpus and embeddings."""
-from datetime import date
+from datetime import date, datetime
+from typing import Any
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import JSON, Column, Date, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+EMBEDDING_DIM = 3072
+# Text-search configuration shared by the chunk content index and lexical retrieval.
+FTS_CONFIG = "english"
+
 
 class Base(DeclarativeBase):
     pass
@@ -68,11 +87,16 @@ class ApiEndpoint(Base):
     extra: Mapped[dict | None] = mapped_column(JSON)
 
 
+DOCUMENT_COLLECTION_KEY = "uq_documents_collection_doc_id"
+
+
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (UniqueConstraint("collection", "doc_id", name=DOCUMENT_COLLECTION_KEY),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    doc_id: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    collection: Mapped[str] = mapped_column(String(40), nullable=False)
+    doc_id: Mapped[str] = mapped_column(String(100), nullable=False)
     title: Mapped[str | None] = mapped_column(String(200))
     doc_type: Mapped[str | None] = mapped_column(String(50))
     audience: Mapped[str | None] = mapped_column(String(50))
@@ -85,13 +109,93 @@ class Document(Base):
 
 
 class DocumentChunk(Base):
+    """Chunk rows, LIST-partitioned by `collection` (see `app/db/partitions.py`).
+
+    Indexes declared here are created on every partition. The HNSW index is on the
+    half-precision cast because pgvector cannot index `vector` above 2000 dimensions;
+    queries use the same expression (`vector_distance`) so the planner can pick it.
+    """
+
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index(
+            "ix_document_chunks_content_tsv",
+            text(f"to_tsvector('{FTS_CONFIG}', content)"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_document_chunks_embedding_hnsw",
+            text(f"(embedding::halfvec({EMBEDDING_DIM})) halfvec_cosine_ops"),
+            postgresql_using="hnsw",
+        ),
+        {"postgresql_partition_by": "LIST (collection)"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Part of the key because a partitioned table's unique constraints must include the partition column.
+    collection: Mapped[str] = mapped_column(String(40), primary_key=True)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"))
     chunk_index: Mapped[int] = mapped_column(Integer)
     content: Mapped[str] = mapped_column(Text)
     chunk_metadata: Mapped[dict | None] = mapped_column(JSON)
-    embedding: Mapped[list[float] | None] = mapped_column(Vector(3072))
+    embedding: Mapped[list[float] | None] = mapped_column(Vector(EMBEDDING_DIM))
 
     document: Mapped[Document] = relationship(back_populates="chunks")
+
+
+def content_tsvector(column: Any = DocumentChunk.content) -> Any:
+    """`to_tsvector` expression matching the GIN index, so lexical queries can use it."""
+    return func.to_tsvector(literal_column(f"'{FTS_CONFIG}'"), column)
+
+
+class ConversationSessionRecord(Base):
+    __tablename__ = "conversation_sessions"
+
+    session_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class IngestionVersion(Base):
+    """One row per completed ingestion run; replicas are fresh once they have the latest id."""
+
+    __tablename__ = "ingestion_versions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class EmbeddingModel(Base):
+    """Embedding models known to the index and where their vectors live.
+
+    `storage` is "column" for `document_chunks.embedding` (written by full ingestion)
+    or "table" for `chunk_embeddings` (written by online re-embedding). Exactly one
+    model is "active" and serves queries; a "migrating" model records its checkpoint.
+    """
+
+    __tablename__ = "embedding_models"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    storage: Mapped[str] = mapped_column(String(10), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    checkpoint_chunk_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    embedded_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ChunkEmbedding(Base):
+    """Per-model chunk vectors written alongside the live column during a model migration.
+
+    `chunk_id` has no foreign key: chunk ids come from one sequence and stay unique, but
+    the partitioned table's key also includes `collection`. Deleting chunks removes
+    their vectors explicitly. `collection` is copied from the chunk so queries can
+    filter here. Each model gets a partial HNSW index before it is activated
+    (`app/ingestion/reembed.py`).
+    """
+
+    __tablename__ = "chunk_embeddings"
+
+    chunk_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+    collection: Mapped[str] = mapped_column(String(40), nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(Vector(), nullable=False)
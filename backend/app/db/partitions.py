@@ -0,0 +1,199 @@
+"""Collection partitions of `document_chunks`.
+
+`document_chunks` is LIST-partitioned on `collection`; each collection (a
+product line, tenant, or other corpus) gets its own partition, named
+`<vector_table_name>_<collection>`, and with it its own HNSW index. A query
+filtered on one collection is pruned to that partition, so its cost follows
+the collection's size rather than the whole corpus.
+
+An ingestion run loads a collection into a standalone staging table shaped like
+its partition (`create_staging_partition`) and, once every chunk is written,
+replaces the live partition with it in one transaction (`drop_partition` then
+`attach_staging_partition`), so readers never see a half-loaded collection.
+
+Databases created before collections existed have a plain `document_chunks`
+table; `migrate_unpartitioned_chunks` rebuilds it in the partitioned layout, and
+`migrate_chunk_embeddings` adds the collection to migration vectors.
+"""
+from __future__ import annotations
+
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.settings import AppSettings, get_settings
+from app.db.models import DOCUMENT_COLLECTION_KEY, DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+# Collection names become partition names and list values, so they are restricted to safe identifiers.
+COLLECTION_PATTERN = r"^[a-z0-9][a-z0-9_]{0,39}$"
+MAX_IDENTIFIER_LENGTH = 63
+
+_COLLECTION = re.compile(COLLECTION_PATTERN)
+# The pre-partitioning table is renamed to this while its rows are copied over.
+LEGACY_CHUNK_TABLE = "document_chunks_unpartitioned"
+STAGING_SUFFIX = "_load"
+
+
+class CollectionError(ValueError):
+    pass
+
+
+def validate_collection(collection: str) -> str:
+    if not _COLLECTION.match(collection):
+        raise CollectionError(
+            f"Invalid collection {collection!r}: use 1-40 lowercase letters, digits or underscores"
+        )
+    return collection
+
+
+def partition_name(collection: str, settings: AppSettings | None = None) -> str:
+    settings = settings or get_settings()
+    name = f"{settings.vector_table_name}_{validate_collection(collection)}"
+    if len(name) > MAX_IDENTIFIER_LENGTH or not _COLLECTION.match(settings.vector_table_name):
+        raise CollectionError(f"Partition name {name!r} is not a valid Postgres identifier")
+    return name
+
+
+def staging_name(collection: str, settings: AppSettings | None = None) -> str:
+    name = partition_name(collection, settings) + STAGING_SUFFIX
+    if len(name) > MAX_IDENTIFIER_LENGTH:
+        raise CollectionError(f"Staging table name {name!r} is not a valid Postgres identifier")
+    return name
+
+
+async def ensure_collection(
+    connection: AsyncConnection | AsyncSession,
+    collection: str,
+    settings: AppSettings | None = None,
+) -> str:
+    """Create the collection's partition (and, via the parent's indexes, its HNSW and GIN indexes) if missing."""
+    name = partition_name(collection, settings)
+    await connection.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF document_chunks FOR VALUES IN ('{collection}')")
+    )
+    return name
+
+
+async def create_staging_partition(
+    connection: AsyncConnection | AsyncSession,
+    collection: str,
+    settings: AppSettings | None = None,
+) -> str:
+    """Create an empty table to load `collection` into, replacing one a failed run left behind.
+
+    It takes the parent's column defaults, so chunk ids still come from the shared
+    sequence, and its indexes. The partition bound is added as a CHECK constraint
+    so attaching the table later skips the validation scan.
+    """
+    name = staging_name(collection, settings)
+    await connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    await connection.execute(
+        text(
+            f"CREATE TABLE {name} (LIKE document_chunks INCLUDING DEFAULTS INCLUDING INDEXES, "
+            f"CHECK (collection = '{collection}'))"
+        )
+    )
+    return name
+
+
+async def drop_partition(
+    connection: AsyncConnection | AsyncSession,
+    collection: str,
+    settings: AppSettings | None = None,
+) -> None:
+    """Drop the collection's live partition and its chunks; the caller attaches the replacement."""
+    await connection.execute(text(f"DROP TABLE IF EXISTS {partition_name(collection, settings)}"))
+
+
+async def attach_staging_partition(
+    connection: AsyncConnection | AsyncSession,
+    collection: str,
+    settings: AppSettings | None = None,
+) -> str:
+    """Make the loaded staging table the collection's partition, after `drop_partition` in the same transaction.
+
+    The chunks' document ids must exist by now: attaching checks the parent's foreign key.
+    """
+    name = partition_name(collection, settings)
+    await connection.execute(text(f"ALTER TABLE {staging_name(collection, settings)} RENAME TO {name}"))
+    await connection.execute(
+        text(f"ALTER TABLE document_chunks ATTACH PARTITION {name} FOR VALUES IN ('{collection}')")
+    )
+    return name
+
+
+async def migrate_unpartitioned_chunks(connection: AsyncConnection, settings: AppSettings | None = None) -> bool:
+    """Rebuild a pre-collection `document_chunks` table as the partitioned one, in the caller's transaction.
+
+    Existing documents and chunks move into the default collection. Chunk ids are
+    kept, so `chunk_embeddings` rows and cached session context stay valid. The
+    indexes are built after the rows are copied. Returns whether anything was migrated.
+    """
+    settings = settings or get_settings()
+    kind = await connection.scalar(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('document_chunks')"))
+    if kind != "r":
+        return False
+    collection = validate_collection(settings.vector_collection)
+    logger.info("Moving existing documents and chunks into the partitioned layout as collection %s", collection)
+    for statement in (
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS collection VARCHAR(40)",
+        f"UPDATE documents SET collection = '{collection}' WHERE collection IS NULL",
+        "ALTER TABLE documents ALTER COLUMN collection SET NOT NULL",
+        "ALTER TABLE documents DROP CONSTRAINT IF EXISTS documents_doc_id_key",
+        f"ALTER TABLE documents ADD CONSTRAINT {DOCUMENT_COLLECTION_KEY} UNIQUE (collection, doc_id)",
+        # Free the names the partitioned table's key, sequence and indexes will use.
+        "DROP INDEX IF EXISTS ix_document_chunks_content_tsv",
+        f"ALTER TABLE document_chunks RENAME TO {LEGACY_CHUNK_TABLE}",
+        f"ALTER TABLE {LEGACY_CHUNK_TABLE} RENAME CONSTRAINT document_chunks_pkey TO {LEGACY_CHUNK_TABLE}_pkey",
+        f"ALTER SEQUENCE IF EXISTS document_chunks_id_seq RENAME TO {LEGACY_CHUNK_TABLE}_id_seq",
+    ):
+        await connection.execute(text(statement))
+    table = DocumentChunk.__table__
+    await connection.execute(CreateTable(table))
+    await ensure_collection(connection, collection, settings)
+    await connection.execute(
+        text(
+            "INSERT INTO document_chunks "
+            "(id, collection, document_id, chunk_index, content, chunk_metadata, embedding) "
+            "SELECT c.id, d.collection, c.document_id, c.chunk_index, c.content, c.chunk_metadata, c.embedding "
+            f"FROM {LEGACY_CHUNK_TABLE} c JOIN documents d ON d.id = c.document_id"
+        )
+    )
+    await connection.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence('document_chunks', 'id'), "
+            "COALESCE((SELECT max(id) FROM document_chunks), 0) + 1, false)"
+        )
+    )
+    # Also drops chunk_embeddings' old foreign key to the unpartitioned table.
+    await connection.execute(text(f"DROP TABLE {LEGACY_CHUNK_TABLE} CASCADE"))
+    for index in table.indexes:
+        await connection.execute(CreateIndex(index))
+    return True
+
+
+async def migrate_chunk_embeddings(connection: AsyncConnection) -> bool:
+    """Add and backfill `chunk_embeddings.collection` on tables created before it existed."""
+    missing = await connection.scalar(
+        text(
+            "SELECT to_regclass('chunk_embeddings') IS NOT NULL AND NOT EXISTS ("
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'chunk_embeddings' AND column_name = 'collection')"
+        )
+    )
+    if not missing:
+        return False
+    logger.info("Adding collections to chunk_embeddings")
+    for statement in (
+        "ALTER TABLE chunk_embeddings ADD COLUMN collection VARCHAR(40)",
+        "UPDATE chunk_embeddings e SET collection = c.collection FROM document_chunks c WHERE c.id = e.chunk_id",
+        "DELETE FROM chunk_embeddings WHERE collection IS NULL",
+        "ALTER TABLE chunk_embeddings ALTER COLUMN collection SET NOT NULL",
+    ):
+        await connection.execute(text(statement))
+    return True
@@ -1,28 +1,60 @@
-"""Database session management."""
-from collections.abc import AsyncIterator
+"""Database session management.
+
+Writes (ingestion, session spill) go through the primary engine. Reads for
+retrieval go through `get_read_session`, which routes to a healthy, caught-up
+read replica when `DATABASE_READ_URLS` is set and otherwise to a read-only pool
+on the primary, so bulk writes never starve retrieval of connections.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
+from prometheus_client import Counter, Gauge
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.core.settings import get_settings
+from app.core.settings import AppSettings, get_settings
+from app.db.models import IngestionVersion
+
+logger = logging.getLogger(__name__)
+
+READ_ROUTES = Counter("quantleaves_db_read_routes_total", "Read sessions by target", ["target"])
+REPLICA_HEALTHY = Gauge("quantleaves_db_replica_healthy", "1 when the replica is reachable and caught up", ["replica"])
 
 _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
+_router: ReplicaRouter | None = None
+
+
+def _database_url(settings: AppSettings) -> str:
+    if not settings.database_url:
+        raise RuntimeError("DATABASE_URL is not configured. Set it in backend/.env before running ingestion.")
+    return str(settings.database_url)
 
 
 def get_engine() -> AsyncEngine:
-    """Return a singleton async engine configured from settings."""
+    """Return the singleton write (primary) engine configured from settings."""
     global _engine
     if _engine is None:
         settings = get_settings()
-        if not settings.database_url:
-            raise RuntimeError("DATABASE_URL is not configured. Set it in backend/.env before running ingestion.")
-        _engine = create_async_engine(str(settings.database_url), future=True, echo=settings.environment == "local")
+        _engine = create_async_engine(
+            _database_url(settings),
+            future=True,
+            echo=settings.environment == "local",
+            pool_size=settings.db_write_pool_size,
+        )
     return _engine
 
 
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
-    """Return an async session factory."""
+    """Return an async session factory bound to the primary."""
     global _session_factory
     if _session_factory is None:
         _session_factory = async_sessionmaker(get_engine(), expire_on_commit=False)
@@ -31,7 +63,159 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
 
 @asynccontextmanager
 async def get_session() -> AsyncIterator[AsyncSession]:
-    """Provide a transactional session scope."""
+    """Provide a transactional session scope on the primary."""
     factory = get_session_factory()
     async with factory() as session:
         yield session
+
+
+@dataclass(slots=True)
+class ReplicaState:
+    name: str
+    engine: AsyncEngine
+    factory: async_sessionmaker[AsyncSession]
+    healthy: bool = False
+    version: int | None = None
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas that have caught up to the latest ingestion version.
+
+    Replica health and each server's latest `ingestion_versions` id are refreshed in
+    the background at most every `check_interval` seconds; callers never wait on a
+    check. Until a replica is known to be reachable and at least as fresh as the
+    primary (or a write made by this process), reads stay on the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: dict[str, AsyncEngine],
+        check_interval: float = 5.0,
+        check_timeout: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.primary = primary
+        self.primary_factory = async_sessionmaker(primary, expire_on_commit=False)
+        self.replicas = [
+            ReplicaState(name=name, engine=engine, factory=async_sessionmaker(engine, expire_on_commit=False))
+            for name, engine in replicas.items()
+        ]
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.clock = clock
+        self.required_version: int | None = None
+        self._checked_at: float | None = None
+        self._check_task: asyncio.Task | None = None
+        self._cycle = itertools.count()
+
+    def note_write_version(self, version: int) -> None:
+        """Pin reads to the primary until replicas have replayed `version`."""
+        self.required_version = max(self.required_version or 0, version)
+
+    def eligible(self) -> list[ReplicaState]:
+        if self.required_version is None:
+            return []
+        return [
+            replica
+            for replica in self.replicas
+            if replica.healthy and replica.version is not None and replica.version >= self.required_version
+        ]
+
+    def choose(self) -> ReplicaState | None:
+        self._schedule_check()
+        candidates = self.eligible()
+        if not candidates:
+            return None
+        return candidates[next(self._cycle) % len(candidates)]
+
+    def mark_unhealthy(self, replica: ReplicaState) -> None:
+        replica.healthy = False
+        REPLICA_HEALTHY.labels(replica.name).set(0)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        replica = self.choose()
+        if replica is not None:
+            session = replica.factory()
+            try:
+                await session.connection()
+            except (OperationalError, DBAPIError, OSError) as exc:
+                logger.warning("Read replica %s unavailable, falling back to primary: %s", replica.name, exc)
+                self.mark_unhealthy(replica)
+                await session.close()
+            else:
+                READ_ROUTES.labels("replica").inc()
+                try:
+                    yield session
+                finally:
+                    await session.close()
+                return
+        READ_ROUTES.labels("primary").inc()
+        async with self.primary_factory() as session:
+            yield session
+
+    async def refresh(self) -> None:
+        """Re-read the primary's and every replica's latest ingestion version."""
+        self._checked_at = self.clock()
+        try:
+            primary_version = await self._latest_version(self.primary)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not read ingestion version from primary: %s", exc)
+        else:
+            self.note_write_version(primary_version)
+        for replica in self.replicas:
+            try:
+                replica.version = await self._latest_version(replica.engine)
+                replica.healthy = True
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Read replica %s failed health check: %s", replica.name, exc)
+                replica.healthy = False
+            fresh = replica in self.eligible()
+            REPLICA_HEALTHY.labels(replica.name).set(1 if fresh else 0)
+
+    def _schedule_check(self) -> None:
+        if not self.replicas:
+            return
+        if self._check_task is not None and not self._check_task.done():
+            return
+        if self._checked_at is not None and self.clock() - self._checked_at < self.check_interval:
+            return
+        self._check_task = asyncio.get_running_loop().create_task(self.refresh())
+
+    async def _latest_version(self, engine: AsyncEngine) -> int:
+        async with asyncio.timeout(self.check_timeout):
+            async with engine.connect() as conn:
+                latest = await conn.scalar(select(func.max(IngestionVersion.id)))
+        return int(latest or 0)
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Return the process-wide read router with its own pools, independent of the write engine."""
+    global _router
+    if _router is None:
+        settings = get_settings()
+        echo = settings.environment == "local"
+        primary_reads = create_async_engine(
+            _database_url(settings), future=True, echo=echo, pool_size=settings.db_read_pool_size
+        )
+        replicas = {
+            f"replica-{index}": create_async_engine(
+                str(url), future=True, echo=echo, pool_size=settings.db_read_pool_size, pool_pre_ping=True
+            )
+            for index, url in enumerate(settings.database_read_urls)
+        }
+        _router = ReplicaRouter(
+            primary_reads,
+            replicas,
+            check_interval=settings.db_replica_check_interval_seconds,
+            check_timeout=settings.db_replica_check_timeout_seconds,
+        )
+    return _router
+
+
+@asynccontextmanager
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Provide a read-only session on a fresh replica, or on the primary's read pool."""
+    async with get_replica_router().session() as session:
+        yield session
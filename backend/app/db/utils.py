@@ -1,13 +1,21 @@
 """Database utility helpers."""
 from sqlalchemy import text
 
+from app.core.settings import get_settings
 from app.db.models import Base
+from app.db.partitions import ensure_collection, migrate_chunk_embeddings, migrate_unpartitioned_chunks
 from app.db.session import get_engine
 
 
 async def init_db() -> None:
-    """Create database schema if it doesn't exist."""
+    """Create database schema, and the default collection's chunk partition, if they don't exist.
+
+    A chunk table from before collections existed is first migrated to the partitioned layout.
+    """
     engine = get_engine()
     async with engine.begin() as conn:
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await migrate_unpartitioned_chunks(conn)
+        await migrate_chunk_embeddings(conn)
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_collection(conn, get_settings().vector_collection)
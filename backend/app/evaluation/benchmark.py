@@ -0,0 +1,256 @@
+"""Retrieval quality and latency benchmark driven by the eval question set."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.core.paths import BENCHMARK_RESULTS_DIR, EVAL_QUESTIONS_PATH
+from app.core.settings import AppSettings, get_settings
+from app.core.telemetry import begin_request, end_request
+from app.ingestion.pipeline import IngestionPipeline
+from app.providers.metering import get_meter
+from app.retrieval.hybrid import HybridRetriever
+from app.retrieval.types import HybridContext, StructuredHit, VectorHit
+from app.services.chat import ChatService
+
+# Structured hits are scored against the corpus file that seeded their table.
+STRUCTURED_SOURCE_FILES = {
+    "plans": "plan_matrix.csv",
+    "products": "products.csv",
+    "error_codes": "error_codes.json",
+    "policies": "world_bible.json",
+    "api_endpoints": "openapi.yaml",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(slots=True)
+class EvalQuestion:
+    question: str
+    source_doc_ids: list[str]
+    expected_answer: str | None = None
+    strictness: str | None = None
+
+
+@dataclass(slots=True)
+class QuestionResult:
+    question: str
+    expected: list[str]
+    retrieved: list[str]
+    recall: float
+    reciprocal_rank: float
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+
+def load_eval_questions(path: Path = EVAL_QUESTIONS_PATH) -> list[EvalQuestion]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        EvalQuestion(
+            question=row["question"],
+            source_doc_ids=list(row.get("source_doc_ids") or []),
+            expected_answer=row.get("expected_answer"),
+            strictness=row.get("strictness"),
+        )
+        for row in data
+    ]
+
+
+def ranked_sources(vector_hits: Iterable[VectorHit], structured_hits: Iterable[StructuredHit]) -> list[str]:
+    """Return de-duplicated source ids: vector doc ids by score, then structured source files.
+
+    Documents a chunk was deduplicated against (`also_in`) rank with the chunk itself.
+    """
+    ranked: list[str] = []
+    vector_sources = [
+        doc_id for hit in vector_hits for doc_id in [hit.doc_id, *(hit.metadata or {}).get("also_in", [])]
+    ]
+    for source in vector_sources + [
+        STRUCTURED_SOURCE_FILES.get(hit.source, hit.source) for hit in structured_hits
+    ]:
+        if source not in ranked:
+            ranked.append(source)
+    return ranked
+
+
+def recall_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
+    if not expected:
+        return 0.0
+    top = set(retrieved[:k])
+    return sum(1 for doc_id in expected if doc_id in top) / len(expected)
+
+
+def reciprocal_rank(retrieved: list[str], expected: list[str], k: int) -> float:
+    wanted = set(expected)
+    for rank, doc_id in enumerate(retrieved[:k], start=1):
+        if doc_id in wanted:
+            return 1.0 / rank
+    return 0.0
+
+
+def latency_summary(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64)
+    summary = {"count": int(values.size), "mean": round(float(values.mean()), 3)}
+    for pct, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{pct}"] = round(float(value), 3)
+    return summary
+
+
+def build_offline_components(
+    settings: AppSettings | None = None,
+    llm_latency_ms: int = 0,
+    llm_tokens_per_second: float = 0.0,
+) -> tuple[ChatService, IngestionPipeline]:
+    """Wire the chat service and ingestion pipeline to the local stand-in providers.
+
+    The hashing embedder is deterministic, so an offline ingestion run produces
+    vectors that offline queries can be compared against.
+    """
+    settings = (settings or get_settings()).model_copy(
+        update={
+            "model_provider": "local",
+            "local_chat_latency_ms": llm_latency_ms,
+            "local_chat_tokens_per_second": llm_tokens_per_second,
+        }
+    )
+    return ChatService(settings), IngestionPipeline(settings)
+
+
+class BenchmarkRunner:
+    """Replay eval questions through the retriever and chat service at a fixed concurrency."""
+
+    def __init__(
+        self,
+        retriever: HybridRetriever | None = None,
+        chat_service: ChatService | None = None,
+        k: int = 6,
+        concurrency: int = 4,
+        include_chat: bool = True,
+    ) -> None:
+        self.chat_service = chat_service or ChatService(retriever=retriever)
+        self.retriever = retriever or self.chat_service.retriever
+        self.k = k
+        self.concurrency = concurrency
+        self.include_chat = include_chat
+
+    async def run(self, questions: list[EvalQuestion], repeat: int = 1) -> dict[str, Any]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(item: EvalQuestion) -> QuestionResult:
+            async with semaphore:
+                return await self._run_one(item)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(item) for _ in range(repeat) for item in questions))
+        wall_seconds = time.perf_counter() - started
+        return self._report(results, wall_seconds, repeat)
+
+    async def _run_one(self, item: EvalQuestion) -> QuestionResult:
+        timings: dict[str, float] = {}
+        try:
+            start = time.perf_counter()
+            structured_hits = await self.retriever.structured.search(item.question)
+            timings["structured"] = _elapsed_ms(start)
+
+            start = time.perf_counter()
+            vector_hits = await self.retriever.vector.search(item.question, k=self.k)
+            timings["vector"] = _elapsed_ms(start)
+            timings["retrieval"] = timings["structured"] + timings["vector"]
+
+            if self.include_chat:
+                # Generate from the context retrieved above, so this stage times only prompt + LLM work.
+                context = HybridContext(query=item.question, structured_hits=structured_hits, vector_hits=vector_hits)
+                request_timings, token = begin_request()
+                try:
+                    await self.chat_service.answer_from_context(context)
+                finally:
+                    end_request(token)
+                timings["generation"] = request_timings.elapsed_ms()
+                timings.update({f"generation.{stage}": value for stage, value in request_timings.stages.items()})
+        except Exception as exc:  # noqa: BLE001
+            return QuestionResult(
+                question=item.question,
+                expected=item.source_doc_ids,
+                retrieved=[],
+                recall=0.0,
+                reciprocal_rank=0.0,
+                timings_ms=timings,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+
+        retrieved = ranked_sources(vector_hits, structured_hits)
+        return QuestionResult(
+            question=item.question,
+            expected=item.source_doc_ids,
+            retrieved=retrieved,
+            recall=recall_at_k(retrieved, item.source_doc_ids, self.k),
+            reciprocal_rank=reciprocal_rank(retrieved, item.source_doc_ids, self.k),
+            timings_ms=timings,
+        )
+
+    def _report(self, results: list[QuestionResult], wall_seconds: float, repeat: int) -> dict[str, Any]:
+        scored = [result for result in results if result.error is None]
+        stages = sorted({stage for result in scored for stage in result.timings_ms})
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "k": self.k,
+                "concurrency": self.concurrency,
+                "repeat": repeat,
+                "include_chat": self.include_chat,
+            },
+            "retrieval": {
+                f"recall@{self.k}": _mean([result.recall for result in scored]),
+                f"mrr@{self.k}": _mean([result.reciprocal_rank for result in scored]),
+            },
+            "latency_ms": {
+                stage: latency_summary([r.timings_ms[stage] for r in scored if stage in r.timings_ms])
+                for stage in stages
+            },
+            "throughput_qps": round(len(results) / wall_seconds, 3) if wall_seconds else None,
+            "errors": len(results) - len(scored),
+            "providers": get_meter().snapshot(),
+            "questions": [asdict(result) for result in results],
+        }
+
+
+def save_report(report: dict[str, Any], output: Path | None = None) -> Path:
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = BENCHMARK_RESULTS_DIR / f"benchmark-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return output
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any]) -> dict[str, dict[str, float]]:
+    """Return metric deltas (current - baseline) for quality scores and latency percentiles."""
+    deltas: dict[str, dict[str, float]] = {"retrieval": {}, "latency_ms": {}}
+    for metric, value in current.get("retrieval", {}).items():
+        if metric in baseline.get("retrieval", {}):
+            deltas["retrieval"][metric] = round(value - baseline["retrieval"][metric], 4)
+    for stage, summary in current.get("latency_ms", {}).items():
+        previous = baseline.get("latency_ms", {}).get(stage, {})
+        for pct in PERCENTILES:
+            key = f"p{pct}"
+            if key in summary and key in previous:
+                deltas["latency_ms"][f"{stage}.{key}"] = round(summary[key] - previous[key], 3)
+    return deltas
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000.0
+
+
+def _mean(values: list[float]) -> float:
+    return round(sum(values) / len(values), 4) if values else 0.0
@@ -0,0 +1,82 @@
+"""Throughput benchmark of the structure-aware chunker against the word-window chunker it replaced."""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from app.core.paths import UNSTRUCTURED_DIRS
+from app.ingestion.chunker import StructureChunker
+from app.ingestion.loaders.markdown_loader import load_markdown
+from app.ingestion.types import DocumentMetadata
+
+
+def legacy_chunks(body: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """The previous loader loop: split into words, then join overlapping word windows."""
+    tokens = body.split()
+    chunks: list[str] = []
+    start = 0
+    while start < len(tokens):
+        end = min(len(tokens), start + chunk_size)
+        chunks.append(" ".join(tokens[start:end]))
+        if end == len(tokens):
+            break
+        start = max(end - chunk_overlap, start + 1)
+    return chunks
+
+
+def corpus_bodies() -> list[str]:
+    return [
+        load_markdown(path)[1]
+        for directory in UNSTRUCTURED_DIRS
+        if directory.exists()
+        for path in sorted(directory.glob("*.md"))
+    ]
+
+
+def _structured_chunks(bodies: list[str], chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+    chunker = StructureChunker(chunk_size, chunk_overlap)
+    metadata = DocumentMetadata(doc_id="benchmark")
+    for body in bodies:
+        for chunk in chunker.chunk_text(body, metadata):
+            yield chunk.content
+
+
+def _measure(chunks: Iterator[str], total_bytes: int) -> dict[str, Any]:
+    started = time.perf_counter()
+    count = words = 0
+    for content in chunks:
+        count += 1
+        words += content.count(" ") + 1
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": round(seconds, 4),
+        "mib_per_second": round(total_bytes / 2**20 / seconds, 2) if seconds else None,
+        "chunks": count,
+        "mean_chunk_words": round(words / count, 1) if count else 0.0,
+    }
+
+
+def chunking_report(
+    bodies: list[str] | None = None,
+    chunk_size: int = 800,
+    chunk_overlap: int = 120,
+    copies: int = 50,
+) -> dict[str, Any]:
+    """Chunk `copies` replicas of the markdown corpus with both implementations."""
+    bodies = (bodies if bodies is not None else corpus_bodies()) * copies
+    total_bytes = sum(len(body.encode("utf-8")) for body in bodies)
+    legacy = _measure(
+        (chunk for body in bodies for chunk in legacy_chunks(body, chunk_size, chunk_overlap)),
+        total_bytes,
+    )
+    structured = _measure(_structured_chunks(bodies, chunk_size, chunk_overlap), total_bytes)
+    return {
+        "documents": len(bodies),
+        "input_mib": round(total_bytes / 2**20, 2),
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "legacy": legacy,
+        "structured": structured,
+        "speedup": round(legacy["seconds"] / structured["seconds"], 2) if structured["seconds"] else None,
+    }
@@ -0,0 +1,140 @@
+"""Peak-memory benchmark of the ingestion embed-and-write path on a synthetic corpus.
+
+`array` replays the current pipeline: float32 matrices from the provider,
+binary COPY rows and a commit every `commit_size` chunks. `list` replays the
+previous one: lists of Python floats held on ORM objects until a single final
+commit, text-encoded for pgvector. Writes go to a sink instead of Postgres, so
+the numbers isolate the process's own allocations (measured with tracemalloc).
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from typing import Any, Literal
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from pgvector import Vector
+
+from app.db.bulk import ChunkCopyBuffer
+
+Representation = Literal["array", "list"]
+
+WORDS = (
+    "account api billing chart dashboard export filter invoice key limit metric organisation plan policy "
+    "quota refund region report role seat sso subscription token trial usage user webhook workspace"
+).split()
+
+
+class SyntheticEmbeddings(Embeddings):
+    """Unit vectors from a seeded generator, standing in for a remote provider."""
+
+    def __init__(self, dimensions: int, seed: int = 0) -> None:
+        self.dimensions = dimensions
+        self._rng = np.random.default_rng(seed)
+
+    def embed_documents_array(self, texts: list[str]) -> np.ndarray:
+        matrix = self._rng.standard_normal((len(texts), self.dimensions), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+@dataclass(slots=True)
+class MemoryResult:
+    representation: str
+    chunks: int
+    dimensions: int
+    peak_bytes: int
+    seconds: float
+
+    @property
+    def bytes_per_chunk(self) -> float:
+        return self.peak_bytes / self.chunks if self.chunks else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "peak_mib": round(self.peak_bytes / 2**20, 1),
+            "bytes_per_chunk": round(self.bytes_per_chunk),
+        }
+
+
+def synthetic_texts(count: int, words_per_chunk: int = 120, seed: int = 0) -> Iterator[str]:
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        yield " ".join(WORDS[index] for index in rng.integers(0, len(WORDS), size=words_per_chunk))
+
+
+def run_memory_benchmark(
+    chunks: int = 100_000,
+    dimensions: int = 3072,
+    representation: Representation = "array",
+    batch_size: int = 50,
+    commit_size: int = 500,
+) -> MemoryResult:
+    """Embed and write `chunks` synthetic chunks, returning the peak traced allocation."""
+    embeddings = SyntheticEmbeddings(dimensions)
+    texts = synthetic_texts(chunks)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        if representation == "array":
+            _write_arrays(embeddings, texts, batch_size, commit_size)
+        else:
+            _write_lists(embeddings, texts, batch_size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return MemoryResult(representation, chunks, dimensions, peak, round(time.perf_counter() - started, 2))
+
+
+def _batches(texts: Iterator[str], size: int) -> Iterator[list[str]]:
+    batch: list[str] = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_arrays(embeddings: SyntheticEmbeddings, texts: Iterator[str], batch_size: int, commit_size: int) -> None:
+    buffer = ChunkCopyBuffer()
+    ordinal = 0
+    for batch in _batches(texts, batch_size):
+        for text, vector in zip(batch, embeddings.embed_documents_array(batch)):
+            buffer.add("synthetic", 1, ordinal, text, {"source_path": "synthetic.md"}, vector)
+            ordinal += 1
+        if buffer.rows >= commit_size:
+            buffer.getvalue()
+            buffer.clear()
+    buffer.getvalue()
+    buffer.clear()
+
+
+def _write_lists(embeddings: SyntheticEmbeddings, texts: Iterator[str], batch_size: int) -> None:
+    pending: list[tuple[str, list[float]]] = []
+    for batch in _batches(texts, batch_size):
+        pending.extend(zip(batch, embeddings.embed_documents(batch)))
+    for _, vector in pending:
+        Vector._to_db(vector)
+
+
+def memory_report(chunks: int, dimensions: int, baseline_chunks: int, commit_size: int = 500) -> dict[str, Any]:
+    """Array path at full size against the list path at `baseline_chunks`, projected linearly to `chunks`."""
+    current = run_memory_benchmark(chunks, dimensions, "array", commit_size=commit_size)
+    baseline = run_memory_benchmark(min(baseline_chunks, chunks), dimensions, "list")
+    return {
+        "array": current.as_dict(),
+        "list": baseline.as_dict(),
+        "list_projected_peak_mib": round(baseline.bytes_per_chunk * chunks / 2**20, 1),
+    }
@@ -0,0 +1,277 @@
+"""Structure-aware chunking shared by the markdown and PDF loaders.
+
+Text is parsed into markdown blocks (headings, paragraphs, lists, fenced code,
+tables) recorded as character offsets into the original text. Blocks are packed
+greedily into chunks of at most `chunk_size` words; a heading starts a new chunk
+once the current one is reasonably full, so small sections share a chunk and
+larger ones begin at their heading. A chunk closed for size starts the next one
+with its last `chunk_overlap` words of prose, including across PDF page windows;
+chunks that begin at a heading, or follow code or a table, start clean. Only blocks that alone exceed the budget
+are split (prose by words with `chunk_overlap` words of overlap, code and tables
+by lines). Each chunk's content is a slice of the source, and its metadata
+records the heading path and `[char_start, char_end)` offsets.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from app.ingestion.types import DocumentChunk, DocumentMetadata
+
+# Separates per-page markdown in cached PDF windows; offsets address a document's pages joined by it.
+PAGE_SEPARATOR = "\f"
+# A heading starts a new chunk once the current chunk holds this share of the budget.
+SECTION_BREAK_RATIO = 0.25
+
+WORD_PATTERN = re.compile(r"\S+")
+LINE_PATTERN = re.compile(r"[^\n]*\n?")
+
+_EOL = r"(?:\n|\Z)"
+_ITEM = r"[ ]{0,3}(?:[-*+]|\d{1,9}[.)])[ \t]"
+_FENCE = r"[ ]{0,3}(?:`{3,}|~{3,})"
+_HEADING = r"[ ]{0,3}\#{1,6}[ \t]"
+_TABLE_ROW = r"[ \t]*\|"
+_BLOCK_START = f"(?:{_HEADING}|{_FENCE}|{_TABLE_ROW}|{_ITEM})"
+# Skips blank lines, then tries one alternative per block type; the regex engine does the line scanning.
+BLOCK_PATTERN = re.compile(
+    rf"""
+    (?:[ \t]*\n)*
+    (?:(?P<blank>[ \t]+\Z)
+    |(?P<code>[ ]{{0,3}}(?P<fence>`{{3,}}|~{{3,}})[^\n]*
+        (?:\n(?:[^\n]*\n)*?[ ]{{0,3}}(?P=fence)[^\n]*|(?:\n[^\n]*)*){_EOL})
+    |(?P<heading>[ ]{{0,3}}(?P<hashes>\#{{1,6}})[ \t]+(?P<title>[^\n]*?)[ \t\#]*{_EOL})
+    |(?P<table>(?:{_TABLE_ROW}[^\n]*{_EOL})+)
+    |(?P<list>{_ITEM}[^\n]*{_EOL}
+        (?:(?:{_ITEM}|[ \t]+\S|(?!{_BLOCK_START})\S)[^\n]*{_EOL}|(?:[ \t]*\n)+(?={_ITEM}|[ \t]+\S))*)
+    |(?P<paragraph>(?:(?!{_BLOCK_START})[ \t]*\S[^\n]*{_EOL})+))
+    """,
+    re.VERBOSE,
+)
+
+HEADING = "heading"
+PARAGRAPH = "paragraph"
+LIST = "list"
+CODE = "code"
+TABLE = "table"
+
+
+@dataclass(slots=True)
+class Block:
+    kind: str
+    start: int
+    end: int
+    words: int
+    section: tuple[str, ...] = ()
+    page: int | None = None
+
+
+def iter_blocks(
+    text: str,
+    offset: int = 0,
+    page: int | None = None,
+    outline: list[tuple[int, str]] | None = None,
+) -> Iterator[Block]:
+    """Parse `text` into markdown blocks; offsets are shifted by `offset`.
+
+    `outline` is the `(level, title)` heading stack, updated in place so it
+    carries over when a document arrives as several page texts; each block
+    records the heading path that applies to it.
+    """
+    outline = [] if outline is None else outline
+    section: tuple[str, ...] = tuple(title for _, title in outline)
+    position = 0
+    while position < len(text):
+        match = BLOCK_PATTERN.match(text, position)
+        if match is None:  # a line of only \r or similar: skip it
+            newline = text.find("\n", position)
+            position = len(text) if newline < 0 else newline + 1
+            continue
+        kind = match.lastgroup
+        position = match.end()
+        if kind == "blank" or kind is None:
+            continue
+        start, end = match.span(kind)
+        if kind == HEADING:
+            level = len(match.group("hashes"))
+            while outline and outline[-1][0] >= level:
+                outline.pop()
+            outline.append((level, match.group("title")))
+            section = tuple(title for _, title in outline)
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        yield Block(
+            kind=kind,
+            start=offset + start,
+            end=offset + end,
+            words=_count_words(text, start, end),
+            section=section,
+            page=page,
+        )
+
+
+def _count_words(text: str, start: int, end: int) -> int:
+    return len(text[start:end].split())
+
+
+class StructureChunker:
+    """Packs markdown blocks into chunks of at most `chunk_size` words, plus any headings leading them."""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int) -> None:
+        self.chunk_size = max(chunk_size, 1)
+        self.chunk_overlap = min(max(chunk_overlap, 0), self.chunk_size - 1)
+        self.section_break = int(self.chunk_size * SECTION_BREAK_RATIO)
+
+    def chunk_text(self, text: str, metadata: DocumentMetadata) -> Iterator[DocumentChunk]:
+        return self.chunk_pages([(None, text)], metadata)
+
+    def chunk_pages(
+        self,
+        pages: Iterable[tuple[int | None, str]],
+        metadata: DocumentMetadata,
+    ) -> Iterator[DocumentChunk]:
+        """Chunk a stream of page texts, holding only the pages the pending chunk spans.
+
+        Offsets address the pages joined with `PAGE_SEPARATOR`; chunks record
+        `page_start`/`page_end` when pages are numbered.
+        """
+        texts: dict[int | None, tuple[str, int]] = {}
+        pending: list[Block] = []
+        pending_words = 0
+        ordinal = 0
+        offset = 0
+        outline: list[tuple[int, str]] = []
+
+        def emit(blocks: list[Block]) -> DocumentChunk:
+            return self._build(blocks, texts, metadata, ordinal)
+
+        for page, text in pages:
+            texts[page] = (text, offset)
+            for block in iter_blocks(text, offset, page, outline):
+                for piece in self._pieces(block, text, offset):
+                    carried = _trailing_headings(pending)
+                    headings_only = len(carried) == len(pending)
+                    over_budget = pending_words + piece.words > self.chunk_size and not headings_only
+                    at_section = piece.kind == HEADING and pending_words >= self.section_break
+                    if pending and (over_budget or at_section):
+                        emitted = pending if headings_only else pending[: len(pending) - len(carried)]
+                        yield emit(emitted)
+                        ordinal += 1
+                        pending = [] if headings_only else carried
+                        # Pieces of one split block already overlap each other.
+                        if not pending and not at_section and piece.start >= emitted[-1].end:
+                            pending = self._overlap(emitted, texts, self.chunk_size - piece.words)
+                        pending_words = sum(block.words for block in pending)
+                        for stale in [key for key in texts if key != page and all(b.page != key for b in pending)]:
+                            del texts[stale]
+                    pending.append(piece)
+                    pending_words += piece.words
+            offset += len(text) + len(PAGE_SEPARATOR)
+        if pending:
+            yield emit(pending)
+
+    def _overlap(self, blocks: list[Block], texts: dict[int | None, tuple[str, int]], room: int) -> list[Block]:
+        """The last `chunk_overlap` prose words of `blocks` (at most `room`), as blocks to start the next chunk."""
+        remaining = min(self.chunk_overlap, room)
+        tail: list[Block] = []
+        for block in reversed(blocks):
+            if remaining <= 0 or block.kind in {CODE, TABLE}:
+                break
+            if block.words > remaining:
+                text, offset = texts[block.page]
+                spans = list(WORD_PATTERN.finditer(text, block.start - offset, block.end - offset))[-remaining:]
+                block = Block(
+                    kind=block.kind,
+                    start=offset + spans[0].start(),
+                    end=block.end,
+                    words=remaining,
+                    section=block.section,
+                    page=block.page,
+                )
+            tail.insert(0, block)
+            remaining -= block.words
+        return tail
+
+    def _pieces(self, block: Block, text: str, offset: int) -> Iterator[Block]:
+        """The block itself, or budget-sized pieces of it when it alone exceeds `chunk_size` words."""
+        if block.words <= self.chunk_size:
+            yield block
+            return
+        if block.kind in {CODE, TABLE}:
+            yield from self._line_pieces(block, text, offset)
+            return
+        yield from self._word_pieces(block, text, offset, block.start - offset, block.end - offset)
+
+    def _word_pieces(self, block: Block, text: str, offset: int, start: int, end: int) -> Iterator[Block]:
+        spans = [(match.start(), match.end()) for match in WORD_PATTERN.finditer(text, start, end)]
+        advance = self.chunk_size - self.chunk_overlap
+        first = 0
+        while first < len(spans):
+            last = min(len(spans), first + self.chunk_size)
+            yield Block(
+                kind=block.kind,
+                start=offset + spans[first][0],
+                end=offset + spans[last - 1][1],
+                words=last - first,
+                section=block.section,
+                page=block.page,
+            )
+            if last == len(spans):
+                break
+            first += advance
+
+    def _line_pieces(self, block: Block, text: str, offset: int) -> Iterator[Block]:
+        piece_start: int | None = None
+        piece_end = 0
+        words = 0
+        for match in LINE_PATTERN.finditer(text, block.start - offset, block.end - offset):
+            line_words = _count_words(text, match.start(), match.end())
+            if line_words > self.chunk_size:
+                if piece_start is not None:
+                    yield Block(block.kind, offset + piece_start, offset + piece_end, words, block.section, block.page)
+                    piece_start, words = None, 0
+                yield from self._word_pieces(block, text, offset, match.start(), match.end())
+                continue
+            if piece_start is not None and words + line_words > self.chunk_size:
+                yield Block(block.kind, offset + piece_start, offset + piece_end, words, block.section, block.page)
+                piece_start, words = None, 0
+            if piece_start is None:
+                piece_start = match.start()
+            piece_end = match.end() - (1 if match.group().endswith("\n") else 0)
+            words += line_words
+        if piece_start is not None:
+            yield Block(block.kind, offset + piece_start, offset + piece_end, words, block.section, block.page)
+
+    def _build(
+        self,
+        blocks: list[Block],
+        texts: dict[int | None, tuple[str, int]],
+        metadata: DocumentMetadata,
+        ordinal: int,
+    ) -> DocumentChunk:
+        # One slice per page run; runs on different pages are joined with a blank line.
+        parts: list[str] = []
+        run_start = 0
+        for index, block in enumerate(blocks):
+            if index + 1 == len(blocks) or blocks[index + 1].page != block.page:
+                text, base = texts[block.page]
+                parts.append(text[blocks[run_start].start - base : block.end - base])
+                run_start = index + 1
+        first, last = blocks[0], blocks[-1]
+        extra = {
+            "section_path": list(next((b.section for b in blocks if b.kind != HEADING), first.section)),
+            "char_start": first.start,
+            "char_end": last.end,
+        }
+        if first.page is not None:
+            extra["page_start"] = first.page
+            extra["page_end"] = last.page
+        return DocumentChunk(content="\n\n".join(parts), metadata=metadata, ordinal=ordinal, extra=extra)
+
+
+def _trailing_headings(blocks: list[Block]) -> list[Block]:
+    """Headings at the end of `blocks`, which belong with the content that follows them."""
+    index = len(blocks)
+    while index > 0 and blocks[index - 1].kind == HEADING:
+        index -= 1
+    return blocks[index:]
@@ -0,0 +1,187 @@
+"""Persistent cache of Docling PDF conversions keyed by content hash."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from importlib import metadata as importlib_metadata
+from pathlib import Path
+from typing import Any
+
+from app.core.paths import DOCLING_CACHE_DIR
+from app.core.settings import AppSettings, get_settings
+from app.ingestion.types import DocumentMetadata
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+ENTRY_SUFFIX = ".json"
+
+
+@dataclass(slots=True)
+class CacheStats:
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while block := handle.read(chunk_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache
+def docling_version() -> str:
+    try:
+        return importlib_metadata.version("docling")
+    except importlib_metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ConversionCache:
+    """Directory of converted markdown + front-matter, one JSON file per conversion.
+
+    Entries are written atomically (temp file + rename) and the directory is kept
+    under `max_bytes` by evicting least-recently-used entries; a hit refreshes the
+    entry's mtime, which is the LRU clock.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings | None = None) -> ConversionCache:
+        settings = settings or get_settings()
+        return cls(settings.docling_cache_dir or DOCLING_CACHE_DIR, settings.docling_cache_max_bytes)
+
+    def key_for(self, path: Path, options: dict[str, Any], digest: str | None = None) -> str:
+        """Cache key for `path` converted with `options`; pass `digest` to reuse an already computed file hash."""
+        fingerprint = json.dumps(
+            {
+                "format": CACHE_FORMAT_VERSION,
+                "content": digest or file_digest(path),
+                "docling": docling_version(),
+                "options": options,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, path: Path) -> tuple[DocumentMetadata, str] | None:
+        entry_path = self._entry_path(key)
+        try:
+            data = json.loads(entry_path.read_text(encoding="utf-8"))
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Discarding unreadable conversion cache entry %s: %s", entry_path.name, exc)
+            entry_path.unlink(missing_ok=True)
+            return None
+        return _metadata_from_json(data["metadata"], path), data["body"]
+
+    def put(self, key: str, metadata: DocumentMetadata, body: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"metadata": _metadata_to_json(metadata), "body": body}, default=str)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=ENTRY_SUFFIX)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_name, self._entry_path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least-recently-used entries until the cache fits in `max_bytes`."""
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for entry_path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def purge(self) -> int:
+        removed = 0
+        for entry_path, _ in self._entries():
+            entry_path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def stats(self) -> CacheStats:
+        entries = list(self._entries())
+        return CacheStats(
+            entries=len(entries),
+            total_bytes=sum(stat.st_size for _, stat in entries),
+            max_bytes=self.max_bytes,
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        if not self.directory.exists():
+            return []
+        entries = []
+        for entry_path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            if entry_path.name.startswith(".tmp-"):
+                continue
+            try:
+                entries.append((entry_path, entry_path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+
+def get_conversion_cache(settings: AppSettings | None = None) -> ConversionCache | None:
+    """Return the configured cache, or None when caching is disabled."""
+    settings = settings or get_settings()
+    if not settings.docling_cache_enabled:
+        return None
+    return ConversionCache.from_settings(settings)
+
+
+def _metadata_to_json(metadata: DocumentMetadata) -> dict[str, Any]:
+    return {
+        "doc_id": metadata.doc_id,
+        "doc_type": metadata.doc_type,
+        "title": metadata.title,
+        "audience": metadata.audience,
+        "product_scope": metadata.product_scope,
+        "region_scope": metadata.region_scope,
+        "version": metadata.version,
+        "effective_date": metadata.effective_date.isoformat() if metadata.effective_date else None,
+        "extra": metadata.extra,
+    }
+
+
+def _metadata_from_json(data: dict[str, Any], path: Path) -> DocumentMetadata:
+    effective_date = data.get("effective_date")
+    return DocumentMetadata(
+        doc_id=data["doc_id"],
+        doc_type=data.get("doc_type"),
+        title=data.get("title"),
+        audience=data.get("audience"),
+        product_scope=data.get("product_scope"),
+        region_scope=data.get("region_scope"),
+        version=data.get("version"),
+        effective_date=date.fromisoformat(effective_date) if effective_date else None,
+        source_path=path,
+        extra=data.get("extra") or {},
+    )
@@ -0,0 +1,115 @@
+"""Near-duplicate chunk detection with MinHash signatures and LSH banding."""
+from __future__ import annotations
+
+import hashlib
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.ingestion.types import DocumentChunk
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+@dataclass(slots=True)
+class DedupStats:
+    chunks_seen: int = 0
+    duplicates: int = 0
+    content_bytes_saved: int = 0
+    vector_bytes_saved: int = 0
+
+    def embedding_calls_saved(self, batch_size: int) -> int:
+        """Embedding requests avoided, given chunks are embedded `batch_size` at a time."""
+        kept = self.chunks_seen - self.duplicates
+        return math.ceil(self.chunks_seen / batch_size) - math.ceil(kept / batch_size)
+
+
+@dataclass(slots=True, frozen=True)
+class KeptChunk:
+    """Where a kept chunk lives; the filter holds these rather than the chunks and their content."""
+
+    doc_id: str
+    chunk_index: int
+
+
+class ChunkDeduplicator:
+    """Streaming near-duplicate filter over word shingles.
+
+    Each chunk gets a `num_perm`-slot MinHash signature, split into `bands` bands
+    for LSH bucketing. Chunks sharing a bucket with an earlier kept chunk are
+    compared by estimated Jaccard similarity; at or above `threshold` the new
+    chunk is treated as a duplicate of the earlier one.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        vector_bytes: int = 0,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.vector_bytes = vector_bytes
+        self.stats = DedupStats()
+        rng = np.random.default_rng(seed)
+        # a, b and the shingle hashes are all < 2**32, so a * h + b cannot overflow uint64.
+        self._a = rng.integers(1, MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list[int]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: list[np.ndarray] = []
+        self._kept: list[KeptChunk] = []
+
+    def shingles(self, text: str) -> set[str]:
+        words = text.casefold().split()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)}
+        return {" ".join(words[i : i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+                for shingle in self.shingles(text)
+            ),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+    def find_duplicate(self, chunk: DocumentChunk) -> KeptChunk | None:
+        """Return the kept chunk `chunk` duplicates, or register `chunk` as kept and return None."""
+        self.stats.chunks_seen += 1
+        signature = self.signature(chunk.content)
+        band_keys = [signature[band * self.rows : (band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+        candidates: set[int] = set()
+        for buckets, key in zip(self._buckets, band_keys):
+            candidates.update(buckets.get(key, ()))
+        best, best_similarity = None, 0.0
+        for index in sorted(candidates):
+            similarity = float(np.mean(self._signatures[index] == signature))
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = index, similarity
+        if best is not None:
+            self.stats.duplicates += 1
+            self.stats.content_bytes_saved += len(chunk.content.encode("utf-8"))
+            self.stats.vector_bytes_saved += self.vector_bytes
+            return self._kept[best]
+
+        index = len(self._kept)
+        self._kept.append(KeptChunk(chunk.metadata.doc_id, chunk.ordinal))
+        self._signatures.append(signature)
+        for buckets, key in zip(self._buckets, band_keys):
+            buckets[key].append(index)
+        return None
@@ -4,10 +4,11 @@ from __future__ import annotations
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Iterator
 
 import yaml
 
+from app.ingestion.chunker import StructureChunker
 from app.ingestion.types import DocumentChunk, DocumentMetadata
 
 FRONT_MATTER_PATTERN = re.compile(r"^---\n(.*?)\n---\n(.*)$", re.DOTALL)
@@ -33,25 +34,10 @@ def load_markdown(path: Path) -> tuple[DocumentMetadata, str]:
     return parse_front_matter(raw, path)
 
 
-def chunk_markdown(path: Path, chunk_size: int, chunk_overlap: int) -> Iterable[DocumentChunk]:
-    """Yield markdown content chunks with inherited metadata."""
+def chunk_markdown(path: Path, chunk_size: int, chunk_overlap: int) -> Iterator[DocumentChunk]:
+    """Yield structure-aware chunks of the body, with offsets into the body after front-matter."""
     metadata, body = load_markdown(path)
-    tokens = body.split()
-    if not tokens:
-        return []
-
-    chunks: list[DocumentChunk] = []
-    start = 0
-    ordinal = 0
-    while start < len(tokens):
-        end = min(len(tokens), start + chunk_size)
-        chunk_text = " ".join(tokens[start:end])
-        chunks.append(DocumentChunk(content=chunk_text, metadata=metadata, ordinal=ordinal))
-        ordinal += 1
-        if end == len(tokens):
-            break
-        start = max(end - chunk_overlap, start + 1)
-    return chunks
+    return StructureChunker(chunk_size, chunk_overlap).chunk_text(body, metadata)
 
 
 def _metadata_from_dict(data: dict[str, object], path: Path) -> DocumentMetadata:
@@ -1,47 +1,123 @@
 """PDF ingestion via Docling."""
 from __future__ import annotations
 
+from collections.abc import Iterator
 from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
 
+import pypdfium2
 from docling.document_converter import DocumentConverter
 
-from app.ingestion.loaders.markdown_loader import FRONT_MATTER_PATTERN, parse_front_matter
+from app.ingestion.chunker import PAGE_SEPARATOR, StructureChunker
+from app.ingestion.conversion_cache import ConversionCache, file_digest, get_conversion_cache
+from app.ingestion.loaders.markdown_loader import parse_front_matter
 from app.ingestion.types import DocumentChunk, DocumentMetadata
 
+# Part of the conversion cache key: bump when converter or export settings change.
+CONVERTER_OPTIONS = {"converter": "default", "export": "markdown"}
+
 
 @lru_cache
 def _converter() -> DocumentConverter:
     return DocumentConverter()
 
 
-def load_pdf(path: Path) -> tuple[DocumentMetadata, str]:
-    result = _converter().convert(path)
+def page_count(path: Path) -> int:
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def iter_pdf_windows(
+    path: Path,
+    window_pages: int,
+    cache: ConversionCache | None = None,
+) -> Iterator[tuple[DocumentMetadata, list[tuple[int, str]]]]:
+    """Convert `path` `window_pages` pages at a time, yielding per-page markdown.
+
+    Only one window's Docling document is alive at a time, so memory stays bounded
+    by the window size rather than the document length. `window_pages <= 0`
+    converts the whole document as a single window. Front-matter is parsed from
+    the first page only and that metadata is repeated (and cached) for every window. The
+    file is hashed once; every window's cache key is derived from that digest.
+    """
+    cache = cache or get_conversion_cache()
+    digest = file_digest(path) if cache is not None else None
+    total = page_count(path)
+    window = window_pages if window_pages > 0 else max(total, 1)
+    metadata: DocumentMetadata | None = None
+    for first in range(1, total + 1, window):
+        last = min(total, first + window - 1)
+        window_metadata, pages = _load_window(path, first, last, cache, digest, metadata)
+        metadata = metadata or window_metadata
+        yield metadata, pages
+
+
+def _load_window(
+    path: Path,
+    first: int,
+    last: int,
+    cache: ConversionCache | None,
+    digest: str | None = None,
+    metadata: DocumentMetadata | None = None,
+) -> tuple[DocumentMetadata, list[tuple[int, str]]]:
+    """Convert (or fetch from the cache) pages `first`-`last`.
+
+    Only the window starting at page 1 can carry front-matter; later windows take
+    `metadata`, the document's metadata from that first window.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key_for(path, {**CONVERTER_OPTIONS, "page_range": [first, last]}, digest)
+        cached = cache.get(key, path)
+        if cached is not None:
+            cached_metadata, body = cached
+            return cached_metadata, list(zip(range(first, last + 1), body.split(PAGE_SEPARATOR)))
+
+    pages = _convert_pages(path, first, last)
+    if first == 1:
+        metadata, first_page = parse_front_matter(pages[0][1] if pages else "", path)
+        if pages:
+            pages[0] = (pages[0][0], first_page)
+    elif metadata is None:
+        metadata, _ = parse_front_matter("", path)
+    if cache is not None and key is not None:
+        cache.put(key, metadata, PAGE_SEPARATOR.join(text for _, text in pages))
+    return metadata, pages
+
+
+def _convert_pages(path: Path, first: int, last: int) -> list[tuple[int, str]]:
+    result = _converter().convert(path, page_range=(first, last))
     if result.errors:
-        raise RuntimeError(f"Docling reported errors converting {path}: {result.errors}")
-    document = result.document or result.legacy_document
+        raise RuntimeError(f"Docling reported errors converting {path} pages {first}-{last}: {result.errors}")
+    document = result.document
     if document is None:
-        raise RuntimeError(f"Docling failed to produce a document for {path}")
-    markdown = document.export_to_markdown()
-    metadata, body = parse_front_matter(markdown, path)
-    return metadata, body
-
-
-def chunk_pdf(path: Path, chunk_size: int, chunk_overlap: int) -> Iterable[DocumentChunk]:
-    metadata, body = load_pdf(path)
-    tokens = body.split()
-    chunks: list[DocumentChunk] = []
-    if not tokens:
-        return chunks
-    start = 0
-    ordinal = 0
-    while start < len(tokens):
-        end = min(len(tokens), start + chunk_size)
-        chunk_text = " ".join(tokens[start:end])
-        chunks.append(DocumentChunk(content=chunk_text, metadata=metadata, ordinal=ordinal))
-        ordinal += 1
-        if end == len(tokens):
-            break
-        start = max(end - chunk_overlap, start + 1)
-    return chunks
+        raise RuntimeError(f"Docling failed to produce a document for {path} pages {first}-{last}")
+    return [
+        (page_no, document.export_to_markdown(page_no=page_no).replace(PAGE_SEPARATOR, " "))
+        for page_no in range(first, last + 1)
+    ]
+
+
+def chunk_pdf(
+    path: Path,
+    chunk_size: int,
+    chunk_overlap: int,
+    window_pages: int = 0,
+    cache: ConversionCache | None = None,
+) -> Iterator[DocumentChunk]:
+    """Yield chunks as each page window is converted, tagged with their page span."""
+    windows = iter_pdf_windows(path, window_pages, cache)
+    first_window = next(windows, None)
+    if first_window is None:
+        return
+    metadata, first_pages = first_window
+
+    def pages() -> Iterator[tuple[int, str]]:
+        yield from first_pages
+        for _, window in windows:
+            yield from window
+
+    yield from StructureChunker(chunk_size, chunk_overlap).chunk_pages(pages(), metadata)
@@ -1,28 +1,63 @@
 """Ingestion pipeline orchestrating structured and unstructured corpus loading."""
 from __future__ import annotations
 
-import asyncio
+import json
 import logging
-from datetime import date
+import time
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Iterable
 
-from langchain_openai import OpenAIEmbeddings
-from sqlalchemy import delete
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import delete, select, text
 
 from app.core.paths import CORPUS_DIR, STRUCTURED_DIR, UNSTRUCTURED_DIRS, iter_pdf_paths
 from app.core.settings import AppSettings, get_settings
-from app.db.models import ApiEndpoint, Document, DocumentChunk, ErrorCode, Plan, Policy, Product
-from app.db.session import get_session
+from app.core.telemetry import record_stage, track
+from app.db.models import (
+    EMBEDDING_DIM,
+    ApiEndpoint,
+    ChunkEmbedding,
+    Document,
+    DocumentChunk,
+    EmbeddingModel,
+    ErrorCode,
+    IngestionVersion,
+    Plan,
+    Policy,
+    Product,
+)
+from app.db.bulk import ChunkCopyBuffer
+from app.db.partitions import (
+    attach_staging_partition,
+    create_staging_partition,
+    drop_partition,
+    ensure_collection,
+    validate_collection,
+)
+from app.db.session import get_replica_router, get_session
 from app.db.utils import init_db
+from app.ingestion.dedup import ChunkDeduplicator, DedupStats, KeptChunk
 from app.ingestion.loaders.markdown_loader import chunk_markdown
 from app.ingestion.loaders.pdf_loader import chunk_pdf
 from app.ingestion.loaders.structured_loader import load_structured_records
 from app.ingestion.loaders.openapi_loader import load_openapi_records
 from app.ingestion.types import DocumentChunk as Chunk, StructuredRecord
+from app.providers.factory import (
+    ProviderConfigurationError,
+    create_embeddings,
+    embedding_model_name,
+    meter_embeddings,
+)
+from app.providers.metering import MeteredEmbeddings
+from app.retrieval.active_model import COLUMN_STORAGE
+from app.retrieval.endpoint_index import get_endpoint_index
 
 logger = logging.getLogger(__name__)
 
+# Ids for staged documents, which are only inserted when the collection is swapped in.
+NEXT_DOCUMENT_ID = text("SELECT nextval(pg_get_serial_sequence('documents', 'id'))")
+
 
 class IngestionError(RuntimeError):
     pass
@@ -31,33 +66,105 @@ class IngestionError(RuntimeError):
 class IngestionPipeline:
     """Top-level ingestion workflow."""
 
-    def __init__(self, settings: AppSettings | None = None) -> None:
+    def __init__(
+        self,
+        settings: AppSettings | None = None,
+        embeddings: Embeddings | None = None,
+        collection: str | None = None,
+    ) -> None:
         self.settings = settings or get_settings()
-        self._embeddings: OpenAIEmbeddings | None = None
+        self.collection = validate_collection(collection or self.settings.vector_collection)
+        self._embeddings = meter_embeddings(embeddings) if embeddings is not None else None
+        self.dedup_stats: DedupStats | None = None
 
     @property
-    def embeddings(self) -> OpenAIEmbeddings:
-        if not self.settings.openai_api_key:
-            raise IngestionError("OPENAI_API_KEY is not configured. Update backend/.env before running ingestion.")
+    def embeddings(self) -> MeteredEmbeddings:
         if self._embeddings is None:
-            base_url = str(self.settings.openai_api_base) if self.settings.openai_api_base else None
-            self._embeddings = OpenAIEmbeddings(
-                api_key=self.settings.openai_api_key,
-                model=self.settings.openai_embedding_model,
-                base_url=base_url,
-            )
+            try:
+                self._embeddings = create_embeddings(self.settings)
+            except ProviderConfigurationError as exc:
+                raise IngestionError(str(exc)) from exc
         return self._embeddings
 
     async def run_full(self) -> None:
-        """Execute structured + unstructured ingestion."""
+        """Execute structured + unstructured ingestion.
+
+        Chunks are loaded into a staging table in committed batches; the structured
+        tables, the collection's documents and its partition are then replaced in one
+        transaction, so readers see either the previous index or the new one. A failed
+        run leaves the live data untouched, and the next run discards its staging table.
+        """
         await init_db()
         async with get_session() as session:
-            await self._clear_existing(session)
-            await self._ingest_structured(session)
-            await self._ingest_openapi(session)
+            await ensure_collection(session, self.collection, self.settings)
+            staging = await create_staging_partition(session, self.collection, self.settings)
+            await session.commit()
+
+        documents = await self._ingest_unstructured(staging)
+        async with get_session() as session:
+            with track("ingest_clear"):
+                await self._clear_existing(session)
+            with track("ingest_structured"):
+                await self._ingest_structured(session)
+            with track("ingest_openapi"):
+                await self._ingest_openapi(session)
+            with track("ingest_swap"):
+                await self._swap_in(session, documents)
+                await session.commit()
+        # Rebuild the in-process path-template index from the freshly loaded spec.
+        get_endpoint_index.cache_clear()
+
+        await self._register_embedding_model()
+        await self._record_version()
+
+    async def _register_embedding_model(self) -> None:
+        """Record the configured model as the active one.
+
+        When this collection is the whole index, other models' vectors went with the old
+        chunks and their rows are dropped. Otherwise the other collections' model state
+        (the active model, migration checkpoints) is left as it is.
+        """
+        name = embedding_model_name(self.settings)
+        async with get_session() as session:
+            others = await session.scalar(
+                select(DocumentChunk.id).where(DocumentChunk.collection != self.collection).limit(1)
+            )
+            if others is None:
+                await session.execute(delete(EmbeddingModel).where(EmbeddingModel.name != name))
+            else:
+                active = await session.scalar(select(EmbeddingModel).where(EmbeddingModel.status == "active"))
+                if active is not None:
+                    if active.name != name or active.storage != COLUMN_STORAGE:
+                        logger.warning(
+                            "Collection %s was embedded with %s, but %s (%s storage) serves queries for every "
+                            "collection; its chunks are not searchable until they are embedded with %s",
+                            self.collection,
+                            name,
+                            active.name,
+                            active.storage,
+                            active.name,
+                        )
+                    return
+            await session.merge(
+                EmbeddingModel(
+                    name=name,
+                    storage=COLUMN_STORAGE,
+                    status="active",
+                    checkpoint_chunk_id=0,
+                    embedded_count=0,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
             await session.commit()
 
-        await self._ingest_unstructured()
+    async def _record_version(self) -> None:
+        """Bump the ingestion version so replica reads wait until they have replayed this run."""
+        async with get_session() as session:
+            version = IngestionVersion(completed_at=datetime.now(timezone.utc))
+            session.add(version)
+            await session.commit()
+        get_replica_router().note_write_version(version.id)
+        logger.info("Recorded ingestion version %d", version.id)
 
     async def _clear_existing(self, session) -> None:
         logger.info("Clearing existing structured data")
@@ -66,8 +173,17 @@ class IngestionPipeline:
         await session.execute(delete(Plan))
         await session.execute(delete(Product))
         await session.execute(delete(Policy))
-        await session.execute(delete(DocumentChunk))
-        await session.execute(delete(Document))
+
+    async def _swap_in(self, session, documents: list[Document]) -> None:
+        """Replace the collection's documents and partition with the staged ones, in the caller's transaction."""
+        logger.info("Replacing collection %s with %d staged documents", self.collection, len(documents))
+        await session.execute(delete(ChunkEmbedding).where(ChunkEmbedding.collection == self.collection))
+        # Dropping the partition first keeps the document delete from cascading row by row.
+        await drop_partition(session, self.collection, self.settings)
+        await session.execute(delete(Document).where(Document.collection == self.collection))
+        session.add_all(documents)
+        await session.flush()
+        await attach_staging_partition(session, self.collection, self.settings)
 
     async def _ingest_structured(self, session) -> None:
         logger.info("Loading structured corpus tables")
@@ -97,33 +213,37 @@ class IngestionPipeline:
         else:
             logger.warning("Unhandled structured table %s", table)
 
-    async def _ingest_unstructured(self) -> None:
+    async def _ingest_unstructured(self, staging: str) -> list[Document]:
+        """Load every chunk into the `staging` table and return the documents `_swap_in` inserts.
+
+        Document ids are drawn from the sequence up front, since the live rows for the
+        same doc ids stay in place until the swap.
+        """
         logger.info("Ingesting markdown corpus")
         markdown_files = list(_iter_markdown_paths())
         pdf_files = list(iter_pdf_paths())
         logger.info("Found %d markdown files and %d PDFs", len(markdown_files), len(pdf_files))
 
-        chunks: list[Chunk] = []
-        for path in markdown_files:
-            chunks.extend(chunk_markdown(path, self.settings.chunk_size, self.settings.chunk_overlap))
-        for path in pdf_files:
-            chunks.extend(chunk_pdf(path, self.settings.chunk_size, self.settings.chunk_overlap))
-
-        if not chunks:
-            logger.warning("No chunks produced from corpus")
-            return
-
-        logger.info("Embedding %d chunks", len(chunks))
+        chunk_count = 0
         batch_size = self.settings.ingestion_batch_size
+        commit_size = max(self.settings.ingestion_commit_size, batch_size)
+        chunks = self._iter_chunks(markdown_files, pdf_files)
+        dedup = self._deduplicator()
+        provenance: dict[KeptChunk, list[dict]] = {}
+        if dedup is not None:
+            chunks = self._iter_unique(chunks, dedup, provenance)
+        buffer = ChunkCopyBuffer()
         async with get_session() as session:
             documents_index: dict[str, Document] = {}
-            for start in range(0, len(chunks), batch_size):
-                batch = chunks[start : start + batch_size]
-                embeddings = await asyncio.to_thread(self.embeddings.embed_documents, [c.content for c in batch])
+            for batch in _batched(chunks, batch_size):
+                chunk_count += len(batch)
+                with track("ingest_embed"):
+                    embeddings = await self.embeddings.aembed_documents_array([c.content for c in batch])
                 for chunk, embedding in zip(batch, embeddings):
                     doc = documents_index.get(chunk.metadata.doc_id)
                     if doc is None:
                         doc = Document(
+                            collection=self.collection,
                             doc_id=chunk.metadata.doc_id,
                             title=chunk.metadata.title,
                             doc_type=chunk.metadata.doc_type,
@@ -133,20 +253,162 @@ class IngestionPipeline:
                             version=chunk.metadata.version,
                             effective_date=chunk.metadata.effective_date,
                         )
-                        session.add(doc)
-                        await session.flush()
+                        doc.id = await session.scalar(NEXT_DOCUMENT_ID)
                         documents_index[chunk.metadata.doc_id] = doc
-                    chunk_record = DocumentChunk(
+                    buffer.add(
+                        collection=self.collection,
                         document_id=doc.id,
                         chunk_index=chunk.ordinal,
                         content=chunk.content,
-                        chunk_metadata={"source_path": str(chunk.metadata.source_path), **chunk.metadata.extra},
+                        metadata=_chunk_metadata(chunk),
                         embedding=embedding,
                     )
-                    session.add(chunk_record)
+                if buffer.rows >= commit_size:
+                    await self._write_chunks(session, buffer, staging)
+            if not chunk_count:
+                logger.warning("No chunks produced from corpus")
+                return []
+            await self._write_chunks(session, buffer, staging)
+            # Duplicates can arrive after their kept copy was written; attach provenance last.
+            if provenance:
+                with track("ingest_write"):
+                    await _attach_provenance(session, staging, provenance, documents_index)
+                    await session.commit()
+
+        logger.info("Unstructured ingestion complete: %d chunks", chunk_count)
+        if dedup is not None:
+            self.dedup_stats = dedup.stats
+            logger.info(
+                "Deduplication dropped %d of %d chunks: %.1f KiB of text and %.1f KiB of vectors not stored, "
+                "%d embedding calls saved",
+                dedup.stats.duplicates,
+                dedup.stats.chunks_seen,
+                dedup.stats.content_bytes_saved / 1024,
+                dedup.stats.vector_bytes_saved / 1024,
+                dedup.stats.embedding_calls_saved(batch_size),
+            )
+        return list(documents_index.values())
+
+    async def _write_chunks(self, session, buffer: ChunkCopyBuffer, staging: str) -> None:
+        """COPY the buffered chunk rows to `staging` and commit, so memory stays bounded by `ingestion_commit_size`."""
+        with track("ingest_write"):
+            rows = await buffer.copy_to(session, staging)
             await session.commit()
+        logger.debug("Committed %d chunks", rows)
+
+    def _deduplicator(self) -> ChunkDeduplicator | None:
+        if not self.settings.dedup_enabled:
+            return None
+        return ChunkDeduplicator(
+            threshold=self.settings.dedup_threshold,
+            num_perm=self.settings.dedup_num_perm,
+            bands=self.settings.dedup_bands,
+            shingle_size=self.settings.dedup_shingle_size,
+            vector_bytes=EMBEDDING_DIM * 4,
+        )
+
+    def _iter_unique(
+        self,
+        chunks: Iterable[Chunk],
+        dedup: ChunkDeduplicator,
+        provenance: dict[KeptChunk, list[dict]] | None = None,
+    ) -> Iterator[Chunk]:
+        """Drop near-duplicate chunks before embedding, recording their documents against the kept copy.
+
+        `provenance` maps each kept chunk that has duplicates elsewhere to its `also_in` entries.
+        """
+        if provenance is None:
+            provenance = {}
+        elapsed = 0.0
+        for chunk in chunks:
+            started = time.perf_counter()
+            kept = dedup.find_duplicate(chunk)
+            elapsed += time.perf_counter() - started
+            if kept is None:
+                yield chunk
+                continue
+            also_in = provenance.get(kept, [])
+            if chunk.metadata.doc_id != kept.doc_id and all(
+                source["doc_id"] != chunk.metadata.doc_id for source in also_in
+            ):
+                also_in.append(
+                    {
+                        "doc_id": chunk.metadata.doc_id,
+                        "source_path": str(chunk.metadata.source_path),
+                        "chunk_index": chunk.ordinal,
+                    }
+                )
+                provenance[kept] = also_in
+        record_stage("ingest_dedup", elapsed)
+
+    def _iter_chunks(self, markdown_files: list[Path], pdf_files: list[Path]) -> Iterator[Chunk]:
+        """Chunks for the whole corpus, produced lazily so PDFs are converted window by window."""
+        for path in markdown_files:
+            yield from _timed(
+                "ingest_chunk_markdown",
+                chunk_markdown(path, self.settings.chunk_size, self.settings.chunk_overlap),
+            )
+        for path in pdf_files:
+            yield from _timed(
+                "ingest_chunk_pdf",
+                chunk_pdf(
+                    path,
+                    self.settings.chunk_size,
+                    self.settings.chunk_overlap,
+                    window_pages=self.settings.pdf_window_pages,
+                ),
+            )
+
+
+def _batched(items: Iterable[Chunk], size: int) -> Iterator[list[Chunk]]:
+    batch: list[Chunk] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _attach_provenance(
+    session, staging: str, provenance: dict[KeptChunk, list[dict]], documents: dict[str, Document]
+) -> None:
+    """Merge every kept chunk's `also_in` into its staged metadata in one set-based UPDATE."""
+    kept = list(provenance)
+    await session.execute(
+        text(
+            f"UPDATE {staging} AS c "
+            "SET chunk_metadata = (COALESCE(c.chunk_metadata::jsonb, '{}'::jsonb) "
+            "|| jsonb_build_object('also_in', p.also_in))::json "
+            "FROM unnest(CAST(:document_ids AS integer[]), CAST(:chunk_indexes AS integer[]), "
+            "CAST(:also_in AS jsonb[])) AS p(document_id, chunk_index, also_in) "
+            "WHERE c.document_id = p.document_id AND c.chunk_index = p.chunk_index"
+        ),
+        {
+            "document_ids": [documents[handle.doc_id].id for handle in kept],
+            "chunk_indexes": [handle.chunk_index for handle in kept],
+            "also_in": [json.dumps(provenance[handle], ensure_ascii=False) for handle in kept],
+        },
+    )
+
+
+def _chunk_metadata(chunk: Chunk) -> dict:
+    return {"source_path": str(chunk.metadata.source_path), **chunk.metadata.extra, **chunk.extra}
+
 
-        logger.info("Unstructured ingestion complete")
+def _timed(stage: str, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+    """Record the time spent producing `chunks` (excluding the consumer's time) as `stage`."""
+    iterator = iter(chunks)
+    elapsed = 0.0
+    while True:
+        started = time.perf_counter()
+        chunk = next(iterator, None)
+        elapsed += time.perf_counter() - started
+        if chunk is None:
+            break
+        yield chunk
+    record_stage(stage, elapsed)
 
 
 def _coerce_date(value) -> date | None:
@@ -0,0 +1,253 @@
+"""Online migration of chunk vectors to a new embedding model.
+
+Vectors for the target model are written to `chunk_embeddings` in throttled
+batches while retrieval keeps serving the active model. Each batch commits its
+vectors together with the migration checkpoint, so a crashed job resumes after
+the last committed chunk. Once every chunk has a target vector, a partial HNSW
+index for the target model is built on `chunk_embeddings` and the active model
+is switched in a single transaction.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import func, literal_column, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.settings import AppSettings, get_settings
+from app.core.telemetry import track
+from app.db.models import ChunkEmbedding, DocumentChunk, EmbeddingModel
+from app.db.session import get_engine, get_session
+from app.db.utils import init_db
+from app.providers.factory import create_embeddings, embedding_model_name, meter_embeddings
+from app.retrieval.active_model import COLUMN_STORAGE, TABLE_STORAGE
+
+logger = logging.getLogger(__name__)
+
+# pgvector's HNSW index takes `halfvec` up to this many dimensions.
+MAX_INDEX_DIMENSIONS = 4000
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class MigrationProgress:
+    model: str
+    status: str
+    embedded: int
+    total: int
+
+    @property
+    def coverage(self) -> float:
+        return 1.0 if self.total == 0 else self.embedded / self.total
+
+
+class ReembeddingJob:
+    """Embed every chunk with `target_model` and activate it once coverage is complete."""
+
+    def __init__(
+        self,
+        target_model: str,
+        settings: AppSettings | None = None,
+        embeddings: Embeddings | None = None,
+        batch_size: int | None = None,
+        pause_seconds: float | None = None,
+    ) -> None:
+        self.settings = settings or get_settings()
+        self.target_model = target_model
+        self.batch_size = batch_size or self.settings.reembed_batch_size
+        self.pause_seconds = self.settings.reembed_pause_seconds if pause_seconds is None else pause_seconds
+        self._embeddings = meter_embeddings(embeddings) if embeddings is not None else None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if self._embeddings is None:
+            self._embeddings = create_embeddings(self.settings, model=self.target_model)
+        return self._embeddings
+
+    async def run(self, activate: bool = True) -> MigrationProgress:
+        await init_db()
+        checkpoint = await self._start()
+        while True:
+            async with get_session() as session:
+                rows = (
+                    await session.execute(
+                        select(DocumentChunk.id, DocumentChunk.collection, DocumentChunk.content)
+                        .where(DocumentChunk.id > checkpoint)
+                        .order_by(DocumentChunk.id)
+                        .limit(self.batch_size)
+                    )
+                ).all()
+            if not rows:
+                break
+            with track("reembed_embed"):
+                vectors = await self.embeddings.aembed_documents([row.content for row in rows])
+            checkpoint = rows[-1].id
+            with track("reembed_write"):
+                await self._write_batch([(row.id, row.collection) for row in rows], vectors, checkpoint)
+            logger.info("Re-embedded %d chunks with %s (checkpoint %d)", len(rows), self.target_model, checkpoint)
+            if self.pause_seconds:
+                await asyncio.sleep(self.pause_seconds)
+
+        progress = await self.progress()
+        if activate and progress.embedded >= progress.total:
+            await self.activate()
+            progress.status = "active"
+        return progress
+
+    async def progress(self) -> MigrationProgress:
+        async with get_session() as session:
+            total = await session.scalar(select(func.count(DocumentChunk.id)))
+            embedded = await session.scalar(
+                select(func.count(ChunkEmbedding.chunk_id)).where(ChunkEmbedding.model == self.target_model)
+            )
+            state = await session.get(EmbeddingModel, self.target_model)
+        return MigrationProgress(
+            model=self.target_model,
+            status=state.status if state else "absent",
+            embedded=int(embedded or 0),
+            total=int(total or 0),
+        )
+
+    async def activate(self) -> None:
+        """Build the target model's ANN index, then atomically make it the one that serves queries."""
+        progress = await self.progress()
+        if progress.embedded < progress.total:
+            raise MigrationError(
+                f"{self.target_model} covers {progress.embedded}/{progress.total} chunks; refusing to activate"
+            )
+        await self.build_index()
+        async with get_session() as session:
+            now = datetime.now(timezone.utc)
+            await session.execute(
+                update(EmbeddingModel)
+                .where(EmbeddingModel.status == "active", EmbeddingModel.name != self.target_model)
+                .values(status="retired", updated_at=now)
+            )
+            await session.execute(
+                update(EmbeddingModel)
+                .where(EmbeddingModel.name == self.target_model)
+                .values(status="active", updated_at=now)
+            )
+            await session.commit()
+        logger.info("Activated embedding model %s", self.target_model)
+
+    async def build_index(self) -> str | None:
+        """Create the target model's partial HNSW index, without blocking writes; returns its name."""
+        async with get_session() as session:
+            dimensions = await session.scalar(
+                select(func.vector_dims(ChunkEmbedding.embedding))
+                .where(ChunkEmbedding.model == self.target_model)
+                .limit(1)
+            )
+        if dimensions is None:
+            return None
+        if dimensions > MAX_INDEX_DIMENSIONS:
+            logger.warning(
+                "%s has %d dimensions; HNSW indexes %d at most, so its queries will scan",
+                self.target_model,
+                dimensions,
+                MAX_INDEX_DIMENSIONS,
+            )
+            return None
+        async with get_engine().connect() as connection:
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            with track("reembed_index"):
+                await connection.execute(text(model_index_ddl(self.target_model, dimensions)))
+        name = model_index_name(self.target_model)
+        logger.info("Built %s for %s (%d dimensions)", name, self.target_model, dimensions)
+        return name
+
+    async def _start(self) -> int:
+        """Register the current and target models; return the checkpoint to resume from."""
+        async with get_session() as session:
+            now = datetime.now(timezone.utc)
+            active = await session.scalar(select(EmbeddingModel).where(EmbeddingModel.status == "active"))
+            if active is None:
+                # Databases ingested before migrations existed: the column holds the configured model.
+                active = EmbeddingModel(
+                    name=embedding_model_name(self.settings),
+                    storage=COLUMN_STORAGE,
+                    status="active",
+                    updated_at=now,
+                )
+                session.add(active)
+            if active.name == self.target_model:
+                raise MigrationError(f"{self.target_model} is already the active embedding model")
+            state = await session.get(EmbeddingModel, self.target_model)
+            if state is None:
+                state = EmbeddingModel(
+                    name=self.target_model,
+                    storage=TABLE_STORAGE,
+                    status="migrating",
+                    checkpoint_chunk_id=0,
+                    embedded_count=0,
+                    updated_at=now,
+                )
+                session.add(state)
+            elif state.storage != TABLE_STORAGE:
+                raise MigrationError(f"{self.target_model} is stored in the chunk column and cannot be migrated to")
+            else:
+                state.status = "migrating"
+                state.updated_at = now
+            checkpoint = state.checkpoint_chunk_id
+            await session.commit()
+        if checkpoint:
+            logger.info("Resuming migration to %s after chunk %d", self.target_model, checkpoint)
+        return checkpoint
+
+    async def _write_batch(self, chunks: list[tuple[int, str]], vectors: list[list[float]], checkpoint: int) -> None:
+        """Persist one batch of vectors and advance the checkpoint in the same transaction.
+
+        `embedded_count` grows only by rows that were new, so resumed or repeated runs
+        do not count a chunk twice.
+        """
+        async with get_session() as session:
+            stmt = insert(ChunkEmbedding).values(
+                [
+                    {"chunk_id": chunk_id, "model": self.target_model, "collection": collection, "embedding": vector}
+                    for (chunk_id, collection), vector in zip(chunks, vectors)
+                ]
+            )
+            result = await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[ChunkEmbedding.chunk_id, ChunkEmbedding.model],
+                    set_={"embedding": stmt.excluded.embedding, "collection": stmt.excluded.collection},
+                ).returning(_INSERTED)
+            )
+            inserted = sum(1 for (was_inserted,) in result if was_inserted)
+            await session.execute(
+                update(EmbeddingModel)
+                .where(EmbeddingModel.name == self.target_model)
+                .values(
+                    checkpoint_chunk_id=checkpoint,
+                    embedded_count=EmbeddingModel.embedded_count + inserted,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+            await session.commit()
+
+
+# True for rows the upsert inserted, false for rows it updated (Postgres leaves xmax at 0 on insert).
+_INSERTED = literal_column("xmax = 0")
+
+
+def model_index_name(model: str) -> str:
+    return f"ix_chunk_embeddings_hnsw_{hashlib.sha256(model.encode('utf-8')).hexdigest()[:16]}"
+
+
+def model_index_ddl(model: str, dimensions: int) -> str:
+    """Partial HNSW index over one model's vectors, on the expression `vector_distance` queries with."""
+    quoted = model.replace("'", "''")
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {model_index_name(model)} ON chunk_embeddings "
+        f"USING hnsw ((embedding::halfvec({dimensions})) halfvec_cosine_ops) WHERE model = '{quoted}'"
+    )
@@ -0,0 +1,165 @@
+"""Export the corpus index to a portable snapshot file and restore one into Postgres.
+
+Restoring a snapshot replaces Docling conversion and re-embedding: rows are
+bulk-loaded with binary COPY straight from the memory-mapped vector block.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Date, delete, inspect, select
+
+from app.core.settings import AppSettings, get_settings
+from app.core.telemetry import track
+from app.db.bulk import ChunkCopyBuffer
+from app.db.partitions import ensure_collection
+from app.db.models import (
+    EMBEDDING_DIM,
+    ApiEndpoint,
+    Base,
+    ChunkEmbedding,
+    Document,
+    DocumentChunk,
+    EmbeddingModel,
+    ErrorCode,
+    IngestionVersion,
+    Plan,
+    Policy,
+    Product,
+)
+from app.db.session import get_replica_router, get_session
+from app.db.utils import init_db
+from app.retrieval.active_model import COLUMN_STORAGE, ActiveModelResolver
+from app.retrieval.endpoint_index import get_endpoint_index
+from app.retrieval.stores.snapshot import Snapshot, SnapshotError, SnapshotManifest, SnapshotWriter
+from app.retrieval.vector import join_vectors, vector_column
+
+logger = logging.getLogger(__name__)
+
+STRUCTURED_TABLES: tuple[type[Base], ...] = (Plan, Product, ErrorCode, Policy, ApiEndpoint)
+
+
+def _row(instance: Base) -> dict[str, Any]:
+    return {attr.key: getattr(instance, attr.key) for attr in inspect(type(instance)).column_attrs if attr.key != "id"}
+
+
+def _restore(model: type[Base], row: dict[str, Any]) -> Base:
+    columns = model.__table__.columns
+    values = {
+        key: date.fromisoformat(value) if value is not None and isinstance(columns[key].type, Date) else value
+        for key, value in row.items()
+    }
+    return model(**values)
+
+
+async def export_snapshot(path: Path, settings: AppSettings | None = None) -> SnapshotManifest:
+    """Write the primary's current index, with the active model's vectors, to `path`."""
+    settings = settings or get_settings()
+    model = await ActiveModelResolver(settings, refresh_seconds=0).get()
+    if model.storage != COLUMN_STORAGE:
+        # Imports restore into document_chunks.embedding, which only a column-storage model's vectors fit.
+        raise SnapshotError(
+            f"Active embedding model {model.name} uses {model.storage} storage; "
+            "only column-storage models can be exported to a snapshot"
+        )
+    vector = vector_column(model)
+    records: dict[str, Any] = {"tables": {}, "documents": [], "chunks": []}
+    with SnapshotWriter(path) as writer, track("snapshot_export"):
+        async with get_session() as session:
+            for table in STRUCTURED_TABLES:
+                rows = (await session.scalars(select(table).order_by(table.id))).all()
+                records["tables"][table.__tablename__] = [_row(row) for row in rows]
+            positions: dict[int, int] = {}
+            for document in (await session.scalars(select(Document).order_by(Document.id))).all():
+                positions[document.id] = len(records["documents"])
+                records["documents"].append(_row(document))
+            stmt = join_vectors(
+                select(
+                    DocumentChunk.document_id,
+                    DocumentChunk.chunk_index,
+                    DocumentChunk.content,
+                    DocumentChunk.chunk_metadata,
+                    vector,
+                )
+                .where(vector.is_not(None))
+                .order_by(DocumentChunk.document_id, DocumentChunk.chunk_index),
+                model,
+            )
+            result = await session.stream(stmt.execution_options(yield_per=settings.ingestion_commit_size))
+            async for rows in result.partitions():
+                writer.add(np.stack([row[4] for row in rows]))
+                records["chunks"].extend(
+                    [positions[document_id], chunk_index, content, metadata or {}]
+                    for document_id, chunk_index, content, metadata, _ in rows
+                )
+        manifest = writer.finish(records, model.name)
+    logger.info(
+        "Exported %d chunks from %d documents (%s, %d dimensions) to %s",
+        manifest.chunks,
+        manifest.documents,
+        manifest.embedding_model,
+        manifest.dimensions,
+        path,
+    )
+    return manifest
+
+
+async def import_snapshot(path: Path, settings: AppSettings | None = None, verify: bool = True) -> SnapshotManifest:
+    """Replace the database's index with the snapshot's in one transaction; chunks are loaded with binary COPY."""
+    settings = settings or get_settings()
+    snapshot = Snapshot.open(path, verify=verify)
+    manifest = snapshot.manifest
+    if manifest.dimensions != EMBEDDING_DIM:
+        raise SnapshotError(
+            f"Snapshot vectors have {manifest.dimensions} dimensions; document_chunks.embedding holds {EMBEDDING_DIM}"
+        )
+    records = snapshot.records()
+    vectors = snapshot.vectors()
+    if len(records["chunks"]) != manifest.chunks:
+        raise SnapshotError(f"Snapshot lists {len(records['chunks'])} chunks for {manifest.chunks} vectors")
+
+    await init_db()
+    now = datetime.now(timezone.utc)
+    async with get_session() as session:
+        with track("snapshot_clear"):
+            for table in (EmbeddingModel, ChunkEmbedding, DocumentChunk, Document, *STRUCTURED_TABLES):
+                await session.execute(delete(table))
+        with track("snapshot_import"):
+            for table in STRUCTURED_TABLES:
+                session.add_all(_restore(table, row) for row in records["tables"].get(table.__tablename__, []))
+            # Snapshots written before collections existed load into the default collection.
+            documents = [
+                _restore(Document, {"collection": settings.vector_collection, **row}) for row in records["documents"]
+            ]
+            for collection in sorted({document.collection for document in documents}):
+                await ensure_collection(session, collection, settings)
+            session.add_all(documents)
+            await session.flush()
+            buffer = ChunkCopyBuffer()
+            for vector, (position, chunk_index, content, metadata) in zip(vectors, records["chunks"]):
+                document = documents[position]
+                buffer.add(document.collection, document.id, chunk_index, content, metadata, vector)
+                if buffer.rows >= settings.ingestion_commit_size:
+                    await buffer.copy_to(session)
+            await buffer.copy_to(session)
+            session.add(
+                EmbeddingModel(
+                    name=manifest.embedding_model,
+                    storage=COLUMN_STORAGE,
+                    status="active",
+                    checkpoint_chunk_id=0,
+                    embedded_count=0,
+                    updated_at=now,
+                )
+            )
+            version = IngestionVersion(completed_at=now)
+            session.add(version)
+            await session.commit()
+    get_replica_router().note_write_version(version.id)
+    get_endpoint_index.cache_clear()
+    logger.info("Imported %d chunks from %s as ingestion version %d", manifest.chunks, path, version.id)
+    return manifest
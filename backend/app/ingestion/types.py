@@ -26,6 +26,7 @@ class DocumentChunk:
     content: str
     metadata: DocumentMetadata
     ordinal: int
+    extra: dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass(slots=True)
@@ -1,12 +1,37 @@
 """FastAPI application entry point."""
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import REGISTRY
 
-from app.api.routes import chat, health, ingest
+from app.api.middleware import CompressionMiddleware, ProfilingMiddleware, TelemetryMiddleware
+from app.api.routes import admin, chat, health, ingest, metrics
+from app.core.admission import AdmissionRejected
 from app.core.logging import configure_logging
+from app.core.profiling import install_profile_signal, start_loop_monitor, stop_loop_monitor
+from app.core.settings import get_settings
+from app.providers.http import close_http_client
+from app.providers.metering import ProviderMeterCollector
+from app.retrieval.endpoint_index import get_endpoint_index
+from app.services.sessions import SessionNotFound
 
 configure_logging()
-app = FastAPI(title="QuantLeaves Support RAG", version="0.1.0")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    get_endpoint_index()
+    install_profile_signal()
+    await start_loop_monitor()
+    yield
+    await stop_loop_monitor()
+    await close_http_client()
+
+
+app = FastAPI(title="QuantLeaves Support RAG", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,12 +39,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-File"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=get_settings().response_compression_min_bytes)
+app.add_middleware(TelemetryMiddleware)
+app.add_middleware(ProfilingMiddleware)
+REGISTRY.register(ProviderMeterCollector())
 
 # Register routes
 app.include_router(health.router)
 app.include_router(chat.router)
 app.include_router(ingest.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Shed overload quickly so clients back off instead of queueing behind a saturated upstream."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(SessionNotFound)
+async def session_not_found_handler(request: Request, exc: SessionNotFound) -> JSONResponse:
+    """Only server-minted, live sessions can be continued; the client should start a new one."""
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
 
 
 @app.get("/", summary="Service metadata")
@@ -0,0 +1,116 @@
+"""Pydantic schemas for API requests and responses."""
+from __future__ import annotations
+
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from app.db.partitions import COLLECTION_PATTERN
+
+ResponseField = Literal["answer", "citations", "structured_results", "session_id"]
+
+
+class ChatRequest(BaseModel):
+    question: str = Field(..., min_length=1, description="End-user or agent question")
+    session_id: str | None = Field(
+        None,
+        min_length=1,
+        max_length=64,
+        description="Server-minted id from an earlier new_session turn; unknown or expired ids get 404",
+    )
+    new_session: bool = Field(
+        False,
+        description="Start a server-side conversation and return its session_id; omit for a stateless question",
+    )
+    top_k: int | None = Field(None, ge=1, le=50, description="Number of unstructured chunks to return")
+    mmr_lambda: float | None = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="MMR trade-off between relevance (1.0) and diversity (0.0)",
+    )
+    mmr_oversample: int | None = Field(
+        None,
+        ge=1,
+        le=20,
+        description="Candidate pool size as a multiple of top_k before MMR re-ranking",
+    )
+    fields: list[ResponseField] | None = Field(
+        None,
+        min_length=1,
+        description="Response fields to include; omit for all",
+    )
+    verbosity: Literal["minimal", "standard", "full"] = Field(
+        "standard",
+        description="Metadata detail for citations and structured results",
+    )
+    deadline_ms: int | None = Field(
+        None,
+        ge=1,
+        le=120_000,
+        description="Overall latency budget; components that would overrun it are answered from fallbacks",
+    )
+    collection: str | None = Field(
+        None,
+        pattern=COLLECTION_PATTERN,
+        description="Collection to retrieve documents from; omit to search every collection",
+    )
+
+
+class Citation(BaseModel):
+    doc_id: str
+    snippet: str
+    metadata: dict[str, Any] | None = None
+
+
+class ChatResponse(BaseModel):
+    answer: str
+    citations: list[Citation] = Field(default_factory=list)
+    structured_results: list[dict[str, Any]] = Field(default_factory=list)
+    session_id: str | None = None
+    degraded: list[str] = Field(
+        default_factory=list,
+        description="Components that missed their deadline and were answered from a fallback",
+    )
+
+
+class ShapedCitation(BaseModel):
+    doc_id: str
+    snippet: str
+    metadata: dict[str, Any] | None = Field(
+        None,
+        description="Omitted at minimal verbosity; oversized values are truncated or replaced by a marker",
+    )
+
+
+class ShapedChatResponse(BaseModel):
+    """A `ChatResponse` as rendered by `/chat`: keys left out by `fields` are omitted rather than null."""
+
+    answer: str | None = None
+    citations: list[ShapedCitation] | None = None
+    structured_results: list[dict[str, Any]] | None = Field(
+        None,
+        description="`source`, `identifier` and `content`, plus the metadata `verbosity` keeps",
+    )
+    session_id: str | None = None
+    degraded: list[str] | None = Field(None, description="Present only when a component answered from a fallback")
+
+
+class ChatBatchRequest(BaseModel):
+    requests: list[ChatRequest] = Field(..., min_length=1, description="Questions to answer in one batch")
+
+
+class ChatBatchItem(BaseModel):
+    """One NDJSON line of a `/chat/batch` response."""
+
+    index: int = Field(..., description="Position of the request in the submitted batch")
+    response: ShapedChatResponse | None = None
+    error: Literal["session_not_found", "overloaded", "internal_error"] | None = Field(
+        None,
+        description="Why this request failed; details are only logged server-side",
+    )
+
+
+class IngestionResponse(BaseModel):
+    status: str
+    detail: str | None = None
@@ -0,0 +1,79 @@
+"""Embedding calls that return float32 matrices instead of lists of Python floats.
+
+A 3072-dimension vector is ~100 KB as a list of boxed floats and 12 KB as
+float32, so ingestion requests vectors in this form end to end. OpenAI
+responses are requested base64-encoded and decoded straight into the matrix;
+the async variant does so over the client's native async API.
+"""
+from __future__ import annotations
+
+import base64
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+
+def as_float32_matrix(vectors: list[list[float]] | np.ndarray) -> np.ndarray:
+    return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+
+
+def embed_documents_array(embeddings: Embeddings, texts: list[str]) -> np.ndarray:
+    """Embed `texts` into an `(len(texts), dimensions)` float32 matrix."""
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    native = getattr(embeddings, "embed_documents_array", None)
+    if native is not None:
+        return native(texts)
+    if isinstance(embeddings, OpenAIEmbeddings) and _fits_context(embeddings, texts, embeddings.client):
+        return _openai_base64(embeddings, texts)
+    return as_float32_matrix(embeddings.embed_documents(texts))
+
+
+def _fits_context(embeddings: OpenAIEmbeddings, texts: list[str], client: Any) -> bool:
+    # Raw text is sent only when no input can exceed the token window (a token spans at least one character);
+    # otherwise LangChain's tokenize-and-average path handles the long inputs.
+    return client is not None and max(map(len, texts)) <= embeddings.embedding_ctx_length
+
+
+async def aembed_documents_array(embeddings: Embeddings, texts: list[str]) -> np.ndarray:
+    """Async `embed_documents_array`, using the provider's native async client where it has one."""
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    native = getattr(embeddings, "aembed_documents_array", None)
+    if native is not None:
+        return await native(texts)
+    if isinstance(embeddings, OpenAIEmbeddings) and _fits_context(embeddings, texts, embeddings.async_client):
+        matrix = None
+        for start in range(0, len(texts), embeddings.chunk_size):
+            batch = texts[start : start + embeddings.chunk_size]
+            response = await embeddings.async_client.create(input=batch, **_base64_params(embeddings))
+            matrix = _decode_into(matrix, len(texts), start, response)
+        return matrix
+    return as_float32_matrix(await embeddings.aembed_documents(texts))
+
+
+def _base64_params(embeddings: OpenAIEmbeddings) -> dict:
+    params = {"model": embeddings.model, "encoding_format": "base64", **embeddings.model_kwargs}
+    if embeddings.dimensions is not None:
+        params["dimensions"] = embeddings.dimensions
+    return params
+
+
+def _decode_into(matrix: np.ndarray | None, rows: int, start: int, response: Any) -> np.ndarray:
+    for item in response.data:
+        row = np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+        if matrix is None:
+            matrix = np.empty((rows, row.shape[0]), dtype=np.float32)
+        matrix[start + item.index] = row
+    return matrix
+
+
+def _openai_base64(embeddings: OpenAIEmbeddings, texts: list[str]) -> np.ndarray:
+    matrix = None
+    for start in range(0, len(texts), embeddings.chunk_size):
+        batch = texts[start : start + embeddings.chunk_size]
+        response = embeddings.client.create(input=batch, **_base64_params(embeddings))
+        matrix = _decode_into(matrix, len(texts), start, response)
+    return matrix
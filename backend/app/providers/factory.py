@@ -0,0 +1,108 @@
+"""Model provider selection driven by `AppSettings.model_provider`."""
+from __future__ import annotations
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from app.core.admission import get_admission_controller
+from app.core.settings import AppSettings
+from app.providers.http import get_http_client, http_timeout
+from app.providers.local import HashingEmbeddings, LocalChatModel
+from app.providers.metering import MeteredChatModel, MeteredEmbeddings
+
+
+class ProviderConfigurationError(RuntimeError):
+    pass
+
+
+def embedding_model_name(settings: AppSettings) -> str:
+    """Name of the configured embedding model, as recorded alongside stored vectors."""
+    if settings.model_provider == "local":
+        return f"hashing-{settings.local_embedding_dim}"
+    return settings.openai_embedding_model
+
+
+def create_embeddings(settings: AppSettings, model: str | None = None) -> MeteredEmbeddings:
+    """Build the configured embedding provider wrapped in a call meter.
+
+    `model` overrides the configured model name, e.g. to embed with a migration
+    target; local models are named `hashing-<dimensions>`.
+    """
+    model = model or embedding_model_name(settings)
+    if settings.model_provider == "local":
+        prefix, _, dimensions = model.rpartition("-")
+        if prefix != "hashing" or not dimensions.isdigit():
+            raise ProviderConfigurationError(f"Unknown local embedding model {model!r}; expected hashing-<dimensions>")
+        return MeteredEmbeddings(
+            HashingEmbeddings(dimensions=int(dimensions)),
+            provider=f"local:{model}",
+            admission=get_admission_controller("embeddings", model, settings),
+        )
+    _require_openai_key(settings)
+    embeddings = OpenAIEmbeddings(
+        api_key=settings.openai_api_key,
+        model=model,
+        base_url=_base_url(settings),
+        http_async_client=get_http_client(settings),
+        request_timeout=http_timeout(settings),
+    )
+    return MeteredEmbeddings(
+        embeddings,
+        provider=f"openai:{model}",
+        admission=get_admission_controller("embeddings", model, settings),
+    )
+
+
+def create_chat_model(settings: AppSettings) -> MeteredChatModel:
+    """Build the configured chat provider wrapped in a call meter."""
+    if settings.model_provider == "local":
+        llm = LocalChatModel(
+            latency_seconds=settings.local_chat_latency_ms / 1000.0,
+            tokens_per_second=settings.local_chat_tokens_per_second,
+        )
+        return MeteredChatModel(
+            llm,
+            provider="local:chat",
+            admission=get_admission_controller("chat", "local-chat", settings),
+        )
+    _require_openai_key(settings)
+    llm = ChatOpenAI(
+        api_key=settings.openai_api_key,
+        model=settings.openai_chat_model,
+        base_url=_base_url(settings),
+        temperature=0.2,
+        stream_usage=True,
+        http_async_client=get_http_client(settings),
+        request_timeout=http_timeout(settings),
+    )
+    return MeteredChatModel(
+        llm,
+        provider=f"openai:{settings.openai_chat_model}",
+        admission=get_admission_controller("chat", settings.openai_chat_model, settings),
+    )
+
+
+def meter_embeddings(embeddings: Embeddings) -> MeteredEmbeddings:
+    """Wrap an injected embeddings object so it is metered like configured providers."""
+    if isinstance(embeddings, MeteredEmbeddings):
+        return embeddings
+    return MeteredEmbeddings(embeddings, provider=f"custom:{type(embeddings).__name__}")
+
+
+def meter_chat_model(llm: BaseChatModel | MeteredChatModel) -> MeteredChatModel:
+    """Wrap an injected chat model so it is metered like configured providers."""
+    if isinstance(llm, MeteredChatModel):
+        return llm
+    return MeteredChatModel(llm, provider=f"custom:{type(llm).__name__}")
+
+
+def _require_openai_key(settings: AppSettings) -> None:
+    if not settings.openai_api_key:
+        raise ProviderConfigurationError(
+            "OPENAI_API_KEY is not configured. Update backend/.env or set MODEL_PROVIDER=local."
+        )
+
+
+def _base_url(settings: AppSettings) -> str | None:
+    return str(settings.openai_api_base) if settings.openai_api_base else None
@@ -0,0 +1,59 @@
+"""Application-scoped HTTP client shared by every async model provider call.
+
+One `httpx.AsyncClient` per process keeps connections to the provider alive
+across requests, multiplexes them over HTTP/2 when `h2` is installed, and
+bounds the pool with `AppSettings`, so query embedding, generation and
+ingestion stop paying a TLS handshake per client they construct.
+"""
+from __future__ import annotations
+
+import importlib.util
+import logging
+
+import httpx
+
+from app.core.settings import AppSettings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+
+def http_timeout(settings: AppSettings) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.http_connect_timeout_seconds,
+        read=settings.http_read_timeout_seconds,
+        write=settings.http_write_timeout_seconds,
+        pool=settings.http_pool_timeout_seconds,
+    )
+
+
+def build_http_client(settings: AppSettings) -> httpx.AsyncClient:
+    http2 = settings.http2_enabled
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1 keep-alive")
+        http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=http_timeout(settings),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+    )
+
+
+def get_http_client(settings: AppSettings | None = None) -> httpx.AsyncClient:
+    """The shared client, created on first use (or again after `close_http_client`)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_http_client(settings or get_settings())
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
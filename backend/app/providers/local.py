@@ -0,0 +1,133 @@
+"""Deterministic local stand-ins for the OpenAI embedding and chat models."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, AsyncIterator, Iterator
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.core.admission import run_in_model_executor
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+CITATION_PATTERN = re.compile(r"\[([A-Z]{2,4}-\d{4})\]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used when a provider reports no usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+class HashingEmbeddings(Embeddings):
+    """Feature-hashing embedder: lexical overlap maps to cosine similarity, with no network calls."""
+
+    def __init__(self, dimensions: int = 3072) -> None:
+        self.dimensions = dimensions
+
+    def _embed_into(self, vector: np.ndarray, text: str) -> np.ndarray:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    def embed_documents_array(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in zip(matrix, texts):
+            self._embed_into(row, text)
+        return matrix
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed_into(np.zeros(self.dimensions, dtype=np.float32), text).tolist()
+
+    # Hashing is CPU-bound, so the async API runs it on the model executor rather than the event loop.
+    async def aembed_documents_array(self, texts: list[str]) -> np.ndarray:
+        return await run_in_model_executor(self.embed_documents_array, texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await run_in_model_executor(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await run_in_model_executor(self.embed_query, text)
+
+
+class LocalChatModel(BaseChatModel):
+    """Fake chat model with a configurable time-to-first-token and streaming speed.
+
+    The reply cites every `[doc_id]` found in the prompt so downstream citation
+    handling behaves as it would with a grounded model answer.
+    """
+
+    latency_seconds: float = 0.0
+    tokens_per_second: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-stand-in"
+
+    def _reply(self, messages: list[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        doc_ids = list(dict.fromkeys(CITATION_PATTERN.findall(prompt)))
+        if not doc_ids:
+            return "I do not know based on the provided context."
+        return "Based on the provided context: " + " ".join(f"[{doc_id}]" for doc_id in doc_ids)
+
+    def _tokens(self, reply: str) -> list[str]:
+        words = reply.split(" ")
+        return [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+
+    def _usage(self, messages: list[BaseMessage], reply: str) -> dict[str, int]:
+        input_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        output_tokens = estimate_tokens(reply)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        reply = self._reply(messages)
+        time.sleep(self.latency_seconds + self._token_delay() * len(self._tokens(reply)))
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        reply = self._reply(messages)
+        await asyncio.sleep(self.latency_seconds + self._token_delay() * len(self._tokens(reply)))
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        reply = self._reply(messages)
+        time.sleep(self.latency_seconds)
+        for token in self._tokens(reply):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            time.sleep(self._token_delay())
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, reply)))
+
+    async def _astream(
+        self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        reply = self._reply(messages)
+        await asyncio.sleep(self.latency_seconds)
+        for token in self._tokens(reply):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            await asyncio.sleep(self._token_delay())
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, reply)))
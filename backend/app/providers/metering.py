@@ -0,0 +1,283 @@
+"""Call metering wrappers for embedding and chat providers."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, TypeVar
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from prometheus_client.core import CounterMetricFamily
+
+from app.core.admission import AdmissionController
+from app.core.deadlines import remaining_budget
+from app.providers.arrays import aembed_documents_array, embed_documents_array
+from app.providers.local import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CallStats:
+    calls: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
+class ProviderMeter:
+    """Thread-safe accumulator of per-provider call counts, token usage and latency."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], CallStats] = {}
+
+    def record(
+        self,
+        provider: str,
+        operation: str,
+        latency_ms: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._stats.setdefault((provider, operation), CallStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.total_latency_ms += latency_ms
+            stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+        logger.debug(
+            "provider=%s op=%s latency_ms=%.1f in_tokens=%d out_tokens=%d error=%s",
+            provider,
+            operation,
+            latency_ms,
+            input_tokens,
+            output_tokens,
+            error,
+        )
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {f"{provider}:{operation}": asdict(stats) for (provider, operation), stats in self._stats.items()}
+
+    def items(self) -> list[tuple[tuple[str, str], dict[str, Any]]]:
+        with self._lock:
+            return [(key, asdict(stats)) for key, stats in self._stats.items()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+@lru_cache
+def get_meter() -> ProviderMeter:
+    return ProviderMeter()
+
+
+class MeteredEmbeddings(Embeddings):
+    """Embeddings wrapper that records every call on a `ProviderMeter`.
+
+    Async calls pass through the optional `AdmissionController` and use the inner
+    client's native async API, so OpenAI requests go out on the shared HTTP client
+    without a thread hop.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        provider: str,
+        meter: ProviderMeter | None = None,
+        admission: AdmissionController | None = None,
+    ) -> None:
+        self.inner = inner
+        self.provider = provider
+        self.meter = meter or get_meter()
+        self.admission = admission
+
+    def _record(self, operation: str, started: float, texts: Sequence[str], error: bool = False) -> None:
+        self.meter.record(
+            self.provider,
+            operation,
+            (time.perf_counter() - started) * 1000.0,
+            input_tokens=sum(estimate_tokens(text) for text in texts),
+            error=error,
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        started = time.perf_counter()
+        try:
+            result = self.inner.embed_documents(texts)
+        except Exception:
+            self._record("embed_documents", started, texts, error=True)
+            raise
+        self._record("embed_documents", started, texts)
+        return result
+
+    def embed_documents_array(self, texts: list[str]) -> np.ndarray:
+        """Like `embed_documents`, as a float32 matrix with one row per text."""
+        started = time.perf_counter()
+        try:
+            result = embed_documents_array(self.inner, texts)
+        except Exception:
+            self._record("embed_documents", started, texts, error=True)
+            raise
+        self._record("embed_documents", started, texts)
+        return result
+
+    def embed_query(self, text: str) -> list[float]:
+        started = time.perf_counter()
+        try:
+            result = self.inner.embed_query(text)
+        except Exception:
+            self._record("embed_query", started, [text], error=True)
+            raise
+        self._record("embed_query", started, [text])
+        return result
+
+    async def _ametered(self, operation: str, texts: list[str], call: Callable[..., Awaitable[T]], *args: Any) -> T:
+        started = time.perf_counter()
+        try:
+            result = await call(*args)
+        except Exception:
+            self._record(operation, started, texts, error=True)
+            raise
+        self._record(operation, started, texts)
+        return result
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        async with _admit(self.admission):
+            return await self._ametered("embed_documents", texts, self.inner.aembed_documents, texts)
+
+    async def aembed_documents_array(self, texts: list[str]) -> np.ndarray:
+        async with _admit(self.admission):
+            return await self._ametered("embed_documents", texts, aembed_documents_array, self.inner, texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        async with _admit(self.admission):
+            return await self._ametered("embed_query", [text], self.inner.aembed_query, text)
+
+
+class MeteredChatModel:
+    """Chat model wrapper that records calls, token usage and latency on a `ProviderMeter`.
+
+    Token counts come from the provider's `usage_metadata` when present and fall
+    back to a character-based estimate otherwise.
+    """
+
+    def __init__(
+        self,
+        inner: BaseChatModel,
+        provider: str,
+        meter: ProviderMeter | None = None,
+        admission: AdmissionController | None = None,
+    ) -> None:
+        self.inner = inner
+        self.provider = provider
+        self.meter = meter or get_meter()
+        self.admission = admission
+
+    def _record(
+        self,
+        operation: str,
+        started: float,
+        messages: Sequence[BaseMessage],
+        output: str,
+        usage: dict[str, int] | None,
+        error: bool = False,
+    ) -> None:
+        if usage:
+            input_tokens, output_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        else:
+            input_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+            output_tokens = estimate_tokens(output)
+        self.meter.record(
+            self.provider,
+            operation,
+            (time.perf_counter() - started) * 1000.0,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            error=error,
+        )
+
+    def invoke(self, messages: list[BaseMessage], **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            response = self.inner.invoke(messages, **kwargs)
+        except Exception:
+            self._record("invoke", started, messages, "", None, error=True)
+            raise
+        self._record("invoke", started, messages, str(response.content), getattr(response, "usage_metadata", None))
+        return response
+
+    async def ainvoke(self, messages: list[BaseMessage], **kwargs: Any) -> Any:
+        async with _admit(self.admission):
+            started = time.perf_counter()
+            try:
+                response = await self.inner.ainvoke(messages, **kwargs)
+            except Exception:
+                self._record("invoke", started, messages, "", None, error=True)
+                raise
+        self._record("invoke", started, messages, str(response.content), getattr(response, "usage_metadata", None))
+        return response
+
+    async def astream(self, messages: list[BaseMessage], **kwargs: Any) -> AsyncIterator[Any]:
+        async with _admit(self.admission):
+            started = time.perf_counter()
+            parts: list[str] = []
+            usage: dict[str, int] | None = None
+            error = False
+            try:
+                async for chunk in self.inner.astream(messages, **kwargs):
+                    parts.append(str(chunk.content))
+                    if getattr(chunk, "usage_metadata", None):
+                        usage = dict(chunk.usage_metadata)
+                    yield chunk
+            except Exception:
+                error = True
+                raise
+            finally:
+                self._record("stream", started, messages, "".join(parts), usage, error=error)
+
+
+def _admit(admission: AdmissionController | None) -> AbstractAsyncContextManager[Any]:
+    """A model slot whose queue wait is capped by the current request's remaining budget."""
+    return admission.slot(timeout=remaining_budget()) if admission is not None else nullcontext()
+
+
+class ProviderMeterCollector:
+    """Prometheus collector exposing a `ProviderMeter` snapshot as counters."""
+
+    def __init__(self, meter: ProviderMeter | None = None) -> None:
+        self.meter = meter or get_meter()
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        labels = ["provider", "operation"]
+        calls = CounterMetricFamily("quantleaves_provider_calls", "Model provider calls", labels=labels)
+        errors = CounterMetricFamily("quantleaves_provider_errors", "Model provider calls that raised", labels=labels)
+        tokens = CounterMetricFamily(
+            "quantleaves_provider_tokens", "Model provider tokens", labels=[*labels, "direction"]
+        )
+        latency = CounterMetricFamily(
+            "quantleaves_provider_latency_seconds", "Cumulative model provider latency", labels=labels
+        )
+        for (provider, operation), stats in self.meter.items():
+            calls.add_metric([provider, operation], stats["calls"])
+            errors.add_metric([provider, operation], stats["errors"])
+            tokens.add_metric([provider, operation, "input"], stats["input_tokens"])
+            tokens.add_metric([provider, operation, "output"], stats["output_tokens"])
+            latency.add_metric([provider, operation], stats["total_latency_ms"] / 1000.0)
+        yield from (calls, errors, tokens, latency)
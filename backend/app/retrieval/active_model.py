@@ -0,0 +1,67 @@
+"""Resolution of the embedding model that currently serves vector queries."""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from app.core.settings import AppSettings, get_settings
+from app.db.models import EmbeddingModel
+from app.db.session import get_read_session
+from app.providers.factory import embedding_model_name
+
+logger = logging.getLogger(__name__)
+
+COLUMN_STORAGE = "column"
+TABLE_STORAGE = "table"
+
+
+@dataclass(slots=True, frozen=True)
+class ActiveEmbeddingModel:
+    name: str
+    storage: str
+
+
+class ActiveModelResolver:
+    """Cached lookup of the active row in `embedding_models`.
+
+    A migration flips the active row in one transaction; each process picks the
+    change up within `refresh_seconds`. Without a recorded model (databases
+    ingested before migrations existed) the configured model and the
+    `document_chunks.embedding` column are used.
+    """
+
+    def __init__(
+        self,
+        settings: AppSettings | None = None,
+        refresh_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.settings = settings or get_settings()
+        self.refresh_seconds = (
+            self.settings.embedding_model_refresh_seconds if refresh_seconds is None else refresh_seconds
+        )
+        self.clock = clock
+        self._active: ActiveEmbeddingModel | None = None
+        self._loaded_at = 0.0
+
+    async def get(self) -> ActiveEmbeddingModel:
+        if self._active is not None and self.clock() - self._loaded_at < self.refresh_seconds:
+            return self._active
+        try:
+            async with get_read_session() as session:
+                row = await session.scalar(select(EmbeddingModel).where(EmbeddingModel.status == "active"))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not read the active embedding model: %s", exc)
+            if self._active is not None:
+                return self._active
+            row = None
+        if row is None:
+            self._active = ActiveEmbeddingModel(embedding_model_name(self.settings), COLUMN_STORAGE)
+        else:
+            self._active = ActiveEmbeddingModel(row.name, row.storage)
+        self._loaded_at = self.clock()
+        return self._active
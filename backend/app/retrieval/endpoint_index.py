@@ -0,0 +1,186 @@
+"""In-memory radix tree of OpenAPI path templates for resolving pasted API calls."""
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import yaml
+
+from app.ingestion.loaders.openapi_loader import load_openapi_records
+from app.ingestion.types import StructuredRecord
+from app.retrieval.types import StructuredHit
+
+logger = logging.getLogger(__name__)
+
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+# An optional HTTP verb followed by an absolute URL or a rooted path, e.g. "GET /v1/dashboards/8812/export".
+URL_SPAN_PATTERN = re.compile(
+    r"(?:\b(?P<method>" + "|".join(HTTP_METHODS) + r")\s+)?"
+    r"(?P<target>https?://[^\s/]+(?:/[^\s]*)?"
+    r"|(?<![\w/])/[A-Za-z0-9_\-.~{}%]+(?:/[A-Za-z0-9_\-.~{}%]*)*(?:\?[^\s]*)?)",
+    re.IGNORECASE,
+)
+TRAILING_PUNCTUATION = ".,;:!?)]}'\""
+
+
+@dataclass(slots=True)
+class EndpointRoute:
+    method: str
+    template: str
+    summary: str | None
+    description: str | None
+    parameters: list[dict[str, Any]]
+    responses: dict[str, Any]
+
+
+@dataclass(slots=True)
+class EndpointMatch:
+    route: EndpointRoute
+    path_params: dict[str, str]
+    query_params: dict[str, str]
+
+
+@dataclass(slots=True)
+class _Node:
+    static: dict[str, _Node] = field(default_factory=dict)
+    param: _Node | None = None
+    routes: dict[str, EndpointRoute] = field(default_factory=dict)
+
+
+class EndpointIndex:
+    """Radix tree keyed by path segment; `{param}` segments become wildcard edges.
+
+    Lookup walks one edge per segment, preferring a literal segment over a
+    parameter so `/v1/dashboards/shared` beats `/v1/dashboards/{id}`.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_records(cls, records: Iterable[StructuredRecord]) -> EndpointIndex:
+        index = cls()
+        for record in records:
+            if record.table != "api_endpoints":
+                continue
+            payload = record.payload
+            extra = payload.get("extra") or {}
+            index.add(
+                EndpointRoute(
+                    method=payload["method"].upper(),
+                    template=payload["path"],
+                    summary=payload.get("summary"),
+                    description=payload.get("description"),
+                    parameters=extra.get("parameters") or [],
+                    responses=extra.get("responses") or {},
+                )
+            )
+        return index
+
+    def add(self, route: EndpointRoute) -> None:
+        node = self._root
+        for segment in _segments(route.template):
+            if segment.startswith("{") and segment.endswith("}"):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+        if route.method not in node.routes:
+            self._size += 1
+        node.routes[route.method] = route
+
+    def resolve(self, method: str | None, path: str) -> list[EndpointMatch]:
+        """Return routes matching a concrete `path` (and `method`, when given)."""
+        parts = urlsplit(path)
+        found = self._walk(self._root, _segments(parts.path), 0, [])
+        if found is None:
+            return []
+        node, values = found
+        query = dict(parse_qsl(parts.query))
+        if method is None:
+            routes = list(node.routes.values())
+        else:
+            route = node.routes.get(method.upper())
+            routes = [route] if route is not None else []
+        # Routes sharing a wildcard edge may name it differently, so names come from each route's own template.
+        return [
+            EndpointMatch(route=route, path_params=dict(zip(_param_names(route.template), values)), query_params=query)
+            for route in routes
+        ]
+
+    def match_question(self, question: str) -> list[StructuredHit]:
+        """Resolve every URL-like span in `question` into an `api_endpoints` hit."""
+        hits: list[StructuredHit] = []
+        seen: set[tuple[str, str]] = set()
+        for span in URL_SPAN_PATTERN.finditer(question):
+            target = span.group("target").rstrip(TRAILING_PUNCTUATION)
+            method = span.group("method")
+            for match in self.resolve(method, target):
+                key = (match.route.method, match.route.template)
+                if key in seen:
+                    continue
+                seen.add(key)
+                hits.append(_to_hit(match))
+        return hits
+
+    def _walk(
+        self, node: _Node, segments: list[str], position: int, values: list[str]
+    ) -> tuple[_Node, list[str]] | None:
+        if position == len(segments):
+            return (node, values) if node.routes else None
+        segment = segments[position]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, position + 1, values)
+            if found is not None:
+                return found
+        if node.param is not None:
+            return self._walk(node.param, segments, position + 1, [*values, segment])
+        return None
+
+
+def _segments(path: str) -> list[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def _param_names(template: str) -> list[str]:
+    return [segment[1:-1] for segment in _segments(template) if segment.startswith("{") and segment.endswith("}")]
+
+
+def _to_hit(match: EndpointMatch) -> StructuredHit:
+    route = match.route
+    return StructuredHit(
+        source="api_endpoints",
+        identifier=f"{route.method} {route.template}",
+        content=route.description or route.summary or "",
+        metadata={
+            "summary": route.summary,
+            "parameters": route.parameters,
+            "responses": route.responses,
+            "path_params": match.path_params,
+            "query_params": match.query_params,
+            "matched_by": "path_template",
+        },
+    )
+
+
+@lru_cache
+def get_endpoint_index() -> EndpointIndex:
+    """Build the index from the OpenAPI spec once per process."""
+    try:
+        index = EndpointIndex.from_records(load_openapi_records())
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        logger.warning("OpenAPI endpoint index unavailable: %s", exc)
+        return EndpointIndex()
+    logger.info("Indexed %d OpenAPI endpoints", len(index))
+    return index
@@ -1,17 +1,111 @@
-"""Hybrid retriever combining structured SQL lookup and vector similarity."""
+"""Hybrid retriever combining structured SQL lookup, vector similarity and a lexical fallback."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Collection, Sequence
+
+from app.core.deadlines import LatencyBudget, within
+from app.retrieval.lexical import LexicalRetriever
 from app.retrieval.structured import StructuredRetriever
-from app.retrieval.types import HybridContext
+from app.retrieval.types import HybridContext, StructuredHit, VectorHit, VectorQuery
 from app.retrieval.vector import VectorRetriever
 
 
 class HybridRetriever:
-    def __init__(self, structured: StructuredRetriever | None = None, vector: VectorRetriever | None = None) -> None:
+    def __init__(
+        self,
+        structured: StructuredRetriever | None = None,
+        vector: VectorRetriever | None = None,
+        lexical: LexicalRetriever | None = None,
+    ) -> None:
         self.structured = structured or StructuredRetriever()
         self.vector = vector or VectorRetriever()
+        self.lexical = lexical or LexicalRetriever()
+
+    async def search(
+        self,
+        query: str,
+        k: int | None = None,
+        mmr_lambda: float | None = None,
+        mmr_oversample: int | None = None,
+        exclude_chunk_ids: Collection[int] | None = None,
+        budget: LatencyBudget | None = None,
+        collection: str | None = None,
+    ) -> HybridContext:
+        """Run structured and vector retrieval concurrently, each under its `budget` deadline.
+
+        `collection` limits vector and lexical retrieval to one collection's chunk partition;
+        structured tables are shared by every collection.
+
+        While the vector branch has a deadline, lexical retrieval runs alongside it as a
+        hedge: its hits stand in for the vector hits if that deadline is missed, and it is
+        cancelled otherwise. Components that missed their deadline are listed in `degraded`.
+        """
+        budget = budget or LatencyBudget()
+        degraded: list[str] = []
+        vector_timeout = budget.timeout("vector")
+        lexical: asyncio.Task[list[VectorHit]] | None = None
+        if vector_timeout is not None:
+            lexical = asyncio.create_task(
+                within(
+                    self.lexical.search(query, k=k, exclude_chunk_ids=exclude_chunk_ids, collection=collection),
+                    budget.timeout("lexical"),
+                    "lexical",
+                    degraded,
+                    [],
+                )
+            )
+        try:
+            structured_hits, vector_hits = await asyncio.gather(
+                within(self.structured.search(query), budget.timeout("structured"), "structured", degraded, []),
+                within(
+                    self.vector.search(
+                        query,
+                        k=k,
+                        mmr_lambda=mmr_lambda,
+                        oversample=mmr_oversample,
+                        exclude_chunk_ids=exclude_chunk_ids,
+                        collection=collection,
+                    ),
+                    vector_timeout,
+                    "vector",
+                    degraded,
+                    None,
+                ),
+            )
+            if vector_hits is None and lexical is not None:
+                vector_hits = await lexical
+        finally:
+            if lexical is not None:
+                _discard(lexical)
+        return HybridContext(
+            query=query,
+            structured_hits=structured_hits,
+            vector_hits=vector_hits or [],
+            degraded=degraded,
+        )
+
+    async def search_many(self, queries: Sequence[VectorQuery], concurrency: int = 8) -> list[HybridContext]:
+        """Batched `search`: vector retrieval is batched, structured lookups run with bounded concurrency."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def structured(query: VectorQuery) -> list[StructuredHit]:
+            async with semaphore:
+                return await self.structured.search(query.text)
+
+        vector_results, structured_results = await asyncio.gather(
+            self.vector.search_many(queries),
+            asyncio.gather(*(structured(query) for query in queries)),
+        )
+        return [
+            HybridContext(query=query.text, structured_hits=structured_hits, vector_hits=vector_hits)
+            for query, structured_hits, vector_hits in zip(queries, structured_results, vector_results)
+        ]
+
 
-    async def search(self, query: str) -> HybridContext:
-        structured_hits = await self.structured.search(query)
-        vector_hits = await self.vector.search(query)
-        return HybridContext(query=query, structured_hits=structured_hits, vector_hits=vector_hits)
+def _discard(task: asyncio.Task) -> None:
+    """Cancel a hedge that is no longer needed, or consume its error so it is not reported as unhandled."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
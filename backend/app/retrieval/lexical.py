@@ -0,0 +1,55 @@
+"""Lexical retrieval over chunk content with Postgres full-text search.
+
+Needs no embedding call, so it serves as the fallback when vector retrieval
+misses its deadline. Queries use the same `to_tsvector` expression as the GIN
+index on `document_chunks`.
+"""
+from __future__ import annotations
+
+from collections.abc import Collection
+
+from sqlalchemy import func, literal_column, select
+
+from app.core.settings import AppSettings, get_settings
+from app.core.telemetry import track
+from app.db.models import FTS_CONFIG, Document, DocumentChunk, content_tsvector
+from app.db.session import get_read_session
+from app.retrieval.types import VectorHit
+from app.retrieval.vector import chunk_hit
+
+
+class LexicalRetriever:
+    def __init__(self, settings: AppSettings | None = None, k: int | None = None) -> None:
+        self.settings = settings or get_settings()
+        self.k = k or self.settings.retrieval_top_k
+
+    async def search(
+        self,
+        query: str,
+        k: int | None = None,
+        exclude_chunk_ids: Collection[int] | None = None,
+        collection: str | None = None,
+    ) -> list[VectorHit]:
+        """Return the top-k chunks matching `query`, ranked by `ts_rank_cd`, optionally within one collection."""
+        k = k or self.k
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{FTS_CONFIG}'"), query)
+        vector = content_tsvector()
+        rank = func.ts_rank_cd(vector, tsquery).label("rank")
+        stmt = (
+            select(DocumentChunk, Document, rank)
+            .join(Document, DocumentChunk.document_id == Document.id)
+            .where(vector.op("@@")(tsquery))
+            .order_by(rank.desc(), DocumentChunk.id)
+            .limit(k)
+        )
+        if exclude_chunk_ids:
+            stmt = stmt.where(DocumentChunk.id.not_in(list(exclude_chunk_ids)))
+        if collection is not None:
+            stmt = stmt.where(DocumentChunk.collection == collection)
+        with track("lexical_sql"):
+            async with get_read_session() as session:
+                rows = (await session.execute(stmt)).all()
+        hits = [chunk_hit(chunk, document, float(score or 0.0)) for chunk, document, score in rows]
+        for hit in hits:
+            hit.metadata["retrieval"] = "lexical"
+        return hits
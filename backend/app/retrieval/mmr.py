@@ -0,0 +1,52 @@
+"""Maximal marginal relevance re-ranking over candidate embeddings."""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def mmr_select(
+    query_embedding: Sequence[float] | np.ndarray,
+    candidate_embeddings: Sequence[Sequence[float]] | np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5,
+) -> list[int]:
+    """Return candidate indices chosen by maximal marginal relevance.
+
+    Relevance and redundancy are both cosine similarities. The candidate similarity
+    matrix is computed once, and each greedy step only updates the running maximum
+    similarity of every candidate to the already-selected set.
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if k <= 0 or candidates.size == 0:
+        return []
+    if candidates.ndim == 1:
+        candidates = candidates.reshape(1, -1)
+
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))[0]
+    candidates = _normalize(candidates)
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    n_candidates = candidates.shape[0]
+    k = min(k, n_candidates)
+    selected = [int(np.argmax(relevance))]
+    chosen = np.zeros(n_candidates, dtype=bool)
+    chosen[selected[0]] = True
+    max_similarity = similarity[selected[0]].copy()
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[chosen] = -np.inf
+        index = int(np.argmax(scores))
+        selected.append(index)
+        chosen[index] = True
+        np.maximum(max_similarity, similarity[index], out=max_similarity)
+    return selected
@@ -0,0 +1,297 @@
+"""Index snapshot file format and an in-process vector store served straight from one.
+
+A snapshot carries the structured tables, documents, chunks with their
+metadata, and one model's embeddings (`app/ingestion/snapshot.py` exports and
+imports them). File layout:
+
+    header    64 bytes: magic, format version (uint32 LE), zero padding
+    vectors   float32 LE, `chunks x dimensions`, row i belongs to chunk i
+    records   JSON: structured table rows, documents, chunks
+    manifest  JSON: model, shape, and offset/length/sha256 of each section
+    footer    manifest length (uint64 LE), manifest sha256, magic
+
+The vectors start at a fixed, aligned offset so they can be memory-mapped in
+place; the manifest sits at the end because its checksums are known only once
+everything else is written.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import struct
+from collections.abc import Collection, Sequence
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+
+from app.db.models import Document, DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MAGIC = b"QLSNAP\x00\x01"
+HEADER_SIZE = 64
+VECTOR_DTYPE = np.dtype("<f4")
+
+_HEADER = struct.Struct("<8sI")
+_FOOTER = struct.Struct("<Q32s8s")
+_HASH_BLOCK = 8 * 2**20
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+@dataclass(slots=True, frozen=True)
+class SnapshotSection:
+    offset: int
+    length: int
+    sha256: str
+
+
+@dataclass(slots=True)
+class SnapshotManifest:
+    format_version: int
+    created_at: str
+    embedding_model: str
+    dimensions: int
+    chunks: int
+    documents: int
+    vectors: SnapshotSection
+    records: SnapshotSection
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SnapshotManifest:
+        try:
+            return cls(
+                **{
+                    **data,
+                    "vectors": SnapshotSection(**data["vectors"]),
+                    "records": SnapshotSection(**data["records"]),
+                }
+            )
+        except (KeyError, TypeError) as exc:
+            raise SnapshotError(f"Malformed snapshot manifest: {exc}") from exc
+
+
+class SnapshotWriter:
+    """Streams vectors to a partial file, then appends records, manifest and footer and moves it into place."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows = 0
+        self.dimensions: int | None = None
+        self._partial = path.with_name(path.name + ".partial")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self._partial.open("wb")
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION).ljust(HEADER_SIZE, b"\x00"))
+        self._digest = hashlib.sha256()
+
+    def __enter__(self) -> SnapshotWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if not self._file.closed:
+            self.abort()
+
+    def add(self, vectors: np.ndarray) -> None:
+        """Append one vector or a `(rows, dimensions)` matrix."""
+        block = np.ascontiguousarray(np.atleast_2d(vectors), dtype=VECTOR_DTYPE)
+        if self.dimensions is None:
+            self.dimensions = block.shape[1]
+        elif block.shape[1] != self.dimensions:
+            raise SnapshotError(f"Vector has {block.shape[1]} dimensions, expected {self.dimensions}")
+        data = block.tobytes()
+        self._file.write(data)
+        self._digest.update(data)
+        self.rows += block.shape[0]
+
+    def finish(self, records: dict[str, Any], embedding_model: str) -> SnapshotManifest:
+        if not self.rows or len(records["chunks"]) != self.rows:
+            raise SnapshotError(f"Snapshot has {self.rows} vectors for {len(records['chunks'])} chunks")
+        vectors = SnapshotSection(HEADER_SIZE, self._file.tell() - HEADER_SIZE, self._digest.hexdigest())
+        payload = orjson.dumps(records)
+        records_section = SnapshotSection(self._file.tell(), len(payload), hashlib.sha256(payload).hexdigest())
+        self._file.write(payload)
+        manifest = SnapshotManifest(
+            format_version=FORMAT_VERSION,
+            created_at=datetime.now(timezone.utc).isoformat(),
+            embedding_model=embedding_model,
+            dimensions=self.dimensions or 0,
+            chunks=self.rows,
+            documents=len(records["documents"]),
+            vectors=vectors,
+            records=records_section,
+        )
+        encoded = orjson.dumps(manifest.as_dict())
+        self._file.write(encoded)
+        self._file.write(_FOOTER.pack(len(encoded), hashlib.sha256(encoded).digest(), MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._partial, self.path)
+        return manifest
+
+    def abort(self) -> None:
+        self._file.close()
+        self._partial.unlink(missing_ok=True)
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """An opened snapshot file; vectors are memory-mapped, records parsed on demand."""
+
+    path: Path
+    manifest: SnapshotManifest
+
+    @classmethod
+    def open(cls, path: Path, verify: bool = True) -> Snapshot:
+        """Read and check the header and manifest; with `verify`, also checksum every section."""
+        try:
+            with path.open("rb") as handle:
+                magic, version = _HEADER.unpack(handle.read(_HEADER.size))
+                if magic != MAGIC:
+                    raise SnapshotError(f"{path} is not an index snapshot")
+                if version != FORMAT_VERSION:
+                    raise SnapshotError(f"{path} has format version {version}; this build reads {FORMAT_VERSION}")
+                handle.seek(-_FOOTER.size, os.SEEK_END)
+                length, digest, trailer = _FOOTER.unpack(handle.read(_FOOTER.size))
+                if trailer != MAGIC:
+                    raise SnapshotError(f"{path} is truncated")
+                handle.seek(-(_FOOTER.size + length), os.SEEK_END)
+                encoded = handle.read(length)
+        except (OSError, struct.error) as exc:
+            raise SnapshotError(f"Cannot read snapshot {path}: {exc}") from exc
+        if hashlib.sha256(encoded).digest() != digest:
+            raise SnapshotError(f"{path} manifest checksum mismatch")
+        snapshot = cls(path, SnapshotManifest.from_dict(orjson.loads(encoded)))
+        if verify:
+            snapshot.verify()
+        return snapshot
+
+    def verify(self) -> None:
+        for name in ("vectors", "records"):
+            section: SnapshotSection = getattr(self.manifest, name)
+            digest = hashlib.sha256()
+            with self.path.open("rb") as handle:
+                handle.seek(section.offset)
+                remaining = section.length
+                while remaining:
+                    block = handle.read(min(_HASH_BLOCK, remaining))
+                    if not block:
+                        raise SnapshotError(f"{self.path} is truncated in its {name} section")
+                    digest.update(block)
+                    remaining -= len(block)
+            if digest.hexdigest() != section.sha256:
+                raise SnapshotError(f"{self.path} {name} checksum mismatch")
+
+    def vectors(self) -> np.ndarray:
+        """Read-only memory map of the `(chunks, dimensions)` float32 block."""
+        return np.memmap(
+            self.path,
+            dtype=VECTOR_DTYPE,
+            mode="r",
+            offset=self.manifest.vectors.offset,
+            shape=(self.manifest.chunks, self.manifest.dimensions),
+        )
+
+    def records(self) -> dict[str, Any]:
+        section = self.manifest.records
+        with self.path.open("rb") as handle:
+            handle.seek(section.offset)
+            return orjson.loads(handle.read(section.length))
+
+
+class SnapshotVectorStore:
+    """Exact cosine search over a snapshot's memory-mapped vectors, for serving without Postgres.
+
+    Chunk ids are row numbers starting at 1; they are stable for the lifetime of
+    the store, which is all session context caching needs. Documents from
+    snapshots written before collections existed belong to `default_collection`.
+    """
+
+    def __init__(self, snapshot: Snapshot, default_collection: str | None = None) -> None:
+        self.snapshot = snapshot
+        self.model = snapshot.manifest.embedding_model
+        self.vectors = snapshot.vectors()
+        records = snapshot.records()
+        self._documents = [
+            Document(id=position + 1, **_document_fields(row, default_collection))
+            for position, row in enumerate(records["documents"])
+        ]
+        self._chunks: list[list[Any]] = records["chunks"]
+        self._collections = np.array(
+            [self._documents[chunk[0]].collection or "" for chunk in self._chunks], dtype=object
+        )
+        norms = np.linalg.norm(self.vectors, axis=1)
+        norms[norms == 0] = 1.0
+        self._inverse_norms = (1.0 / norms).astype(VECTOR_DTYPE)
+
+    @classmethod
+    def from_path(cls, path: Path, verify: bool = True, default_collection: str | None = None) -> SnapshotVectorStore:
+        return cls(Snapshot.open(path, verify=verify), default_collection)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def nearest(
+        self,
+        embedding: Sequence[float],
+        limit: int,
+        exclude_chunk_ids: Collection[int] | None = None,
+        collection: str | None = None,
+    ) -> list[tuple[DocumentChunk, Document, float, np.ndarray]]:
+        """Rows shaped like `VectorRetriever`'s SQL results: chunk, document, cosine distance, vector."""
+        query = np.asarray(embedding, dtype=VECTOR_DTYPE)
+        norm = float(np.linalg.norm(query))
+        similarity = (self.vectors @ query) * self._inverse_norms / (norm or 1.0)
+        if exclude_chunk_ids:
+            rows = np.fromiter((chunk_id - 1 for chunk_id in exclude_chunk_ids), dtype=np.int64)
+            similarity[rows[(rows >= 0) & (rows < len(similarity))]] = -np.inf
+        if collection is not None:
+            similarity[self._collections != collection] = -np.inf
+        limit = min(limit, len(similarity))
+        top = np.argpartition(-similarity, limit - 1)[:limit] if limit else np.empty(0, dtype=np.int64)
+        top = top[np.argsort(-similarity[top], kind="stable")]
+        return [
+            (self._chunk(row), self._documents[self._chunks[row][0]], 1.0 - float(similarity[row]), self.vectors[row])
+            for row in top
+            if np.isfinite(similarity[row])
+        ]
+
+    def _chunk(self, row: int) -> DocumentChunk:
+        position, chunk_index, content, metadata = self._chunks[row]
+        return DocumentChunk(
+            id=row + 1,
+            collection=self._collections[row],
+            document_id=position + 1,
+            chunk_index=chunk_index,
+            content=content,
+            chunk_metadata=metadata,
+        )
+
+
+def _document_fields(row: dict[str, Any], default_collection: str | None = None) -> dict[str, Any]:
+    effective_date = row.get("effective_date")
+    return {
+        "collection": default_collection,
+        **row,
+        "effective_date": date.fromisoformat(effective_date) if effective_date else None,
+    }
+
+
+@lru_cache(maxsize=4)
+def get_snapshot_store(path: Path, verify: bool = True, default_collection: str | None = None) -> SnapshotVectorStore:
+    """Process-wide store per snapshot file, loaded on first use."""
+    store = SnapshotVectorStore.from_path(path, verify=verify, default_collection=default_collection)
+    logger.info("Serving %d chunks (%s) from snapshot %s", len(store), store.model, path)
+    return store
@@ -3,24 +3,43 @@ from __future__ import annotations
 
 from sqlalchemy import Select, cast, or_, select, String
 
+from app.core.telemetry import track
 from app.db.models import ApiEndpoint, ErrorCode, Plan, Policy, Product
-from app.db.session import get_session
+from app.db.session import get_read_session
+from app.retrieval.endpoint_index import EndpointIndex, get_endpoint_index
 from app.retrieval.types import StructuredHit
 
 
 class StructuredRetriever:
-    def __init__(self, limit: int = 5) -> None:
+    def __init__(self, limit: int = 5, endpoints: EndpointIndex | None = None) -> None:
         self.limit = limit
+        self._endpoints = endpoints
+
+    @property
+    def endpoints(self) -> EndpointIndex:
+        return self._endpoints or get_endpoint_index()
 
     async def search(self, query: str) -> list[StructuredHit]:
         pattern = f"%{query.lower()}%"
-        hits: list[StructuredHit] = []
-        async with get_session() as session:
-            hits.extend(await self._search_plans(session, pattern))
-            hits.extend(await self._search_products(session, pattern))
-            hits.extend(await self._search_error_codes(session, pattern))
-            hits.extend(await self._search_api_endpoints(session, pattern))
-            hits.extend(await self._search_policies(session, pattern))
+        # Endpoints pasted into the question resolve exactly and rank ahead of keyword matches.
+        with track("structured_endpoint_index"):
+            hits: list[StructuredHit] = self.endpoints.match_question(query)
+        resolved = {hit.identifier for hit in hits}
+        async with get_read_session() as session:
+            with track("structured_plans"):
+                hits.extend(await self._search_plans(session, pattern))
+            with track("structured_products"):
+                hits.extend(await self._search_products(session, pattern))
+            with track("structured_error_codes"):
+                hits.extend(await self._search_error_codes(session, pattern))
+            with track("structured_api_endpoints"):
+                hits.extend(
+                    hit
+                    for hit in await self._search_api_endpoints(session, pattern)
+                    if hit.identifier not in resolved
+                )
+            with track("structured_policies"):
+                hits.extend(await self._search_policies(session, pattern))
         return hits[: self.limit]
 
     async def _search_plans(self, session, pattern: str) -> list[StructuredHit]:
@@ -1,7 +1,7 @@
 """Retrieval result models."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 
@@ -19,6 +19,16 @@ class VectorHit:
     score: float
     content: str
     metadata: dict[str, Any]
+    chunk_id: int | None = None
+
+
+@dataclass(slots=True)
+class VectorQuery:
+    text: str
+    k: int | None = None
+    mmr_lambda: float | None = None
+    oversample: int | None = None
+    collection: str | None = None
 
 
 @dataclass(slots=True)
@@ -26,3 +36,4 @@ class HybridContext:
     query: str
     structured_hits: list[StructuredHit]
     vector_hits: list[VectorHit]
+    degraded: list[str] = field(default_factory=list)
@@ -1,65 +1,264 @@
 """Vector similarity retrieval using pgvector."""
 from __future__ import annotations
 
-import asyncio
-from typing import Sequence
+from collections.abc import Collection, Sequence
+from typing import Any
 
-from langchain_openai import OpenAIEmbeddings
-from sqlalchemy import select
+from langchain_core.embeddings import Embeddings
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import String, cast, literal, select, union_all
 
 from app.core.settings import AppSettings, get_settings
-from app.db.models import Document, DocumentChunk
-from app.db.session import get_session
-from app.retrieval.types import VectorHit
+from app.core.telemetry import track
+from app.db.models import EMBEDDING_DIM, ChunkEmbedding, Document, DocumentChunk
+from app.db.session import get_read_session
+from app.providers.factory import create_embeddings, meter_embeddings
+from app.providers.metering import MeteredEmbeddings
+from app.retrieval.active_model import COLUMN_STORAGE, ActiveEmbeddingModel, ActiveModelResolver
+from app.retrieval.mmr import mmr_select
+from app.retrieval.stores.snapshot import SnapshotVectorStore, get_snapshot_store
+from app.retrieval.types import VectorHit, VectorQuery
 
 
 class VectorRetriever:
-    def __init__(self, settings: AppSettings | None = None, k: int = 6) -> None:
+    def __init__(
+        self,
+        settings: AppSettings | None = None,
+        k: int | None = None,
+        embeddings: Embeddings | None = None,
+        store: SnapshotVectorStore | None = None,
+    ) -> None:
         self.settings = settings or get_settings()
-        self.k = k
-        self._embeddings: OpenAIEmbeddings | None = None
+        self.k = k or self.settings.retrieval_top_k
+        self._embeddings = meter_embeddings(embeddings) if embeddings is not None else None
+        self._injected = embeddings is not None
+        self._model_embeddings: dict[str, MeteredEmbeddings] = {}
+        self.active_model = ActiveModelResolver(self.settings)
+        if store is None and self.settings.vector_snapshot_path is not None:
+            store = get_snapshot_store(
+                self.settings.vector_snapshot_path, self.settings.snapshot_verify, self.settings.vector_collection
+            )
+        # When set, vectors are served from a snapshot in process memory instead of Postgres.
+        self.store = store
 
     @property
-    def embeddings(self) -> OpenAIEmbeddings:
-        if not self.settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY is not configured. Update backend/.env before running retrieval.")
+    def embeddings(self) -> MeteredEmbeddings:
         if self._embeddings is None:
-            base_url = str(self.settings.openai_api_base) if self.settings.openai_api_base else None
-            self._embeddings = OpenAIEmbeddings(
-                api_key=self.settings.openai_api_key,
-                model=self.settings.openai_embedding_model,
-                base_url=base_url,
-            )
+            self._embeddings = create_embeddings(self.settings)
         return self._embeddings
 
-    async def search(self, query: str) -> list[VectorHit]:
-        embedding = await asyncio.to_thread(self.embeddings.embed_query, query)
-        async with get_session() as session:
-            distance = DocumentChunk.embedding.cosine_distance(embedding).label("distance")
-            stmt = (
-                select(DocumentChunk, Document, distance)
-                .join(Document, DocumentChunk.document_id == Document.id)
-                .order_by(distance)
-                .limit(self.k)
-            )
-            result = await session.execute(stmt)
-            hits: list[VectorHit] = []
-            for chunk, document, distance_value in result.all():
-                score = 1 - float(distance_value) if distance_value is not None else 0.0
-                hits.append(
-                    VectorHit(
-                        doc_id=document.doc_id,
-                        score=score,
-                        content=chunk.content,
-                        metadata={
-                            "doc_type": document.doc_type,
-                            "audience": document.audience,
-                            "product_scope": document.product_scope,
-                            "region_scope": document.region_scope,
-                            "version": document.version,
-                            "effective_date": document.effective_date.isoformat() if document.effective_date else None,
-                            "chunk_index": chunk.chunk_index,
-                        },
-                    )
+    async def _resolve_model(self) -> tuple[ActiveEmbeddingModel | None, MeteredEmbeddings]:
+        """Return the model serving queries and a client for it; injected embeddings always use the column."""
+        if self._injected:
+            return None, self.embeddings
+        if self.store is not None:
+            return None, self._client_for(self.store.model)
+        active = await self.active_model.get()
+        return active, self._client_for(active.name)
+
+    def _client_for(self, model: str) -> MeteredEmbeddings:
+        client = self._model_embeddings.get(model)
+        if client is None:
+            client = create_embeddings(self.settings, model=model)
+            self._model_embeddings[model] = client
+        return client
+
+    async def search(
+        self,
+        query: str,
+        k: int | None = None,
+        mmr_lambda: float | None = None,
+        oversample: int | None = None,
+        exclude_chunk_ids: Collection[int] | None = None,
+        collection: str | None = None,
+    ) -> list[VectorHit]:
+        """Return the top-k chunks, diversified with MMR over an oversampled candidate pool.
+
+        `exclude_chunk_ids` skips chunks the caller already holds (e.g. a conversation's cached context).
+        `collection` restricts the search to that collection's partition; None searches them all.
+        """
+        k = k or self.k
+        lambda_mult = self.settings.mmr_lambda if mmr_lambda is None else mmr_lambda
+        oversample = oversample or self.settings.mmr_oversample
+        model, embeddings = await self._resolve_model()
+        with track("embed_query"):
+            embedding = await embeddings.aembed_query(query)
+        if self.store is not None:
+            with track("vector_store"):
+                rows = self.store.nearest(embedding, k * oversample, exclude_chunk_ids, collection)
+            return self._to_hits(self._diversify(embedding, rows, k, lambda_mult))
+        with track("vector_sql"):
+            async with get_read_session() as session:
+                vector = vector_column(model)
+                distance = vector_distance(model, embedding).label("distance")
+                stmt = join_vectors(
+                    select(DocumentChunk, Document, distance, vector.label("vector"))
+                    .join(Document, DocumentChunk.document_id == Document.id)
+                    .order_by(distance)
+                    .limit(k * oversample),
+                    model,
                 )
-            return hits
+                if exclude_chunk_ids:
+                    stmt = stmt.where(DocumentChunk.id.not_in(list(exclude_chunk_ids)))
+                result = await session.execute(_in_collection(stmt, collection, model))
+                rows = result.all()
+
+        return self._to_hits(self._diversify(embedding, rows, k, lambda_mult))
+
+    async def search_many(self, queries: Sequence[VectorQuery]) -> list[list[VectorHit]]:
+        """Batched `search`: one embedding call and two SQL round-trips for the whole batch.
+
+        Candidate ids for every query are gathered with a single UNION ALL of per-query
+        nearest-neighbour selects; the distinct candidate chunks are then hydrated once.
+        With a snapshot store, candidates come from it instead.
+        """
+        if not queries:
+            return []
+        model, client = await self._resolve_model()
+        with track("embed_batch"):
+            embeddings = await client.aembed_documents([query.text for query in queries])
+
+        limits = [(query.k or self.k) * (query.oversample or self.settings.mmr_oversample) for query in queries]
+        collections = [query.collection for query in queries]
+        if self.store is not None:
+            with track("vector_store_batch"):
+                per_query = [
+                    self.store.nearest(embedding, limit, collection=collection)
+                    for embedding, limit, collection in zip(embeddings, limits, collections)
+                ]
+        else:
+            per_query = await self._sql_candidates(model, embeddings, limits, collections)
+
+        results: list[list[VectorHit]] = []
+        for query, embedding, rows in zip(queries, embeddings, per_query):
+            lambda_mult = self.settings.mmr_lambda if query.mmr_lambda is None else query.mmr_lambda
+            results.append(self._to_hits(self._diversify(embedding, rows, query.k or self.k, lambda_mult)))
+        return results
+
+    async def _sql_candidates(
+        self,
+        model: ActiveEmbeddingModel | None,
+        embeddings: Sequence[Sequence[float]],
+        limits: Sequence[int],
+        collections: Sequence[str | None],
+    ) -> list[list[tuple[DocumentChunk, Document, float, Any]]]:
+        with track("vector_sql_batch"):
+            async with get_read_session() as session:
+                vector = vector_column(model)
+                candidates = union_all(
+                    *[
+                        _in_collection(
+                            join_vectors(
+                                select(
+                                    literal(index).label("query_index"),
+                                    DocumentChunk.id.label("chunk_id"),
+                                    vector_distance(model, embedding).label("distance"),
+                                ),
+                                model,
+                            ),
+                            collection,
+                            model,
+                        )
+                        .order_by("distance")
+                        .limit(limit)
+                        .subquery()
+                        .select()
+                        for index, (embedding, limit, collection) in enumerate(zip(embeddings, limits, collections))
+                    ]
+                )
+                candidate_rows = (await session.execute(candidates)).all()
+                chunk_ids = {row.chunk_id for row in candidate_rows}
+                stmt = join_vectors(
+                    select(DocumentChunk, Document, vector.label("vector"))
+                    .join(Document, DocumentChunk.document_id == Document.id)
+                    .where(DocumentChunk.id.in_(chunk_ids)),
+                    model,
+                )
+                hydrated = {
+                    chunk.id: (chunk, document, chunk_vector)
+                    for chunk, document, chunk_vector in (await session.execute(stmt)).all()
+                }
+
+        per_query: list[list[tuple[DocumentChunk, Document, float, Any]]] = [[] for _ in limits]
+        for row in sorted(candidate_rows, key=lambda row: (row.query_index, row.distance)):
+            chunk, document, chunk_vector = hydrated[row.chunk_id]
+            per_query[row.query_index].append((chunk, document, row.distance, chunk_vector))
+        return per_query
+
+    def _diversify(self, embedding: Sequence[float], rows: Sequence[Any], k: int, lambda_mult: float) -> list[Any]:
+        if len(rows) <= k:
+            return list(rows)
+        with track("mmr"):
+            selected = mmr_select(embedding, [row[3] for row in rows], k, lambda_mult)
+        return [rows[index] for index in selected]
+
+    def _to_hits(self, rows: Sequence[Any]) -> list[VectorHit]:
+        return [
+            chunk_hit(chunk, document, 1 - float(distance) if distance is not None else 0.0)
+            for chunk, document, distance, _ in rows
+        ]
+
+
+def chunk_hit(chunk: DocumentChunk, document: Document, score: float) -> VectorHit:
+    """Citation-ready hit for a stored chunk, shared by vector and lexical retrieval."""
+    stored = chunk.chunk_metadata or {}
+    return VectorHit(
+        doc_id=document.doc_id,
+        score=score,
+        content=chunk.content,
+        metadata={
+            "doc_type": document.doc_type,
+            "audience": document.audience,
+            "product_scope": document.product_scope,
+            "region_scope": document.region_scope,
+            "version": document.version,
+            "effective_date": document.effective_date.isoformat() if document.effective_date else None,
+            "chunk_index": chunk.chunk_index,
+            "section_path": stored.get("section_path"),
+            "page_start": stored.get("page_start"),
+            "page_end": stored.get("page_end"),
+            "also_in": [source["doc_id"] for source in stored.get("also_in", [])],
+        },
+        chunk_id=chunk.id,
+    )
+
+
+def vector_column(model: ActiveEmbeddingModel | None) -> Any:
+    if model is None or model.storage == COLUMN_STORAGE:
+        return DocumentChunk.embedding
+    return ChunkEmbedding.embedding
+
+
+def vector_distance(model: ActiveEmbeddingModel | None, embedding: Sequence[float]) -> Any:
+    """Cosine distance in the form the HNSW indexes are built on.
+
+    The live column is compared as `halfvec(EMBEDDING_DIM)`, matching the chunk partitions'
+    index; a migrated model's vectors as `halfvec` of their own dimension, matching the
+    partial per-model index on `chunk_embeddings` built before activation.
+    """
+    if model is None or model.storage == COLUMN_STORAGE:
+        return cast(DocumentChunk.embedding, HALFVEC(EMBEDDING_DIM)).cosine_distance(embedding)
+    return cast(ChunkEmbedding.embedding, HALFVEC(len(embedding))).cosine_distance(embedding)
+
+
+def _in_collection(stmt: Any, collection: str | None, model: ActiveEmbeddingModel | None = None) -> Any:
+    if collection is None:
+        return stmt
+    stmt = stmt.where(DocumentChunk.collection == collection)
+    if model is not None and model.storage != COLUMN_STORAGE:
+        stmt = stmt.where(ChunkEmbedding.collection == collection)
+    return stmt
+
+
+def join_vectors(stmt: Any, model: ActiveEmbeddingModel | None) -> Any:
+    """Join the migrated-model vectors when the active model lives in `chunk_embeddings`.
+
+    The model name is rendered inline so the planner can match the model's partial index.
+    """
+    if model is None or model.storage == COLUMN_STORAGE:
+        return stmt
+    return stmt.join(
+        ChunkEmbedding,
+        (ChunkEmbedding.chunk_id == DocumentChunk.id)
+        & (ChunkEmbedding.model == literal(model.name, String, literal_execute=True)),
+    )
@@ -2,15 +2,28 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import time
 from collections import OrderedDict
+from collections.abc import AsyncIterator, Sequence
 from typing import Any
 
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 
+from app.core.deadlines import LatencyBudget, bind_budget, within
 from app.core.settings import AppSettings, get_settings
+from app.core.telemetry import record_stage, track
 from app.models.schemas import ChatRequest, ChatResponse, Citation
+from app.providers.factory import create_chat_model, meter_chat_model
+from app.providers.metering import MeteredChatModel
 from app.retrieval.hybrid import HybridRetriever
+from app.retrieval.types import HybridContext, StructuredHit, VectorHit, VectorQuery
+from app.retrieval.vector import VectorRetriever
+from app.services.sessions import SessionStore
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = """You are QuantLeaves' support assistant. Use the provided context to answer customer and agent questions about analytics products, rate limits, SLAs, billing, and troubleshooting. Always cite your sources using [doc_id] notation. If the answer is not in the context, admit you do not know."""
 
@@ -19,46 +32,192 @@ PROMPT = ChatPromptTemplate.from_messages(
         ("system", SYSTEM_PROMPT),
         (
             "human",
-            """Question: {question}\n\nStructured context:\n{structured_context}\n\nUnstructured context:\n{unstructured_context}\n\nProvide a concise answer with citations and, if relevant, bullet steps.""",
+            """Conversation so far:\n{history}\n\nQuestion: {question}\n\nStructured context:\n{structured_context}\n\nUnstructured context:\n{unstructured_context}\n\nProvide a concise answer with citations and, if relevant, bullet steps.""",
         ),
     ]
 )
 
 
 class ChatService:
-    def __init__(self, settings: AppSettings | None = None) -> None:
+    def __init__(
+        self,
+        settings: AppSettings | None = None,
+        retriever: HybridRetriever | None = None,
+        llm: BaseChatModel | None = None,
+        sessions: SessionStore | None = None,
+    ) -> None:
         self.settings = settings or get_settings()
-        self.retriever = HybridRetriever()
-        self._llm: ChatOpenAI | None = None
+        self.retriever = retriever or HybridRetriever(vector=VectorRetriever(self.settings))
+        self._llm = meter_chat_model(llm) if llm is not None else None
+        self.sessions = sessions if sessions is not None else SessionStore(self.settings)
 
     @property
-    def llm(self) -> ChatOpenAI:
-        if not self.settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY is not configured. Update backend/.env before running chat endpoint.")
+    def llm(self) -> MeteredChatModel:
         if self._llm is None:
-            base_url = str(self.settings.openai_api_base) if self.settings.openai_api_base else None
-            self._llm = ChatOpenAI(
-                api_key=self.settings.openai_api_key,
-                model=self.settings.openai_chat_model,
-                base_url=base_url,
-                temperature=0.2,
-            )
+            self._llm = create_chat_model(self.settings)
         return self._llm
 
     async def answer(self, request: ChatRequest) -> ChatResponse:
-        context = await self.retriever.search(request.question)
-        structured_context = self._format_structured(context.structured_hits)
-        unstructured_context = self._format_unstructured(context.vector_hits)
-
-        response = await self.llm.ainvoke(
-            PROMPT.format_messages(
-                question=request.question,
-                structured_context=structured_context,
-                unstructured_context=unstructured_context,
+        # Bound for the whole turn, so model calls queue for at most what is left of `deadline_ms`.
+        with bind_budget(LatencyBudget.from_settings(self.settings, request.deadline_ms)) as budget:
+            return await self._answer(request, budget)
+
+    async def _answer(self, request: ChatRequest, budget: LatencyBudget) -> ChatResponse:
+        # Stateless requests neither create nor store a session, so they cannot evict real conversations.
+        session = None
+        if request.session_id:
+            session = await self.sessions.get(request.session_id)
+        elif request.new_session:
+            session = await self.sessions.create()
+        cached_hits = session.context_hits if session is not None else []
+        with track("retrieval"):
+            context = await self.retriever.search(
+                request.question,
+                k=request.top_k,
+                mmr_lambda=request.mmr_lambda,
+                mmr_oversample=request.mmr_oversample,
+                exclude_chunk_ids=[hit.chunk_id for hit in cached_hits if hit.chunk_id is not None],
+                budget=budget,
+                collection=request.collection,
             )
+        vector_hits = self._merge_cached_hits(context.vector_hits, cached_hits)
+        response = await self._respond(
+            request.question,
+            context.structured_hits,
+            vector_hits,
+            session.compact_history() if session is not None else "(new conversation)",
+            budget=budget,
+            degraded=context.degraded,
         )
 
-        citations = self._build_citations(context.vector_hits)
+        if session is not None:
+            session.record_turn(request.question, response.answer, vector_hits, self.settings.session_history_turns)
+            await self.sessions.save(session)
+            response.session_id = session.session_id
+        return response
+
+    async def answer_from_context(self, context: HybridContext) -> ChatResponse:
+        """Answer `context.query` from already retrieved context, without a session or another retrieval."""
+        with bind_budget(LatencyBudget.from_settings(self.settings)) as budget:
+            return await self._respond(
+                context.query,
+                context.structured_hits,
+                context.vector_hits,
+                budget=budget,
+                degraded=context.degraded,
+            )
+
+    async def answer_many(
+        self, requests: Sequence[ChatRequest]
+    ) -> AsyncIterator[tuple[int, ChatResponse | Exception]]:
+        """Answer a batch of requests, yielding `(index, response or error)` as each answer completes.
+
+        Stateless requests are de-duplicated by normalized question and retrieval options,
+        embedded in one call and retrieved in one batched vector query. Generation runs
+        with bounded concurrency. Requests bound to a session go through `answer`.
+        Only the LLM time-to-first-token deadline applies to batched questions.
+        """
+        groups: dict[tuple[Any, ...], list[int]] = {}
+        stateful: list[int] = []
+        for index, request in enumerate(requests):
+            if request.session_id or request.new_session:
+                stateful.append(index)
+                continue
+            key = (
+                _normalize_question(request.question),
+                request.top_k,
+                request.mmr_lambda,
+                request.mmr_oversample,
+                request.collection,
+            )
+            groups.setdefault(key, []).append(index)
+        unique = [(indices, requests[indices[0]]) for indices in groups.values()]
+        semaphore = asyncio.Semaphore(self.settings.batch_concurrency)
+
+        contexts: list[HybridContext] | Exception = []
+        if unique:
+            queries = [
+                VectorQuery(
+                    text=request.question,
+                    k=request.top_k,
+                    mmr_lambda=request.mmr_lambda,
+                    oversample=request.mmr_oversample,
+                    collection=request.collection,
+                )
+                for _, request in unique
+            ]
+            try:
+                with track("retrieval_batch"):
+                    contexts = await self.retriever.search_many(queries, concurrency=self.settings.batch_concurrency)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Batch retrieval failed for %d questions", len(queries))
+                contexts = exc
+
+        async def respond(
+            indices: list[int], request: ChatRequest, context: HybridContext
+        ) -> tuple[list[int], ChatResponse | Exception]:
+            async with semaphore:
+                try:
+                    with bind_budget(LatencyBudget.from_settings(self.settings, request.deadline_ms)) as budget:
+                        return indices, await self._respond(
+                            request.question,
+                            context.structured_hits,
+                            context.vector_hits,
+                            budget=budget,
+                        )
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("Batch generation failed")
+                    return indices, exc
+
+        async def answer_stateful(index: int) -> tuple[list[int], ChatResponse | Exception]:
+            async with semaphore:
+                try:
+                    return [index], await self.answer(requests[index])
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("Batch session turn failed")
+                    return [index], exc
+
+        if isinstance(contexts, Exception):
+            for indices, _ in unique:
+                for index in indices:
+                    yield index, contexts
+            contexts = []
+        tasks = [
+            asyncio.create_task(respond(indices, request, context))
+            for (indices, request), context in zip(unique, contexts)
+        ]
+        tasks += [asyncio.create_task(answer_stateful(index)) for index in stateful]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                indices, result = await finished
+                for index in indices:
+                    yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _respond(
+        self,
+        question: str,
+        structured_hits: list[StructuredHit],
+        vector_hits: list[VectorHit],
+        history: str = "(new conversation)",
+        budget: LatencyBudget | None = None,
+        degraded: Sequence[str] = (),
+    ) -> ChatResponse:
+        degraded = list(degraded)
+        with track("prompt_format"):
+            messages = PROMPT.format_messages(
+                history=history,
+                question=question,
+                structured_context=self._format_structured(structured_hits),
+                unstructured_context=self._format_unstructured(vector_hits),
+            )
+
+        answer = await self._generate(messages, (budget or LatencyBudget()).timeout("llm"), degraded)
+        if answer is None:
+            answer = self._fallback_answer(structured_hits, vector_hits)
+        citations = self._build_citations(vector_hits)
         structured_payload = [
             {
                 **({} if hit.metadata is None else hit.metadata),
@@ -66,9 +225,71 @@ class ChatService:
                 "identifier": hit.identifier,
                 "content": hit.content,
             }
-            for hit in context.structured_hits
+            for hit in structured_hits
         ]
-        return ChatResponse(answer=response.content.strip(), citations=citations, structured_results=structured_payload)
+        return ChatResponse(
+            answer=answer,
+            citations=citations,
+            structured_results=structured_payload,
+            degraded=degraded,
+        )
+
+    def _merge_cached_hits(self, fresh: list[VectorHit], cached: list[VectorHit]) -> list[VectorHit]:
+        """Fresh hits first, then the previous turn's context to fill the per-session cap.
+
+        Cached scores were computed for an earlier question (lexical ones on another
+        scale), so they only fill leftover slots and never outrank a fresh hit.
+        """
+        if not cached:
+            return fresh
+        seen = {hit.chunk_id for hit in fresh if hit.chunk_id is not None}
+        carried = [hit for hit in cached if hit.chunk_id is None or hit.chunk_id not in seen]
+        return [*fresh, *carried][: max(self.settings.session_context_chunks, len(fresh))]
+
+    async def _generate(
+        self,
+        messages: list[BaseMessage],
+        ttft_timeout: float | None = None,
+        degraded: list[str] | None = None,
+    ) -> str | None:
+        """Stream the completion so time-to-first-token is measured separately from total generation.
+
+        Returns None, marking "llm" degraded, when no content arrives within `ttft_timeout` seconds.
+        """
+        parts: list[str] = []
+        started = time.perf_counter()
+        stream = aiter(self.llm.astream(messages))
+
+        async def first_content() -> bool:
+            async for chunk in stream:
+                parts.append(str(chunk.content))
+                if chunk.content:
+                    record_stage("llm_ttft", time.perf_counter() - started)
+                    break
+            return True
+
+        with track("llm_total"):
+            try:
+                if not await within(first_content(), ttft_timeout, "llm", [] if degraded is None else degraded, False):
+                    return None
+                async for chunk in stream:
+                    parts.append(str(chunk.content))
+            finally:
+                await stream.aclose()
+        return "".join(parts).strip()
+
+    def _fallback_answer(self, structured_hits: list[StructuredHit], vector_hits: list[VectorHit]) -> str:
+        """Templated answer listing the top hits, used when the LLM misses its time-to-first-token deadline."""
+        limit = self.settings.fallback_answer_hits
+        sources = [(f"{hit.source}:{hit.identifier}", hit.content) for hit in structured_hits]
+        sources += [(hit.doc_id, hit.content) for hit in vector_hits]
+        if not sources:
+            return "I could not generate an answer in time and found no matching sources. Please try again."
+        lines = ["I could not generate a full answer in time. These sources look most relevant:"]
+        for label, content in sources[:limit]:
+            snippet = " ".join(content.split())
+            lines.append(f"- [{label}] {snippet[:240]}{'…' if len(snippet) > 240 else ''}")
+        return "\n".join(lines)
 
     def _format_structured(self, hits) -> str:
         if not hits:
@@ -91,6 +312,12 @@ class ChatService:
     def _build_citations(self, hits) -> list[Citation]:
         seen: OrderedDict[str, Citation] = OrderedDict()
         for hit in hits:
-            if hit.doc_id not in seen:
-                seen[hit.doc_id] = Citation(doc_id=hit.doc_id, snippet=hit.content[:300], metadata=hit.metadata)
+            # Near-duplicate chunks are stored once; `also_in` keeps the other source documents citable.
+            for doc_id in [hit.doc_id, *(hit.metadata or {}).get("also_in", [])]:
+                if doc_id not in seen:
+                    seen[doc_id] = Citation(doc_id=doc_id, snippet=hit.content[:300], metadata=hit.metadata)
         return list(seen.values())
+
+
+def _normalize_question(question: str) -> str:
+    return " ".join(question.casefold().split())
@@ -12,23 +12,29 @@ logger = logging.getLogger(__name__)
 
 
 class IngestionService:
-    def __init__(self, settings: AppSettings | None = None) -> None:
+    def __init__(self, settings: AppSettings | None = None, collection: str | None = None) -> None:
         self.settings = settings or get_settings()
-        self.pipeline = IngestionPipeline(self.settings)
+        self.pipeline = IngestionPipeline(self.settings, collection=collection)
 
     async def run_full(self) -> dict[str, Any]:
         try:
             await self.pipeline.run_full()
-            return {"status": "completed"}
         except IngestionError as exc:
             logger.error("Ingestion failed: %s", exc)
             return {"status": "error", "detail": str(exc)}
+        stats = self.pipeline.dedup_stats
+        if stats is None:
+            return {"status": "completed"}
+        return {
+            "status": "completed",
+            "detail": f"{stats.duplicates} of {stats.chunks_seen} chunks deduplicated before embedding",
+        }
 
 
-async def run_ingestion_async() -> dict[str, Any]:
-    service = IngestionService()
+async def run_ingestion_async(collection: str | None = None) -> dict[str, Any]:
+    service = IngestionService(collection=collection)
     return await service.run_full()
 
 
-def run_ingestion() -> dict[str, Any]:
-    return asyncio.run(run_ingestion_async())
+def run_ingestion(collection: str | None = None) -> dict[str, Any]:
+    return asyncio.run(run_ingestion_async(collection))
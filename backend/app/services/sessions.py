@@ -0,0 +1,214 @@
+"""Bounded server-side conversation session store."""
+from __future__ import annotations
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import select
+
+from app.core.settings import AppSettings, get_settings
+from app.db.models import ConversationSessionRecord
+from app.db.session import get_session
+from app.retrieval.types import VectorHit
+
+logger = logging.getLogger(__name__)
+
+TURN_ANSWER_CHARS = 600
+SUMMARY_LINE_CHARS = 240
+MAX_TRACKED_CHUNK_IDS = 64
+
+
+class SessionNotFound(LookupError):
+    def __init__(self, session_id: str) -> None:
+        super().__init__("Session not found or expired; start a new one with new_session")
+        self.session_id = session_id
+
+
+@dataclass(slots=True)
+class ConversationTurn:
+    question: str
+    answer: str
+    doc_ids: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ConversationSession:
+    """Turn history, rolling summary and retrieval cache for one conversation.
+
+    Only the most recent turns are kept verbatim; older turns are folded into an
+    extractive rolling summary so the prompt stays bounded as the conversation grows.
+    """
+
+    session_id: str
+    turns: list[ConversationTurn] = field(default_factory=list)
+    summary: str = ""
+    chunk_ids: list[int] = field(default_factory=list)
+    context_hits: list[VectorHit] = field(default_factory=list)
+    last_access: float = field(default_factory=time.monotonic)
+
+    def record_turn(self, question: str, answer: str, hits: list[VectorHit], max_turns: int) -> None:
+        doc_ids = list(dict.fromkeys(hit.doc_id for hit in hits))
+        self.turns.append(ConversationTurn(question=question, answer=answer[:TURN_ANSWER_CHARS], doc_ids=doc_ids))
+        self.context_hits = list(hits)
+        for hit in hits:
+            if hit.chunk_id is not None and hit.chunk_id not in self.chunk_ids:
+                self.chunk_ids.append(hit.chunk_id)
+        del self.chunk_ids[:-MAX_TRACKED_CHUNK_IDS]
+        while len(self.turns) > max_turns:
+            self.fold_oldest_turn()
+
+    def fold_oldest_turn(self) -> bool:
+        """Move the oldest verbatim turn into the rolling summary."""
+        if not self.turns:
+            return False
+        turn = self.turns.pop(0)
+        answer = turn.answer.split("\n", 1)[0]
+        line = f"- Q: {turn.question} A: {answer}"[:SUMMARY_LINE_CHARS]
+        self.summary = f"{self.summary}\n{line}".strip()
+        return True
+
+    def trim_summary(self, max_chars: int) -> None:
+        if len(self.summary) > max_chars:
+            tail = self.summary[-max_chars:]
+            self.summary = tail.split("\n", 1)[1] if "\n" in tail else tail
+
+    def compact_history(self) -> str:
+        """Render the summary plus recent turns for the prompt."""
+        if not self.summary and not self.turns:
+            return "(new conversation)"
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier in this conversation:\n{self.summary}")
+        for turn in self.turns:
+            parts.append(f"User: {turn.question}\nAssistant: {turn.answer}")
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "turns": [asdict(turn) for turn in self.turns],
+            "summary": self.summary,
+            "chunk_ids": self.chunk_ids,
+            "context_hits": [asdict(hit) for hit in self.context_hits],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ConversationSession:
+        return cls(
+            session_id=data["session_id"],
+            turns=[ConversationTurn(**turn) for turn in data.get("turns", [])],
+            summary=data.get("summary", ""),
+            chunk_ids=list(data.get("chunk_ids", [])),
+            context_hits=[VectorHit(**hit) for hit in data.get("context_hits", [])],
+        )
+
+    def size_bytes(self) -> int:
+        return len(json.dumps(self.to_dict(), default=str).encode("utf-8"))
+
+
+class SessionStore:
+    """In-memory LRU of conversation sessions with per-session byte caps and idle TTL.
+
+    Sessions evicted under memory pressure are optionally spilled to Postgres and
+    reloaded on their next turn; sessions that expire through idleness are dropped.
+    """
+
+    def __init__(self, settings: AppSettings | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.settings = settings or get_settings()
+        self.clock = clock
+        self._sessions: OrderedDict[str, ConversationSession] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create(self) -> ConversationSession:
+        """Start a session under a freshly minted id; ids are never taken from the caller."""
+        self._expire_idle()
+        session = ConversationSession(session_id=uuid.uuid4().hex, last_access=self.clock())
+        self._sessions[session.session_id] = session
+        return session
+
+    async def get(self, session_id: str) -> ConversationSession:
+        """Return a live session minted by `create`, or raise `SessionNotFound` for unknown or expired ids."""
+        self._expire_idle()
+        session = self._sessions.get(session_id)
+        if session is None and self.settings.session_spill_to_postgres:
+            session = await self._load_spilled(session_id)
+        if session is None:
+            raise SessionNotFound(session_id)
+        session.last_access = self.clock()
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def save(self, session: ConversationSession) -> None:
+        self._enforce_byte_cap(session)
+        session.last_access = self.clock()
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+
+        evicted: list[ConversationSession] = []
+        while len(self._sessions) > self.settings.session_max_sessions:
+            _, oldest = self._sessions.popitem(last=False)
+            evicted.append(oldest)
+        if evicted and self.settings.session_spill_to_postgres:
+            await self._spill(evicted)
+
+    def _enforce_byte_cap(self, session: ConversationSession) -> None:
+        cap = self.settings.session_max_bytes
+        session.trim_summary(self.settings.session_summary_chars)
+        while session.size_bytes() > cap and len(session.turns) > 1:
+            session.fold_oldest_turn()
+            session.trim_summary(self.settings.session_summary_chars)
+        while session.size_bytes() > cap and session.context_hits:
+            session.context_hits.pop()
+        if session.size_bytes() > cap:
+            session.trim_summary(self.settings.session_summary_chars // 2)
+
+    def _expire_idle(self) -> None:
+        deadline = self.clock() - self.settings.session_idle_ttl_seconds
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if oldest.last_access >= deadline:
+                break
+            del self._sessions[session_id]
+
+    async def _spill(self, sessions: list[ConversationSession]) -> None:
+        try:
+            async with get_session() as db:
+                for session in sessions:
+                    await db.merge(
+                        ConversationSessionRecord(
+                            session_id=session.session_id,
+                            payload=session.to_dict(),
+                            updated_at=datetime.now(timezone.utc),
+                        )
+                    )
+                await db.commit()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to spill %d sessions to Postgres: %s", len(sessions), exc)
+
+    async def _load_spilled(self, session_id: str) -> ConversationSession | None:
+        try:
+            async with get_session() as db:
+                record = await db.scalar(
+                    select(ConversationSessionRecord).where(ConversationSessionRecord.session_id == session_id)
+                )
+                if record is None:
+                    return None
+                age = (datetime.now(timezone.utc) - record.updated_at).total_seconds()
+                await db.delete(record)
+                await db.commit()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to load spilled session %s: %s", session_id, exc)
+            return None
+        if age > self.settings.session_idle_ttl_seconds:
+            return None
+        return ConversationSession.from_dict(record.payload)
@@ -0,0 +1,110 @@
+"""Command-line entry point for the retrieval + chat benchmark."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+from app.core.paths import EVAL_QUESTIONS_PATH
+from app.core.settings import get_settings
+from app.evaluation.benchmark import (
+    BenchmarkRunner,
+    build_offline_components,
+    compare_reports,
+    load_eval_questions,
+    save_report,
+)
+from app.providers.http import close_http_client
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay eval questions and report recall/MRR and latency percentiles.")
+    parser.add_argument("--questions", type=Path, default=EVAL_QUESTIONS_PATH, help="Eval questions JSON file")
+    parser.add_argument("--k", type=int, default=6, help="Retrieval depth used for recall@k / MRR")
+    parser.add_argument("--concurrency", type=int, default=4, help="Questions in flight at once")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the question set this many times")
+    parser.add_argument("--retrieval-only", action="store_true", help="Skip the LLM generation stage")
+    parser.add_argument("--offline", action="store_true", help="Use the local stand-in model providers")
+    parser.add_argument("--llm-latency-ms", type=int, default=0, help="Time to first token of the offline LLM")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="Streaming speed of the offline LLM")
+    parser.add_argument("--ingest", action="store_true", help="Rebuild the index before benchmarking")
+    parser.add_argument("--output", type=Path, default=None, help="Where to write the JSON report")
+    parser.add_argument("--compare", type=Path, default=None, help="Previous JSON report to diff against")
+    parser.add_argument("--memory", action="store_true", help="Measure ingestion write-path memory instead")
+    parser.add_argument("--chunking", action="store_true", help="Measure chunker throughput on the markdown corpus")
+    parser.add_argument("--corpus-copies", type=int, default=50, help="Corpus replicas chunked by --chunking")
+    parser.add_argument("--chunks", type=int, default=100_000, help="Synthetic chunks for --memory")
+    parser.add_argument("--dimensions", type=int, default=3072, help="Embedding dimensions for --memory")
+    parser.add_argument(
+        "--baseline-chunks", type=int, default=2_000, help="Chunks for the list-of-floats baseline in --memory"
+    )
+    return parser.parse_args()
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    service = pipeline = None
+    if args.offline:
+        service, pipeline = build_offline_components(
+            llm_latency_ms=args.llm_latency_ms,
+            llm_tokens_per_second=args.llm_tokens_per_second,
+        )
+    try:
+        if args.ingest:
+            if pipeline is None:
+                from app.ingestion.pipeline import IngestionPipeline
+
+                pipeline = IngestionPipeline()
+            await pipeline.run_full()
+
+        runner = BenchmarkRunner(
+            chat_service=service,
+            k=args.k,
+            concurrency=args.concurrency,
+            include_chat=not args.retrieval_only,
+        )
+        return await runner.run(load_eval_questions(args.questions), repeat=args.repeat)
+    finally:
+        await close_http_client()
+
+
+def _ingestion_report(args: argparse.Namespace) -> dict | None:
+    """Run the ingestion micro-benchmarks selected by `--memory` / `--chunking`, if any."""
+    if args.memory:
+        from app.evaluation.memory import memory_report
+
+        return memory_report(args.chunks, args.dimensions, args.baseline_chunks)
+    if args.chunking:
+        from app.evaluation.chunking import chunking_report
+
+        settings = get_settings()
+        return chunking_report(
+            chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap, copies=args.corpus_copies
+        )
+    return None
+
+
+def main() -> None:
+    """Run the benchmark and persist the report."""
+    args = _parse_args()
+    report = _ingestion_report(args)
+    if report is not None:
+        path = save_report(report, args.output)
+        print(json.dumps(report, indent=2))
+        print(f"Report written to {path}")
+        return
+    report = asyncio.run(_run(args))
+    path = save_report(report, args.output)
+    summary = {key: report[key] for key in ("retrieval", "latency_ms", "throughput_qps", "errors")}
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        summary["delta_vs_baseline"] = compare_reports(baseline, report)
+    print(json.dumps(summary, indent=2))
+    print(f"Report written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,165 @@
-"""Command-line entry point for ingestion."""
+"""Command-line entry point for ingestion.
+
+    python -m ingest                  # rebuild the corpus into the default collection
+    python -m ingest --collection billing     # rebuild one collection's partition, leaving others intact
+    python -m ingest cache prewarm    # convert every corpus PDF into the Docling cache
+    python -m ingest cache purge      # drop all cached conversions
+    python -m ingest cache stats
+    python -m ingest reembed text-embedding-3-small   # online embedding-model migration
+    python -m ingest snapshot export [path]   # pack the index into one checksummed file
+    python -m ingest snapshot import [path]   # restore it with binary COPY, no Docling or embedding calls
+    python -m ingest snapshot inspect [path]
+
+Send SIGUSR2 to a running job (`kill -USR2 <pid>`) to write a sampling profile
+to `profiles/`; event-loop stalls over `LOOP_LAG_THRESHOLD_MS` are logged.
+"""
 from __future__ import annotations
 
+import argparse
 import asyncio
 import logging
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import TypeVar
 
+from app.core.paths import SNAPSHOT_DIR, iter_pdf_paths
+from app.ingestion.conversion_cache import ConversionCache
+from app.core.profiling import install_profile_signal, start_loop_monitor, stop_loop_monitor
+from app.core.settings import get_settings
+from app.db.partitions import validate_collection
+from app.ingestion.loaders.pdf_loader import iter_pdf_windows
+from app.providers.http import close_http_client
+from app.retrieval.stores.snapshot import Snapshot, SnapshotError
+from app.ingestion.reembed import MigrationError, ReembeddingJob
+from app.ingestion.snapshot import export_snapshot, import_snapshot
 from app.services.ingestion import run_ingestion_async
 
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ingest")
+
+T = TypeVar("T")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--collection",
+        type=_collection,
+        default=None,
+        help="Collection (chunk partition) to ingest into; defaults to VECTOR_COLLECTION",
+    )
+    commands = parser.add_subparsers(dest="command")
+    cache = commands.add_parser("cache", help="Manage the on-disk Docling conversion cache")
+    cache.add_argument("action", choices=["prewarm", "purge", "stats"])
+    reembed = commands.add_parser("reembed", help="Re-embed all chunks with a new model, then switch to it")
+    reembed.add_argument("model", help="Target embedding model name")
+    reembed.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding call")
+    reembed.add_argument("--pause-seconds", type=float, default=None, help="Throttle delay between batches")
+    reembed.add_argument("--no-activate", action="store_true", help="Embed only; switch later with --activate")
+    reembed.add_argument("--activate", action="store_true", help="Switch to the model if coverage is complete")
+    reembed.add_argument("--status", action="store_true", help="Report migration coverage and exit")
+    snapshot = commands.add_parser("snapshot", help="Export or import a portable index snapshot")
+    snapshot.add_argument("action", choices=["export", "import", "inspect"])
+    snapshot.add_argument("path", type=Path, nargs="?", default=SNAPSHOT_DIR / "index.qlsnap")
+    snapshot.add_argument("--no-verify", action="store_true", help="Skip section checksums on import/inspect")
+    return parser.parse_args()
+
+
+def _collection(value: str) -> str:
+    try:
+        return validate_collection(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def run_cache_command(action: str) -> None:
+    cache = ConversionCache.from_settings()
+    if action == "prewarm":
+        pdf_paths = iter_pdf_paths()
+        window_pages = get_settings().pdf_window_pages
+        for path in pdf_paths:
+            for _ in iter_pdf_windows(path, window_pages, cache=cache):
+                pass
+            logger.info("Cached conversion for %s", path.name)
+        logger.info("Prewarmed %d PDFs", len(pdf_paths))
+    elif action == "purge":
+        logger.info("Removed %d cached conversions from %s", cache.purge(), cache.directory)
+    stats = cache.stats()
+    logger.info(
+        "Conversion cache: %d entries, %.1f / %.1f MiB",
+        stats.entries,
+        stats.total_bytes / 2**20,
+        stats.max_bytes / 2**20,
+    )
+
+
+async def run_reembed_command(args: argparse.Namespace) -> None:
+    job = ReembeddingJob(args.model, batch_size=args.batch_size, pause_seconds=args.pause_seconds)
+    if args.status:
+        progress = await job.progress()
+    elif args.activate:
+        await job.activate()
+        progress = await job.progress()
+    else:
+        progress = await job.run(activate=not args.no_activate)
+    logger.info(
+        "%s: %s, %d/%d chunks (%.1f%%)",
+        progress.model,
+        progress.status,
+        progress.embedded,
+        progress.total,
+        progress.coverage * 100,
+    )
+
+
+async def run_snapshot_command(args: argparse.Namespace) -> None:
+    if args.action == "export":
+        manifest = await export_snapshot(args.path)
+    elif args.action == "import":
+        manifest = await import_snapshot(args.path, verify=not args.no_verify)
+    else:
+        manifest = Snapshot.open(args.path, verify=not args.no_verify).manifest
+    logger.info(
+        "%s: format v%d, %s, %d chunks x %d dimensions, %d documents, created %s",
+        args.path,
+        manifest.format_version,
+        manifest.embedding_model,
+        manifest.chunks,
+        manifest.dimensions,
+        manifest.documents,
+        manifest.created_at,
+    )
+
+
+async def _monitored(job: Awaitable[T]) -> T:
+    await start_loop_monitor()
+    try:
+        return await job
+    finally:
+        await stop_loop_monitor()
+        await close_http_client()
 
 
 def main() -> None:
-    """Run the ingestion job."""
-    result = asyncio.run(run_ingestion_async())
+    """Run the ingestion job or a maintenance command."""
+    args = _parse_args()
+    install_profile_signal()
+    if args.command == "cache":
+        run_cache_command(args.action)
+        return
+    if args.command == "reembed":
+        try:
+            asyncio.run(_monitored(run_reembed_command(args)))
+        except MigrationError as exc:
+            raise SystemExit(f"Re-embedding failed: {exc}") from exc
+        return
+    if args.command == "snapshot":
+        try:
+            asyncio.run(_monitored(run_snapshot_command(args)))
+        except SnapshotError as exc:
+            raise SystemExit(f"Snapshot {args.action} failed: {exc}") from exc
+        return
+    result = asyncio.run(_monitored(run_ingestion_async(args.collection)))
     status = result.get("status")
     detail = result.get("detail")
     if status != "completed":
@@ -0,0 +1,88 @@
+"""Admission control: concurrency limits, queue shedding, deadlines and the 503 response."""
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_chat_service
+from app.core.admission import AdmissionController, AdmissionRejected, run_in_model_executor
+from app.core.deadlines import LatencyBudget, bind_budget
+from app.main import app
+from app.providers.local import HashingEmbeddings
+from app.providers.metering import MeteredEmbeddings
+
+
+def test_concurrency_limit_and_queue_shedding() -> None:
+    controller = AdmissionController("test", max_concurrency=2, max_queue=1, queue_timeout=1.0)
+    peak = 0
+    active = 0
+
+    async def call() -> str:
+        nonlocal peak, active
+        async with controller.slot():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+        return "ok"
+
+    async def _run() -> list:
+        return await asyncio.gather(*(call() for _ in range(4)), return_exceptions=True)
+
+    results = asyncio.run(_run())
+    assert peak == 2
+    assert results.count("ok") == 3
+    rejected = [result for result in results if isinstance(result, AdmissionRejected)]
+    assert len(rejected) == 1 and rejected[0].reason == "queue_full"
+
+
+def test_queue_wait_respects_deadline() -> None:
+    controller = AdmissionController("slow", max_concurrency=1, max_queue=10, queue_timeout=5.0)
+
+    async def _run() -> None:
+        async with controller.slot():
+            with pytest.raises(AdmissionRejected) as info:
+                async with controller.slot(timeout=0.01):
+                    pass
+            assert info.value.reason == "deadline"
+        assert controller.waiting == 0
+        async with controller.slot(timeout=0.01):  # slot was released
+            pass
+
+    asyncio.run(_run())
+
+
+def test_model_calls_queue_only_for_the_remaining_request_budget() -> None:
+    controller = AdmissionController("budgeted", max_concurrency=1, max_queue=10, queue_timeout=5.0)
+    embeddings = MeteredEmbeddings(HashingEmbeddings(dimensions=8), "local", admission=controller)
+
+    async def _run() -> None:
+        async with controller.slot():
+            with bind_budget(LatencyBudget(deadline=time.monotonic() + 0.05)):
+                started = time.perf_counter()
+                with pytest.raises(AdmissionRejected) as info:
+                    await embeddings.aembed_query("reset sso")
+                assert info.value.reason == "deadline"
+                assert time.perf_counter() - started < 1.0
+        assert len(await embeddings.aembed_query("reset sso")) == 8
+
+    asyncio.run(_run())
+
+
+def test_model_executor_runs_blocking_calls() -> None:
+    assert asyncio.run(run_in_model_executor(sum, [1, 2, 3])) == 6
+
+
+def test_rejection_maps_to_503_with_retry_after() -> None:
+    class OverloadedService:
+        async def answer(self, request):
+            raise AdmissionRejected("chat:gpt", "queue_full", retry_after=2.0)
+
+    app.dependency_overrides[get_chat_service] = OverloadedService
+    try:
+        response = TestClient(app).post("/chat", json={"question": "Which plans include SSO?"})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
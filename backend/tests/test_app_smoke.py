@@ -9,3 +9,10 @@ def test_healthcheck() -> None:
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_chat_schema_describes_the_shaped_body() -> None:
+    schema = TestClient(app).get("/openapi.json").json()
+    body = schema["paths"]["/chat"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert body == {"$ref": "#/components/schemas/ShapedChatResponse"}
+    assert "answer" not in schema["components"]["schemas"]["ShapedChatResponse"].get("required", [])
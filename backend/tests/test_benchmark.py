@@ -0,0 +1,94 @@
+"""Benchmark scoring helpers and the offline eval replay."""
+import asyncio
+import os
+
+import pytest
+
+from app.core.settings import AppSettings
+from app.evaluation.benchmark import (
+    BenchmarkRunner,
+    EvalQuestion,
+    build_offline_components,
+    compare_reports,
+    latency_summary,
+    load_eval_questions,
+    ranked_sources,
+    recall_at_k,
+    reciprocal_rank,
+)
+from app.retrieval.hybrid import HybridRetriever
+from app.retrieval.types import StructuredHit, VectorHit
+from app.services.chat import ChatService
+
+
+def test_ranked_sources_maps_structured_tables_to_corpus_files() -> None:
+    vector_hits = [
+        VectorHit(doc_id="KB-0003", score=0.9, content="", metadata={}),
+        VectorHit(doc_id="KB-0003", score=0.8, content="", metadata={}),
+        VectorHit(doc_id="RB-0002", score=0.7, content="", metadata={}),
+    ]
+    structured_hits = [StructuredHit(source="api_endpoints", identifier="GET /v1/metrics", content="", metadata={})]
+    assert ranked_sources(vector_hits, structured_hits) == ["KB-0003", "RB-0002", "openapi.yaml"]
+
+
+def test_recall_and_reciprocal_rank() -> None:
+    retrieved = ["KB-0004", "KB-0001", "RB-0001"]
+    expected = ["KB-0001", "RB-0001", "MAC-0001"]
+    assert recall_at_k(retrieved, expected, k=3) == pytest.approx(2 / 3)
+    assert recall_at_k(retrieved, expected, k=1) == 0.0
+    assert reciprocal_rank(retrieved, expected, k=3) == 0.5
+    assert reciprocal_rank(retrieved, expected, k=1) == 0.0
+
+
+def test_latency_summary_and_compare() -> None:
+    summary = latency_summary([float(v) for v in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+
+    baseline = {"retrieval": {"recall@6": 0.5}, "latency_ms": {"vector": {"p50": 10.0, "p95": 20.0, "p99": 30.0}}}
+    current = {"retrieval": {"recall@6": 0.75}, "latency_ms": {"vector": {"p50": 8.0, "p95": 25.0, "p99": 30.0}}}
+    deltas = compare_reports(baseline, current)
+    assert deltas["retrieval"]["recall@6"] == 0.25
+    assert deltas["latency_ms"]["vector.p50"] == -2.0
+
+
+class CountingRetriever:
+    def __init__(self, hits: list) -> None:
+        self.hits = hits
+        self.calls = 0
+
+    async def search(self, query: str, **options) -> list:
+        self.calls += 1
+        return self.hits
+
+
+def test_generation_stage_reuses_the_retrieved_context() -> None:
+    structured = CountingRetriever([])
+    vector = CountingRetriever([VectorHit(doc_id="KB-0001", score=0.9, content="Reset SSO in the console.", metadata={})])
+    retriever = HybridRetriever(structured=structured, vector=vector, lexical=CountingRetriever([]))
+    service = ChatService(AppSettings(model_provider="local", local_chat_latency_ms=0), retriever=retriever)
+    runner = BenchmarkRunner(chat_service=service, concurrency=1)
+    report = asyncio.run(runner.run([EvalQuestion(question="How do I reset SSO?", source_doc_ids=["KB-0001"])]))
+    assert (structured.calls, vector.calls) == (1, 1)
+    assert report["errors"] == 0 and "generation" in report["latency_ms"]
+
+
+def test_eval_questions_load() -> None:
+    questions = load_eval_questions()
+    assert questions
+    assert all(question.source_doc_ids for question in questions)
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="requires a local Postgres with pgvector")
+def test_offline_benchmark_replay() -> None:
+    async def _run() -> dict:
+        service, pipeline = build_offline_components()
+        await pipeline.run_full()
+        runner = BenchmarkRunner(chat_service=service, concurrency=4)
+        return await runner.run(load_eval_questions())
+
+    report = asyncio.run(_run())
+    assert report["errors"] == 0
+    assert {"structured", "vector", "generation"} <= set(report["latency_ms"])
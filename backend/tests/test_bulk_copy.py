@@ -0,0 +1,96 @@
+"""Float32 embedding matrices and the binary COPY encoding of chunk rows."""
+import base64
+import json
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+from pgvector import Vector
+
+from app.db.bulk import COPY_SIGNATURE, COPY_TRAILER, ChunkCopyBuffer, encode_vector
+from app.evaluation.memory import run_memory_benchmark
+from app.providers.arrays import embed_documents_array
+from app.providers.local import HashingEmbeddings
+from app.providers.metering import MeteredEmbeddings, ProviderMeter
+
+
+def _read_rows(data: bytes) -> list[list[bytes]]:
+    assert data.startswith(COPY_SIGNATURE) and data.endswith(COPY_TRAILER)
+    offset, rows = len(COPY_SIGNATURE), []
+    while True:
+        (fields,) = struct.unpack_from(">h", data, offset)
+        offset += 2
+        if fields == -1:
+            return rows
+        row = []
+        for _ in range(fields):
+            (length,) = struct.unpack_from(">i", data, offset)
+            row.append(data[offset + 4 : offset + 4 + length])
+            offset += 4 + length
+        rows.append(row)
+
+
+def test_vectors_use_the_pgvector_binary_format() -> None:
+    vector = np.array([0.5, -1.25, 3.0], dtype=np.float32)
+    encoded = encode_vector(vector)
+    assert struct.unpack_from(">i", encoded)[0] == len(encoded) - 4
+    assert Vector.from_binary(encoded[4:]).to_list() == [0.5, -1.25, 3.0]
+
+
+def test_copy_buffer_round_trips_rows() -> None:
+    buffer = ChunkCopyBuffer()
+    embedding = np.linspace(-1, 1, 8, dtype=np.float32)
+    buffer.add("billing", 7, 2, "Résumé exports", {"source_path": "kb/a.md", "page_start": 3}, embedding)
+    buffer.add("billing", 7, 3, "", {}, embedding)
+    assert buffer.rows == 2
+
+    first, second = _read_rows(buffer.getvalue())
+    assert first[0] == b"billing"
+    assert struct.unpack(">i", first[1]) == (7,)
+    assert struct.unpack(">i", first[2]) == (2,)
+    assert first[3].decode("utf-8") == "Résumé exports"
+    assert json.loads(first[4]) == {"source_path": "kb/a.md", "page_start": 3}
+    assert np.array_equal(Vector.from_binary(first[5]).to_numpy(), embedding)
+    assert second[3] == b""
+
+    buffer.clear()
+    assert buffer.rows == 0 and _read_rows(buffer.getvalue()) == []
+
+
+def test_hashing_embeddings_matrix_matches_lists() -> None:
+    embeddings = HashingEmbeddings(dimensions=64)
+    texts = ["reset the api key", "export usage report"]
+    matrix = MeteredEmbeddings(embeddings, provider="local", meter=ProviderMeter()).embed_documents_array(texts)
+    assert matrix.dtype == np.float32 and matrix.shape == (2, 64)
+    assert np.allclose(matrix, embeddings.embed_documents(texts))
+    assert np.allclose(matrix[0], embeddings.embed_query(texts[0]))
+
+
+def test_openai_vectors_are_decoded_from_base64() -> None:
+    expected = np.arange(12, dtype=np.float32).reshape(3, 4)
+    calls = []
+
+    def create(input, **params):
+        calls.append((list(input), params))
+        offset = len(sum((call[0] for call in calls[:-1]), []))
+        data = [
+            SimpleNamespace(index=index, embedding=base64.b64encode(expected[offset + index].astype("<f4").tobytes()))
+            for index in reversed(range(len(input)))
+        ]
+        return SimpleNamespace(data=data)
+
+    embeddings = OpenAIEmbeddings(api_key="test", model="text-embedding-3-small", dimensions=4, chunk_size=2)
+    embeddings.client = SimpleNamespace(create=create)
+    matrix = embed_documents_array(embeddings, ["a", "b", "c"])
+    assert np.array_equal(matrix, expected)
+    assert [len(call[0]) for call in calls] == [2, 1]
+    assert calls[0][1] == {"model": "text-embedding-3-small", "dimensions": 4, "encoding_format": "base64"}
+
+
+def test_array_write_path_memory_is_flat_in_corpus_size() -> None:
+    small = run_memory_benchmark(chunks=500, dimensions=256, commit_size=100)
+    large = run_memory_benchmark(chunks=2_000, dimensions=256, commit_size=100)
+    baseline = run_memory_benchmark(chunks=500, dimensions=256, representation="list")
+    assert large.peak_bytes < small.peak_bytes * 1.5
+    assert baseline.peak_bytes > small.peak_bytes * 2
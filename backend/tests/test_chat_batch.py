@@ -0,0 +1,87 @@
+"""Batch chat: de-duplication, shared retrieval and NDJSON streaming."""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_chat_service
+from app.core.settings import AppSettings
+from app.main import app
+from app.models.schemas import ChatRequest
+from app.retrieval.types import HybridContext, VectorHit
+from app.services.chat import ChatService
+
+
+class BatchRetriever:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    async def search_many(self, queries, concurrency: int = 8) -> list[HybridContext]:
+        self.batches.append([query.text for query in queries])
+        return [
+            HybridContext(
+                query=query.text,
+                structured_hits=[],
+                vector_hits=[VectorHit(doc_id=f"KB-000{index + 1}", score=0.9, content="...", metadata={})],
+            )
+            for index, query in enumerate(queries)
+        ]
+
+
+def _service(retriever: BatchRetriever) -> ChatService:
+    return ChatService(AppSettings(model_provider="local", batch_concurrency=2), retriever=retriever)
+
+
+def test_answer_many_dedupes_and_batches_retrieval() -> None:
+    retriever = BatchRetriever()
+    service = _service(retriever)
+    requests = [
+        ChatRequest(question="What are the rate limits?"),
+        ChatRequest(question="How do I export CSV?"),
+        ChatRequest(question="  what are the RATE limits? "),
+    ]
+
+    async def _collect():
+        return {index: result async for index, result in service.answer_many(requests)}
+
+    results = asyncio.run(_collect())
+    assert retriever.batches == [["What are the rate limits?", "How do I export CSV?"]]
+    assert sorted(results) == [0, 1, 2]
+    assert results[0] is results[2]
+    assert results[1].citations[0].doc_id == "KB-0002"
+
+
+def test_batch_endpoint_streams_ndjson() -> None:
+    retriever = BatchRetriever()
+    app.dependency_overrides[get_chat_service] = lambda: _service(retriever)
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/chat/batch",
+            json={"requests": [{"question": "Which plans include SSO?"}, {"question": "What is E3001?"}]},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1]
+    assert all(item["error"] is None and item["response"]["answer"] for item in items)
+
+
+class FailingService:
+    settings = AppSettings()
+
+    async def answer_many(self, requests):
+        yield 0, RuntimeError("connection to db-primary.internal:5432 failed: SELECT * FROM documents")
+
+
+def test_batch_errors_do_not_leak_exception_text() -> None:
+    app.dependency_overrides[get_chat_service] = lambda: FailingService()
+    try:
+        response = TestClient(app).post("/chat/batch", json={"requests": [{"question": "Which plans include SSO?"}]})
+    finally:
+        app.dependency_overrides.clear()
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"index": 0, "response": None, "error": "internal_error"}
+    ]
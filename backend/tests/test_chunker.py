@@ -0,0 +1,109 @@
+"""Structure-aware chunking: block parsing, section packing, offsets and oversized-block splits."""
+from pathlib import Path
+
+from app.evaluation.chunking import chunking_report, legacy_chunks
+from app.ingestion.chunker import StructureChunker, iter_blocks
+from app.ingestion.loaders.markdown_loader import chunk_markdown
+from app.ingestion.types import DocumentMetadata
+
+METADATA = DocumentMetadata(doc_id="KB-0100")
+
+DOCUMENT = """# Exports
+
+Exports run nightly.
+
+## Limits
+| plan | rows |
+|------|------|
+| pro  | 10k  |
+
+```yaml
+export:
+  format: csv
+```
+
+## Steps
+1. Open **Reports**.
+2. Click export
+   and wait.
+
+- lazy item
+continued here
+"""
+
+
+def test_blocks_follow_markdown_structure() -> None:
+    blocks = list(iter_blocks(DOCUMENT))
+    assert [block.kind for block in blocks] == [
+        "heading",
+        "paragraph",
+        "heading",
+        "table",
+        "code",
+        "heading",
+        "list",
+    ]
+    assert [DOCUMENT[block.start : block.end] for block in blocks][3:5] == [
+        "| plan | rows |\n|------|------|\n| pro  | 10k  |",
+        "```yaml\nexport:\n  format: csv\n```",
+    ]
+    assert DOCUMENT[blocks[-1].start : blocks[-1].end].endswith("continued here")
+    assert blocks[4].section == ("Exports", "Limits")
+    assert blocks[-1].section == ("Exports", "Steps")
+
+
+def test_chunks_are_slices_of_the_source_with_section_paths() -> None:
+    chunks = list(StructureChunker(chunk_size=20, chunk_overlap=2).chunk_text(DOCUMENT, METADATA))
+    for chunk in chunks:
+        assert chunk.content == DOCUMENT[chunk.extra["char_start"] : chunk.extra["char_end"]]
+    assert [chunk.extra["section_path"] for chunk in chunks] == [
+        ["Exports"],
+        ["Exports", "Limits"],
+        ["Exports", "Steps"],
+    ]
+    # Headings open the chunk of the section they introduce.
+    assert chunks[1].content.startswith("## Limits\n| plan")
+    assert chunks[2].content.startswith("## Steps")
+    assert [chunk.ordinal for chunk in chunks] == [0, 1, 2]
+
+
+def test_small_sections_are_packed_together() -> None:
+    chunks = list(StructureChunker(chunk_size=800, chunk_overlap=120).chunk_text(DOCUMENT, METADATA))
+    assert len(chunks) == 1
+    assert chunks[0].content == DOCUMENT.strip()
+
+
+def test_oversized_prose_is_split_by_words_with_overlap() -> None:
+    text = "## Long\n" + " ".join(f"w{i}" for i in range(25))
+    chunks = list(StructureChunker(chunk_size=10, chunk_overlap=3).chunk_text(text, METADATA))
+    assert [chunk.content.split() for chunk in chunks] == [
+        ["##", "Long", *[f"w{i}" for i in range(10)]],
+        [f"w{i}" for i in range(7, 17)],
+        [f"w{i}" for i in range(14, 24)],
+        ["w21", "w22", "w23", "w24"],
+    ]
+    assert all(chunk.extra["section_path"] == ["Long"] for chunk in chunks)
+
+
+def test_oversized_code_is_split_on_lines() -> None:
+    code = "```\n" + "\n".join(f"line {i} a b" for i in range(6)) + "\n```"
+    chunks = list(StructureChunker(chunk_size=8, chunk_overlap=2).chunk_text(code, METADATA))
+    assert all(chunk.content == code[chunk.extra["char_start"] : chunk.extra["char_end"]] for chunk in chunks)
+    assert all(len(chunk.content.split()) <= 8 for chunk in chunks)
+    assert "\n".join(chunk.content for chunk in chunks) == code
+
+
+def test_markdown_loader_uses_the_shared_chunker(tmp_path: Path) -> None:
+    path = tmp_path / "KB-0100_exports.md"
+    path.write_text(f"---\ndoc_id: KB-0100\n---\n{DOCUMENT}", encoding="utf-8")
+    (chunk,) = chunk_markdown(path, chunk_size=800, chunk_overlap=120)
+    assert chunk.metadata.doc_id == "KB-0100"
+    assert chunk.extra == {"section_path": ["Exports"], "char_start": 0, "char_end": len(DOCUMENT.strip())}
+
+
+def test_throughput_benchmark_reports_both_implementations() -> None:
+    assert legacy_chunks("a b c d e", chunk_size=3, chunk_overlap=1) == ["a b c", "c d e"]
+    report = chunking_report([DOCUMENT], chunk_size=20, chunk_overlap=2, copies=3)
+    assert report["documents"] == 3
+    assert report["structured"]["chunks"] == 9
+    assert report["legacy"]["chunks"] > 0 and report["speedup"] is not None
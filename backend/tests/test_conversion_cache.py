@@ -0,0 +1,60 @@
+"""Docling conversion cache: keying, atomic writes and LRU eviction."""
+import os
+from datetime import date
+from pathlib import Path
+
+from app.ingestion.conversion_cache import ConversionCache
+from app.ingestion.types import DocumentMetadata
+
+
+def _metadata(path: Path) -> DocumentMetadata:
+    return DocumentMetadata(
+        doc_id="KB-0001",
+        title="Resetting API keys",
+        product_scope=["api"],
+        effective_date=date(2024, 5, 1),
+        source_path=path,
+        extra={"owner": "support"},
+    )
+
+
+def test_roundtrip_and_key_sensitivity(tmp_path: Path) -> None:
+    pdf = tmp_path / "guide.pdf"
+    pdf.write_bytes(b"%PDF-1.4 first")
+    cache = ConversionCache(tmp_path / "cache", max_bytes=1 << 20)
+
+    key = cache.key_for(pdf, {"export": "markdown"})
+    assert cache.get(key, pdf) is None
+    cache.put(key, _metadata(pdf), "# Resetting API keys\nbody")
+
+    metadata, body = cache.get(key, pdf)
+    assert body == "# Resetting API keys\nbody"
+    assert metadata.doc_id == "KB-0001"
+    assert metadata.effective_date == date(2024, 5, 1)
+    assert metadata.source_path == pdf
+    assert not list((tmp_path / "cache").glob(".tmp-*"))
+
+    assert cache.key_for(pdf, {"export": "html"}) != key
+    pdf.write_bytes(b"%PDF-1.4 second")
+    assert cache.key_for(pdf, {"export": "markdown"}) != key
+
+
+def test_lru_eviction_respects_size_cap(tmp_path: Path) -> None:
+    pdf = tmp_path / "guide.pdf"
+    pdf.write_bytes(b"%PDF")
+    cache = ConversionCache(tmp_path / "cache", max_bytes=2_500)
+
+    cache.put("a", _metadata(pdf), "a" * 1_000)
+    cache.put("b", _metadata(pdf), "b" * 1_000)
+    os.utime(cache.directory / "a.json", (1, 1))
+    os.utime(cache.directory / "b.json", (2, 2))
+    assert cache.get("a", pdf) is not None  # hit makes "a" most recently used
+
+    cache.put("c", _metadata(pdf), "c" * 1_000)
+    assert cache.get("b", pdf) is None
+    assert cache.get("a", pdf) is not None
+    assert cache.stats().total_bytes <= 2_500
+
+    assert cache.purge() == 2
+    assert cache.stats().entries == 0
+
@@ -0,0 +1,108 @@
+"""Latency budgets: per-branch deadlines, lexical fallback and templated answers on a missed TTFT."""
+import asyncio
+import time
+
+import pytest
+
+from app.api.responses import shape_chat_response
+from app.core.deadlines import LatencyBudget
+from app.core.settings import AppSettings
+from app.models.schemas import ChatRequest
+from app.retrieval.hybrid import HybridRetriever
+from app.retrieval.types import StructuredHit, VectorHit
+from app.services.chat import ChatService
+
+
+class SlowStructured:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+
+    async def search(self, query: str) -> list[StructuredHit]:
+        await asyncio.sleep(self.delay)
+        return [StructuredHit(source="plans", identifier="pro", content="Pro includes SSO.", metadata={})]
+
+
+class SlowVector:
+    def __init__(self, delay: float = 0.0, error: Exception | None = None) -> None:
+        self.delay = delay
+        self.error = error
+
+    async def search(self, query: str, **options) -> list[VectorHit]:
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [VectorHit(doc_id="KB-0001", score=0.9, content="Vector hit.", metadata={})]
+
+
+class FakeLexical:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.cancelled = False
+
+    async def search(self, query: str, **options) -> list[VectorHit]:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return [VectorHit(doc_id="KB-0002", score=0.4, content="Lexical hit.", metadata={"retrieval": "lexical"})]
+
+
+def test_budget_caps_components_by_the_request_deadline() -> None:
+    settings = AppSettings(vector_deadline_ms=500, structured_deadline_ms=0)
+    assert LatencyBudget.from_settings(settings).timeout("vector") == 0.5
+    assert LatencyBudget.from_settings(settings).timeout("structured") is None
+
+    budget = LatencyBudget.from_settings(settings, total_ms=100)
+    assert budget.timeout("vector") <= 0.1
+    assert 0 < budget.timeout("structured") <= 0.1
+    assert LatencyBudget(vector=1.0, deadline=time.monotonic() - 1).timeout("vector") == 0.0
+
+
+def test_slow_vector_branch_falls_back_to_lexical_hits() -> None:
+    retriever = HybridRetriever(structured=SlowStructured(), vector=SlowVector(delay=5), lexical=FakeLexical(0.01))
+    started = time.perf_counter()
+    context = asyncio.run(retriever.search("sso", budget=LatencyBudget(vector=0.05, lexical=0.5)))
+    assert time.perf_counter() - started < 1
+    assert context.degraded == ["vector"]
+    assert [hit.doc_id for hit in context.vector_hits] == ["KB-0002"]
+    assert context.structured_hits[0].identifier == "pro"
+
+
+def test_lexical_hedge_is_cancelled_when_vector_answers_in_time() -> None:
+    lexical = FakeLexical(delay=5)
+    retriever = HybridRetriever(structured=SlowStructured(delay=5), vector=SlowVector(), lexical=lexical)
+    context = asyncio.run(retriever.search("sso", budget=LatencyBudget(structured=0.05, vector=1.0, lexical=1.0)))
+    assert context.degraded == ["structured"]
+    assert context.structured_hits == []
+    assert [hit.doc_id for hit in context.vector_hits] == ["KB-0001"]
+    assert lexical.cancelled
+
+
+def test_vector_errors_are_not_treated_as_timeouts() -> None:
+    retriever = HybridRetriever(
+        structured=SlowStructured(), vector=SlowVector(error=ValueError("bad")), lexical=FakeLexical()
+    )
+    with pytest.raises(ValueError):
+        asyncio.run(retriever.search("sso", budget=LatencyBudget(vector=1.0)))
+
+
+def test_missed_ttft_returns_a_templated_answer_from_top_hits() -> None:
+    settings = AppSettings(
+        model_provider="local",
+        local_chat_latency_ms=2000,
+        llm_ttft_deadline_ms=50,
+        vector_deadline_ms=50,
+    )
+    retriever = HybridRetriever(structured=SlowStructured(), vector=SlowVector(delay=5), lexical=FakeLexical())
+    service = ChatService(settings, retriever=retriever)
+    started = time.perf_counter()
+    response = asyncio.run(service.answer(ChatRequest(question="Does Pro include SSO?")))
+    assert time.perf_counter() - started < 1.5
+    assert sorted(response.degraded) == ["llm", "vector"]
+    assert "[plans:pro] Pro includes SSO." in response.answer
+    assert "[KB-0002] Lexical hit." in response.answer
+    assert [citation.doc_id for citation in response.citations] == ["KB-0002"]
+
+    shaped = shape_chat_response(response, fields=["answer"])
+    assert shaped["degraded"] == response.degraded
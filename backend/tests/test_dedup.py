@@ -0,0 +1,76 @@
+"""MinHash/LSH near-duplicate detection and provenance on kept chunks."""
+import asyncio
+import json
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.settings import AppSettings
+from app.ingestion.dedup import ChunkDeduplicator, KeptChunk
+from app.db.models import Document
+from app.ingestion.pipeline import IngestionPipeline, _attach_provenance
+from app.ingestion.types import DocumentChunk, DocumentMetadata
+from app.providers.local import HashingEmbeddings
+
+BOILERPLATE = " ".join(
+    "If the issue persists after these steps escalate to tier two support with the ticket id "
+    "and attach the customer account region and plan details".split() * 6
+)
+
+
+def _chunk(doc_id: str, content: str, ordinal: int = 0) -> DocumentChunk:
+    return DocumentChunk(content=content, metadata=DocumentMetadata(doc_id=doc_id), ordinal=ordinal)
+
+
+def test_near_duplicates_are_detected_and_distinct_text_kept() -> None:
+    dedup = ChunkDeduplicator(threshold=0.8, vector_bytes=12_288)
+    original = _chunk("MAC-0001", BOILERPLATE)
+    near_copy = _chunk("RB-0002", BOILERPLATE.replace("tier two", "tier 2", 1))
+    unrelated = _chunk("KB-0003", " ".join(f"term{i}" for i in range(150)))
+
+    assert dedup.find_duplicate(original) is None
+    assert dedup.find_duplicate(near_copy) == KeptChunk("MAC-0001", 0)
+    assert dedup.find_duplicate(unrelated) is None
+    assert dedup.stats.chunks_seen == 3
+    assert dedup.stats.duplicates == 1
+    assert dedup.stats.vector_bytes_saved == 12_288
+    assert dedup.stats.embedding_calls_saved(batch_size=1) == 1
+    assert dedup.stats.embedding_calls_saved(batch_size=50) == 0
+
+
+def test_pipeline_drops_duplicates_and_records_provenance() -> None:
+    pipeline = IngestionPipeline(AppSettings(dedup_threshold=0.8), embeddings=HashingEmbeddings(16))
+    chunks = [
+        _chunk("MAC-0001", BOILERPLATE),
+        _chunk("RB-0002", BOILERPLATE, ordinal=4),
+        _chunk("MAC-0001", BOILERPLATE, ordinal=1),
+        _chunk("KB-0003", "Rotate API keys from the developer settings page."),
+    ]
+    provenance: dict = {}
+    kept = list(pipeline._iter_unique(chunks, pipeline._deduplicator(), provenance))
+
+    assert [chunk.metadata.doc_id for chunk in kept] == ["MAC-0001", "KB-0003"]
+    assert provenance == {
+        KeptChunk("MAC-0001", 0): [{"doc_id": "RB-0002", "source_path": "None", "chunk_index": 4}]
+    }
+    assert "also_in" not in kept[0].extra
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict]] = []
+
+    async def execute(self, statement, params):
+        self.calls.append((str(statement.compile(dialect=postgresql.dialect())), params))
+
+
+def test_provenance_is_attached_in_one_statement() -> None:
+    also_in = [{"doc_id": "RB-0002", "source_path": "None", "chunk_index": 4}]
+    provenance = {KeptChunk("MAC-0001", 0): also_in, KeptChunk("KB-0003", 2): also_in}
+    documents = {"MAC-0001": Document(id=11, doc_id="MAC-0001"), "KB-0003": Document(id=12, doc_id="KB-0003")}
+    session = RecordingSession()
+    asyncio.run(_attach_provenance(session, "document_chunks_support_load", provenance, documents))
+
+    ((sql, params),) = session.calls
+    assert sql.startswith("UPDATE document_chunks_support_load AS c") and "unnest(" in sql
+    assert params["document_ids"] == [11, 12] and params["chunk_indexes"] == [0, 2]
+    assert [json.loads(value) for value in params["also_in"]] == [also_in, also_in]
@@ -0,0 +1,62 @@
+"""OpenAPI path-template radix tree: span extraction, parameter capture and literal precedence."""
+from app.ingestion.types import StructuredRecord
+from app.retrieval.endpoint_index import EndpointIndex, get_endpoint_index
+
+
+def _record(method: str, path: str, **extra) -> StructuredRecord:
+    return StructuredRecord(
+        table="api_endpoints",
+        payload={
+            "path": path,
+            "method": method,
+            "summary": f"{method} {path}",
+            "description": None,
+            "extra": {"parameters": extra.get("parameters"), "responses": extra.get("responses")},
+        },
+    )
+
+
+INDEX = EndpointIndex.from_records(
+    [
+        _record("GET", "/v1/dashboards/{id}", parameters=[{"name": "id", "in": "path"}]),
+        _record("GET", "/v1/dashboards/{id}/export", responses={"200": {"description": "CSV"}}),
+        _record("POST", "/v1/dashboards/{id}/export"),
+        _record("GET", "/v1/dashboards/shared"),
+    ]
+)
+
+
+def test_pasted_request_resolves_to_template_with_params() -> None:
+    hits = INDEX.match_question("Why does GET /v1/dashboards/8812/export?format=csv time out?")
+    assert [hit.identifier for hit in hits] == ["GET /v1/dashboards/{id}/export"]
+    assert hits[0].metadata["path_params"] == {"id": "8812"}
+    assert hits[0].metadata["query_params"] == {"format": "csv"}
+    assert hits[0].metadata["responses"] == {"200": {"description": "CSV"}}
+
+
+def test_methodless_spans_return_all_methods_and_literals_win() -> None:
+    identifiers = {hit.identifier for hit in INDEX.match_question("see https://api.example.com/v1/dashboards/42/export.")}
+    assert identifiers == {"GET /v1/dashboards/{id}/export", "POST /v1/dashboards/{id}/export"}
+
+    shared = INDEX.resolve("GET", "/v1/dashboards/shared")
+    assert [match.route.template for match in shared] == ["/v1/dashboards/shared"]
+    assert INDEX.resolve("DELETE", "/v1/dashboards/1") == []
+    assert INDEX.match_question("does and/or /v2/unknown work") == []
+
+
+def test_path_params_use_each_routes_own_names() -> None:
+    index = EndpointIndex.from_records(
+        [
+            _record("GET", "/v1/users/{id}"),
+            _record("GET", "/v1/users/{user_id}/tokens/{token_id}"),
+            _record("DELETE", "/v1/users/{user_id}"),
+        ]
+    )
+    assert index.resolve("GET", "/v1/users/7/tokens/t-9")[0].path_params == {"user_id": "7", "token_id": "t-9"}
+    by_method = {match.route.method: match.path_params for match in index.resolve(None, "/v1/users/7")}
+    assert by_method == {"GET": {"id": "7"}, "DELETE": {"user_id": "7"}}
+
+
+def test_index_builds_from_corpus_spec() -> None:
+    hits = get_endpoint_index().match_question("GET /v1/metrics?metric_id=mrr returns 401")
+    assert [hit.identifier for hit in hits] == ["GET /v1/metrics"]
@@ -0,0 +1,27 @@
+"""Unit tests for MMR re-ranking."""
+import numpy as np
+
+from app.retrieval.mmr import mmr_select
+
+
+def test_mmr_pure_relevance_matches_similarity_order() -> None:
+    query = np.array([1.0, 0.0])
+    candidates = np.array([[0.5, 0.5], [1.0, 0.0], [0.0, 1.0], [0.9, 0.1]])
+    assert mmr_select(query, candidates, k=3, lambda_mult=1.0) == [1, 3, 0]
+
+
+def test_mmr_skips_near_duplicates() -> None:
+    query = np.array([1.0, 0.0])
+    candidates = np.array(
+        [
+            [1.0, 0.2],
+            [1.0, 0.21],  # near-duplicate of the first candidate
+            [0.8, -0.6],
+        ]
+    )
+    assert mmr_select(query, candidates, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_handles_small_pools() -> None:
+    assert mmr_select([1.0, 0.0], [[1.0, 0.0]], k=5) == [0]
+    assert mmr_select([1.0, 0.0], np.empty((0, 2)), k=3) == []
@@ -0,0 +1,144 @@
+"""Collections: partition naming, partitioned DDL, and collection-routed retrieval."""
+import asyncio
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.settings import AppSettings
+from app.db.models import DocumentChunk
+from app.db.partitions import (
+    CollectionError,
+    attach_staging_partition,
+    create_staging_partition,
+    drop_partition,
+    migrate_unpartitioned_chunks,
+    partition_name,
+    staging_name,
+    validate_collection,
+)
+from app.models.schemas import ChatRequest
+from app.providers.local import HashingEmbeddings
+from app.retrieval.stores.snapshot import SnapshotVectorStore, SnapshotWriter
+from app.retrieval.vector import VectorRetriever, vector_distance
+
+EMBEDDINGS = HashingEmbeddings(dimensions=32)
+DIALECT = postgresql.dialect()
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(dialect=DIALECT))
+
+
+def test_collection_names_become_safe_partition_names() -> None:
+    settings = AppSettings(vector_table_name="document_embeddings")
+    assert partition_name("billing_v2", settings) == "document_embeddings_billing_v2"
+    for name in ("", "Billing", "billing-eu", "x; DROP TABLE documents", "a" * 41):
+        with pytest.raises(CollectionError):
+            validate_collection(name)
+    with pytest.raises(CollectionError):
+        partition_name("a" * 40, AppSettings(vector_table_name="b" * 30))
+    with pytest.raises(ValidationError):
+        ChatRequest(question="Refunds?", collection="Billing EU")
+    assert ChatRequest(question="Refunds?", collection="billing").collection == "billing"
+
+
+def test_chunk_table_is_list_partitioned_with_a_halfvec_hnsw_index() -> None:
+    ddl = _compile(CreateTable(DocumentChunk.__table__))
+    assert "PARTITION BY LIST (collection)" in ddl
+    assert "PRIMARY KEY (id, collection)" in ddl
+    (hnsw,) = [index for index in DocumentChunk.__table__.indexes if index.name == "ix_document_chunks_embedding_hnsw"]
+    index_ddl = _compile(CreateIndex(hnsw))
+    assert "USING hnsw" in index_ddl and "halfvec(3072)) halfvec_cosine_ops" in index_ddl
+
+
+def test_vector_queries_filter_on_the_collection_and_match_the_index_expression() -> None:
+    distance = vector_distance(None, [0.0] * 3)
+    stmt = select(DocumentChunk.id).where(DocumentChunk.collection == "billing").order_by(distance)
+    sql = _compile(stmt)
+    assert "document_chunks.collection = " in sql
+    assert "CAST(document_chunks.embedding AS HALFVEC(3072)) <=> " in sql
+
+
+def test_snapshot_store_routes_queries_to_one_collection(tmp_path: Path) -> None:
+    texts = ["Refunds are issued within fourteen days", "Refunds for annual plans are prorated"]
+    records = {
+        "tables": {},
+        "documents": [
+            {"collection": "billing", "doc_id": "POL-0001", "title": "Refunds", "effective_date": None},
+            {"collection": "billing_eu", "doc_id": "POL-0001", "title": "Refunds (EU)", "effective_date": None},
+        ],
+        "chunks": [[0, 0, texts[0], {}], [1, 0, texts[1], {}]],
+    }
+    path = tmp_path / "index.qlsnap"
+    with SnapshotWriter(path) as writer:
+        writer.add(EMBEDDINGS.embed_documents_array(texts))
+        writer.finish(records, "hashing-32")
+    retriever = VectorRetriever(AppSettings(), embeddings=EMBEDDINGS, store=SnapshotVectorStore.from_path(path))
+
+    assert len(asyncio.run(retriever.search("refunds", k=5))) == 2
+    hits = asyncio.run(retriever.search("refunds", k=5, collection="billing_eu"))
+    assert [hit.chunk_id for hit in hits] == [2]
+    assert asyncio.run(retriever.search("refunds", k=5, collection="support")) == []
+
+
+class RecordingConnection:
+    def __init__(self, relkind: str | None) -> None:
+        self.relkind = relkind
+        self.statements: list[str] = []
+
+    async def scalar(self, statement):
+        return self.relkind
+
+    async def execute(self, statement):
+        self.statements.append(" ".join(_compile(statement).split()))
+
+
+def test_unpartitioned_chunk_table_is_rebuilt_into_the_default_collection() -> None:
+    settings = AppSettings(vector_collection="support", vector_table_name="document_embeddings")
+    for relkind in ("p", None):
+        connection = RecordingConnection(relkind)
+        assert not asyncio.run(migrate_unpartitioned_chunks(connection, settings))
+        assert connection.statements == []
+
+    connection = RecordingConnection("r")
+    assert asyncio.run(migrate_unpartitioned_chunks(connection, settings))
+    sql = connection.statements
+    steps = [
+        "UPDATE documents SET collection = 'support'",
+        "UNIQUE (collection, doc_id)",
+        "RENAME TO document_chunks_unpartitioned",
+        "PARTITION BY LIST (collection)",
+        "document_embeddings_support PARTITION OF document_chunks FOR VALUES IN ('support')",
+        "INSERT INTO document_chunks",
+        "setval(",
+        "DROP TABLE document_chunks_unpartitioned CASCADE",
+        "CREATE INDEX ix_document_chunks_embedding_hnsw",
+    ]
+    positions = [next(index for index, statement in enumerate(sql) if step in statement) for step in steps]
+    assert positions == sorted(positions)
+
+
+def test_collections_are_loaded_into_staging_and_swapped_in() -> None:
+    settings = AppSettings(vector_table_name="document_embeddings")
+    connection = RecordingConnection(None)
+
+    async def _run() -> None:
+        assert await create_staging_partition(connection, "billing", settings) == "document_embeddings_billing_load"
+        await drop_partition(connection, "billing", settings)
+        assert await attach_staging_partition(connection, "billing", settings) == "document_embeddings_billing"
+
+    asyncio.run(_run())
+    assert connection.statements == [
+        "DROP TABLE IF EXISTS document_embeddings_billing_load",
+        "CREATE TABLE document_embeddings_billing_load (LIKE document_chunks INCLUDING DEFAULTS INCLUDING INDEXES, "
+        "CHECK (collection = 'billing'))",
+        "DROP TABLE IF EXISTS document_embeddings_billing",
+        "ALTER TABLE document_embeddings_billing_load RENAME TO document_embeddings_billing",
+        "ALTER TABLE document_chunks ATTACH PARTITION document_embeddings_billing FOR VALUES IN ('billing')",
+    ]
+    with pytest.raises(CollectionError):
+        staging_name("a" * 40, AppSettings(vector_table_name="b" * 20))
@@ -0,0 +1,91 @@
+"""Page-windowed PDF conversion: incremental chunks, page spans and cross-window overlap."""
+from pathlib import Path
+
+import pytest
+
+from app.ingestion.chunker import PAGE_SEPARATOR, StructureChunker
+from app.ingestion import conversion_cache
+from app.ingestion.conversion_cache import ConversionCache
+from app.ingestion.loaders import pdf_loader
+from app.ingestion.types import DocumentMetadata
+
+PAGES = {page: " ".join(f"p{page}w{i}" for i in range(7)) for page in range(1, 11)}
+
+
+@pytest.fixture
+def fake_pdf(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[Path, list[tuple[int, int]]]:
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(b"%PDF-1.4 manual")
+    conversions: list[tuple[int, int]] = []
+
+    def fake_convert_pages(_: Path, first: int, last: int) -> list[tuple[int, str]]:
+        conversions.append((first, last))
+        return [(page, PAGES[page]) for page in range(first, last + 1)]
+
+    monkeypatch.setattr(pdf_loader, "page_count", lambda _: len(PAGES))
+    monkeypatch.setattr(pdf_loader, "_convert_pages", fake_convert_pages)
+    monkeypatch.setattr(pdf_loader, "get_conversion_cache", lambda: None)
+    return path, conversions
+
+
+def test_windowed_chunks_match_whole_document_chunking(fake_pdf) -> None:
+    path, conversions = fake_pdf
+    windowed = list(pdf_loader.chunk_pdf(path, chunk_size=16, chunk_overlap=3, window_pages=3))
+    assert conversions == [(1, 3), (4, 6), (7, 9), (10, 10)]
+
+    metadata = DocumentMetadata(doc_id="manual")
+    whole = list(StructureChunker(16, 3).chunk_pages(PAGES.items(), metadata))
+    assert [(chunk.content, chunk.extra) for chunk in windowed] == [(chunk.content, chunk.extra) for chunk in whole]
+    assert [chunk.ordinal for chunk in windowed] == list(range(9))
+
+    # Chunk spanning the page 3 / page 4 window boundary keeps both pages, the overlap and addresses the joined text.
+    joined = PAGE_SEPARATOR.join(PAGES.values())
+    boundary = next(chunk for chunk in windowed if chunk.extra["page_start"] == 3)
+    assert boundary.extra["page_end"] == 4
+    previous = windowed[boundary.ordinal - 1]
+    assert previous.content.split()[-3:] == boundary.content.split()[:3]
+    assert boundary.content == f"p3w4 p3w5 p3w6\n\n{PAGES[4]}"
+    assert joined[boundary.extra["char_start"] : boundary.extra["char_end"]] == f"p3w4 p3w5 p3w6{PAGE_SEPARATOR}{PAGES[4]}"
+
+
+def test_chunks_are_yielded_before_later_windows_convert(fake_pdf) -> None:
+    path, conversions = fake_pdf
+    chunks = pdf_loader.chunk_pdf(path, chunk_size=16, chunk_overlap=3, window_pages=3)
+    first = next(chunks)
+    assert first.extra == {
+        "section_path": [],
+        "char_start": 0,
+        "char_end": len(PAGES[1]) + 1 + len(PAGES[2]),
+        "page_start": 1,
+        "page_end": 2,
+    }
+    assert conversions == [(1, 3)]
+
+
+def test_windows_are_cached_individually(fake_pdf, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path, conversions = fake_pdf
+    hashed: list[Path] = []
+    digest = conversion_cache.file_digest
+    monkeypatch.setattr(pdf_loader, "file_digest", lambda file: hashed.append(file) or digest(file))
+    monkeypatch.setattr(conversion_cache, "file_digest", lambda file: hashed.append(file) or digest(file))
+    cache = ConversionCache(tmp_path / "cache", max_bytes=1 << 20)
+    first_run = list(pdf_loader.iter_pdf_windows(path, 4, cache=cache))
+    second_run = list(pdf_loader.iter_pdf_windows(path, 4, cache=cache))
+    assert conversions == [(1, 4), (5, 8), (9, 10)]
+    assert hashed == [path, path]  # once per run, not once per window
+    assert [pages for _, pages in second_run] == [pages for _, pages in first_run]
+    assert cache.stats().entries == 3
+
+
+def test_front_matter_is_only_parsed_from_the_first_page(fake_pdf, tmp_path: Path, monkeypatch) -> None:
+    path, _ = fake_pdf
+    pages = {**PAGES, 1: f"---\ndoc_id: MAN-0001\n---\n{PAGES[1]}", 5: "---\ndoc_id: NOT-META\n---\nbody"}
+    monkeypatch.setattr(
+        pdf_loader, "_convert_pages", lambda _, first, last: [(page, pages[page]) for page in range(first, last + 1)]
+    )
+    cache = ConversionCache(tmp_path / "cache", max_bytes=1 << 20)
+    for _ in range(2):  # the second run is served from the cache
+        windows = list(pdf_loader.iter_pdf_windows(path, 4, cache=cache))
+        assert {metadata.doc_id for metadata, _ in windows} == {"MAN-0001"}
+        assert windows[0][1][0] == (1, PAGES[1])
+        assert windows[1][1][0] == (5, pages[5])
@@ -0,0 +1,98 @@
+"""Sampling profiler, event-loop lag monitor and the admin profiling surface."""
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import ProfilingMiddleware
+from app.api.routes import admin
+from app.core.profiling import LoopLagMonitor, SamplingProfiler
+from app.core.settings import AppSettings
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_profiler_emits_collapsed_stacks() -> None:
+    profiler = SamplingProfiler(interval=0.001).start()
+    _busy_wait(0.1)
+    profiler.stop()
+
+    assert profiler.sample_count > 0
+    stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed().splitlines())
+    busy = [stack for stack in stacks if "_busy_wait (tests/test_profiling.py:" in stack]
+    assert busy and all(stack.startswith("MainThread;") for stack in busy)
+    assert sum(int(stacks[stack]) for stack in busy) > 10
+
+
+def test_loop_monitor_captures_the_blocking_call() -> None:
+    async def scenario() -> LoopLagMonitor:
+        monitor = LoopLagMonitor(threshold=0.05, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _busy_wait(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+    assert len(monitor.stalls) == 1
+    stall = monitor.stalls[0]
+    assert stall.blocked_ms >= 50
+    assert stall.stack.startswith("event-loop;")
+    assert "_busy_wait" in stall.stack
+
+
+@pytest.fixture
+def admin_client(monkeypatch: pytest.MonkeyPatch, tmp_path) -> TestClient:
+    settings = AppSettings(admin_token="secret", profile_dir=tmp_path, profile_interval_ms=1.0)
+    monkeypatch.setattr("app.api.deps.get_settings", lambda: settings)
+    monkeypatch.setattr("app.api.routes.admin.get_settings", lambda: settings)
+    monkeypatch.setattr("app.api.middleware.get_settings", lambda: settings)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(admin.router)
+
+    @app.get("/work")
+    def work() -> dict:
+        _busy_wait(0.05)
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_admin_routes_require_the_token(admin_client: TestClient) -> None:
+    assert admin_client.get("/admin/profiles").status_code == 403
+    assert admin_client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert admin_client.get("/admin/profiles", headers={"X-Admin-Token": "secret"}).json() == []
+
+
+def test_admin_routes_are_hidden_without_a_configured_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("app.api.deps.get_settings", lambda: AppSettings(admin_token=None))
+    app = FastAPI()
+    app.include_router(admin.router)
+    assert TestClient(app).get("/admin/loop-lag", headers={"X-Admin-Token": ""}).status_code == 404
+
+
+def test_worker_profile_is_returned_and_stored(admin_client: TestClient) -> None:
+    headers = {"X-Admin-Token": "secret"}
+    response = admin_client.post("/admin/profile", params={"seconds": 0.05}, headers=headers)
+    assert response.status_code == 200
+    assert int(response.headers["x-profile-samples"]) > 0
+    name = response.headers["x-profile-file"]
+    assert [entry["name"] for entry in admin_client.get("/admin/profiles", headers=headers).json()] == [name]
+    assert admin_client.get(f"/admin/profiles/{name}", headers=headers).text == response.text
+    assert admin_client.post("/admin/profile", params={"seconds": 600}, headers=headers).status_code == 422
+
+
+def test_per_request_profile_needs_header_and_token(admin_client: TestClient, tmp_path) -> None:
+    assert "x-profile-file" not in admin_client.get("/work", headers={"X-Profile": "1"}).headers
+    response = admin_client.get("/work", headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+    assert response.json() == {"ok": True}
+    profile = (tmp_path / response.headers["x-profile-file"]).read_text()
+    assert "_busy_wait" in profile
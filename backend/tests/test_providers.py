@@ -0,0 +1,103 @@
+"""Local stand-in providers and call metering."""
+import asyncio
+import base64
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+from langchain_openai import OpenAIEmbeddings
+
+from app.core.settings import AppSettings
+from app.providers.factory import create_chat_model, create_embeddings
+from app.providers.http import close_http_client, get_http_client
+from app.providers.local import HashingEmbeddings, LocalChatModel
+from app.providers.metering import MeteredChatModel, MeteredEmbeddings, ProviderMeter
+
+
+def test_hashing_embeddings_are_deterministic_and_lexical() -> None:
+    embedder = HashingEmbeddings(dimensions=256)
+    query = np.array(embedder.embed_query("reset SSO password"))
+    related, unrelated = (np.array(v) for v in embedder.embed_documents(["How to reset an SSO password", "Refund policy"]))
+    assert query.shape == (256,)
+    assert np.allclose(query, embedder.embed_query("reset SSO password"))
+    assert float(query @ related) > float(query @ unrelated)
+
+
+def test_local_chat_model_streams_and_cites_context() -> None:
+    llm = LocalChatModel(tokens_per_second=1000)
+    messages = [HumanMessage(content="[KB-0001] score=0.9 :: reset\n[RB-0001] score=0.8 :: triage")]
+
+    async def _collect() -> list[str]:
+        return [str(chunk.content) async for chunk in llm.astream(messages)]
+
+    parts = asyncio.run(_collect())
+    assert len(parts) > 1
+    assert "".join(parts) == "Based on the provided context: [KB-0001] [RB-0001]"
+
+
+def test_meter_records_calls_tokens_and_latency() -> None:
+    meter = ProviderMeter()
+    embeddings = MeteredEmbeddings(HashingEmbeddings(dimensions=32), provider="local", meter=meter)
+    embeddings.embed_documents(["a" * 40, "b" * 80])
+    llm = MeteredChatModel(LocalChatModel(), provider="local-chat", meter=meter)
+
+    async def _stream() -> None:
+        async for _ in llm.astream([HumanMessage(content="[KB-0004] plans")]):
+            pass
+
+    asyncio.run(_stream())
+    snapshot = meter.snapshot()
+    assert snapshot["local:embed_documents"]["calls"] == 1
+    assert snapshot["local:embed_documents"]["input_tokens"] == 30
+    assert snapshot["local-chat:stream"]["output_tokens"] > 0
+    assert snapshot["local-chat:stream"]["total_latency_ms"] >= 0
+
+
+def test_factory_selects_local_providers() -> None:
+    settings = AppSettings(model_provider="local", local_embedding_dim=64)
+    embeddings = create_embeddings(settings)
+    assert len(embeddings.embed_query("rate limits")) == 64
+    assert isinstance(create_chat_model(settings).inner, LocalChatModel)
+
+
+def test_openai_clients_share_one_pooled_http_client() -> None:
+    settings = AppSettings(openai_api_key="test", http_max_connections=7, http_read_timeout_seconds=12)
+
+    async def _build() -> tuple:
+        embeddings = create_embeddings(settings).inner
+        llm = create_chat_model(settings).inner
+        shared = get_http_client()
+        await close_http_client()
+        return embeddings, llm, shared
+
+    embeddings, llm, shared = asyncio.run(_build())
+    assert embeddings.async_client._client._client is shared
+    assert llm.async_client._client._client is shared
+    assert shared._transport._pool._max_connections == 7
+    assert llm.root_async_client.timeout.read == 12
+    assert shared.is_closed and get_http_client(settings) is not shared
+    asyncio.run(close_http_client())
+
+
+def test_async_embeddings_use_native_clients_without_a_thread_hop() -> None:
+    threads: list[int] = []
+    expected = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+    async def create(input, **params):
+        threads.append(threading.get_ident())
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=index, embedding=base64.b64encode(expected[index].astype("<f4").tobytes()))
+                for index in range(len(input))
+            ]
+        )
+
+    embeddings = OpenAIEmbeddings(api_key="test", model="text-embedding-3-small", dimensions=2)
+    embeddings.async_client = SimpleNamespace(create=create)
+    meter = ProviderMeter()
+    metered = MeteredEmbeddings(embeddings, provider="openai", meter=meter)
+    matrix = asyncio.run(metered.aembed_documents_array(["a", "b", "c"]))
+    assert np.array_equal(matrix, expected)
+    assert threads == [threading.main_thread().ident]
+    assert meter.snapshot()["openai:embed_documents"]["calls"] == 1
@@ -0,0 +1,69 @@
+"""Embedding-model migration: model naming, active-model resolution and query routing."""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.settings import AppSettings
+from app.db.models import DocumentChunk
+from app.ingestion.reembed import MigrationProgress, model_index_ddl, model_index_name
+from app.providers.factory import ProviderConfigurationError, create_embeddings, embedding_model_name
+from app.retrieval import active_model
+from app.retrieval.active_model import ActiveEmbeddingModel, ActiveModelResolver
+from app.retrieval.vector import _in_collection, join_vectors, vector_column, vector_distance
+
+
+def test_local_models_are_named_by_dimension() -> None:
+    settings = AppSettings(model_provider="local", local_embedding_dim=32)
+    assert embedding_model_name(settings) == "hashing-32"
+    assert len(create_embeddings(settings, model="hashing-8").embed_query("reset api key")) == 8
+    with pytest.raises(ProviderConfigurationError):
+        create_embeddings(settings, model="text-embedding-3-small")
+
+
+def test_resolver_falls_back_to_column_model_without_a_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    def unavailable():
+        raise RuntimeError("DATABASE_URL is not configured")
+
+    monkeypatch.setattr(active_model, "get_read_session", unavailable)
+    resolver = ActiveModelResolver(AppSettings(model_provider="local", local_embedding_dim=16))
+    assert asyncio.run(resolver.get()) == ActiveEmbeddingModel("hashing-16", "column")
+
+
+def test_queries_read_the_side_table_only_for_migrated_models() -> None:
+    def compiled(model: ActiveEmbeddingModel) -> str:
+        vector = vector_column(model)
+        stmt = join_vectors(select(DocumentChunk.id, vector.cosine_distance([0.1, 0.2])), model)
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    column_sql = compiled(ActiveEmbeddingModel("text-embedding-3-large", "column"))
+    assert "chunk_embeddings" not in column_sql
+    assert "document_chunks.embedding <=>" in column_sql
+
+    table_sql = compiled(ActiveEmbeddingModel("text-embedding-3-small", "table"))
+    assert "JOIN chunk_embeddings ON chunk_embeddings.chunk_id = document_chunks.id" in table_sql
+    assert "chunk_embeddings.embedding <=>" in table_sql
+
+
+def test_progress_coverage() -> None:
+    assert MigrationProgress("m", "migrating", embedded=30, total=120).coverage == 0.25
+    assert MigrationProgress("m", "migrating", embedded=0, total=0).coverage == 1.0
+
+
+def test_migrated_model_queries_match_its_partial_hnsw_index() -> None:
+    model = ActiveEmbeddingModel("text-embedding-3-small", "table")
+    stmt = _in_collection(
+        join_vectors(select(DocumentChunk.id, vector_distance(model, [0.1] * 1536).label("distance")), model),
+        "billing",
+        model,
+    ).order_by("distance")
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+    assert "CAST(chunk_embeddings.embedding AS HALFVEC(1536)) <=>" in sql
+    assert "chunk_embeddings.model = 'text-embedding-3-small'" in sql
+    assert "chunk_embeddings.collection = " in sql and "document_chunks.collection = " in sql
+
+    ddl = model_index_ddl("text-embedding-3-small", 1536)
+    assert ddl.startswith(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {model_index_name('text-embedding-3-small')} ")
+    assert "USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops) WHERE model = 'text-embedding-3-small'" in ddl
+    assert len(model_index_name("x" * 100)) <= 63
@@ -0,0 +1,54 @@
+"""Read-replica routing: staleness guard, round-robin and health-check fallback."""
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.session import ReplicaRouter
+
+
+def _engine(name: str):
+    return create_async_engine(f"postgresql+asyncpg://user@{name}/quantleaves")
+
+
+def _router(versions: dict[str, int | Exception], primary_version: int) -> ReplicaRouter:
+    router = ReplicaRouter(_engine("primary"), {name: _engine(name) for name in versions}, check_interval=60)
+    engines = {replica.engine: versions[replica.name] for replica in router.replicas}
+
+    async def latest_version(engine) -> int:
+        if engine is router.primary:
+            return primary_version
+        outcome = engines[engine]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    router._latest_version = latest_version
+    return router
+
+
+def test_reads_stay_on_primary_until_replicas_catch_up() -> None:
+    router = _router({"replica-0": 3, "replica-1": 4}, primary_version=4)
+
+    async def _first_read() -> None:
+        assert router.choose() is None  # nothing known yet; schedules a background check
+        await router._check_task
+
+    asyncio.run(_first_read())
+    assert [replica.name for replica in router.eligible()] == ["replica-1"]
+
+    router.note_write_version(5)  # this process just finished an ingestion run
+    assert router.eligible() == []
+
+    for replica in router.replicas:
+        replica.version = 5
+    picks = [router.choose().name for _ in range(4)]
+    assert picks == ["replica-0", "replica-1", "replica-0", "replica-1"]
+
+
+def test_unreachable_replica_is_skipped() -> None:
+    router = _router({"replica-0": OSError("connection refused"), "replica-1": 2}, primary_version=2)
+    asyncio.run(router.refresh())
+    assert [replica.name for replica in router.eligible()] == ["replica-1"]
+
+    router.mark_unhealthy(router.replicas[1])
+    assert router.choose() is None
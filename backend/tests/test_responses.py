@@ -0,0 +1,110 @@
+"""Chat payload shaping, orjson rendering and response compression."""
+import gzip
+import json
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.middleware import CompressionMiddleware
+from app.api.responses import OrjsonResponse, _cap, shape_chat_response
+from app.models.schemas import ChatResponse, Citation
+
+RESPONSE = ChatResponse(
+    answer="Use the export button.",
+    citations=[
+        Citation(
+            doc_id="KB-0007",
+            snippet="Exports are limited to 10k rows.",
+            metadata={"doc_type": "kb", "audience": "customer", "chunk_index": 3, "page_start": None},
+        )
+    ],
+    structured_results=[
+        {
+            "source": "policies",
+            "identifier": "refunds",
+            "content": "Policy refunds v2",
+            "effective_date": "2024-01-01",
+            "payload": {"clauses": ["x" * 100] * 50},
+        }
+    ],
+    session_id="abc",
+)
+
+
+def test_verbosity_levels_and_field_selection() -> None:
+    minimal = shape_chat_response(RESPONSE, verbosity="minimal")
+    assert minimal["citations"] == [{"doc_id": "KB-0007", "snippet": "Exports are limited to 10k rows."}]
+    assert minimal["structured_results"] == [
+        {"source": "policies", "identifier": "refunds", "content": "Policy refunds v2"}
+    ]
+
+    standard = shape_chat_response(RESPONSE)
+    assert standard["citations"][0]["metadata"] == {"doc_type": "kb", "chunk_index": 3}
+    assert "payload" not in standard["structured_results"][0]
+    assert standard["structured_results"][0]["effective_date"] == "2024-01-01"
+
+    full = shape_chat_response(RESPONSE, verbosity="full", max_value_bytes=512)
+    assert full["citations"][0]["metadata"]["audience"] == "customer"
+    assert full["structured_results"][0]["payload"]["truncated"] is True
+
+    assert shape_chat_response(RESPONSE, fields=["answer"]) == {"answer": "Use the export button."}
+
+
+def test_string_values_are_capped_on_utf8_bytes() -> None:
+    capped = _cap({"title": "Übersicht " * 40, "short": "Ü"}, max_value_bytes=11)
+    assert capped["title"] == "Übersicht …"
+    assert capped["short"] == "Ü"
+    # A 9-byte cut would split the fifth two-byte "é", so it stops after the fourth.
+    assert len(_cap({"title": "é" * 100}, max_value_bytes=9)["title"].removesuffix("…").encode("utf-8")) == 8
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=256)
+
+    @app.get("/big")
+    async def big() -> OrjsonResponse:
+        return OrjsonResponse({"rows": [{"id": index, "label": "row"} for index in range(200)]})
+
+    @app.get("/small")
+    async def small() -> PlainTextResponse:
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for index in range(3):
+                yield json.dumps({"index": index}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+def test_compression_negotiation() -> None:
+    client = TestClient(_app())
+
+    with client.stream("GET", "/big", headers={"Accept-Encoding": "gzip, br"}) as response:
+        assert response.headers["content-encoding"] == "br"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        raw = b"".join(response.iter_raw())
+    assert int(response.headers["content-length"]) == len(raw)
+    assert len(json.loads(brotli.decompress(raw))["rows"]) == 200
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+    response = client.get("/big", headers={"Accept-Encoding": "br;q=0, identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_responses_compress_incrementally() -> None:
+    client = TestClient(_app())
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        body = b"".join(response.iter_raw())
+    lines = gzip.decompress(body).decode().splitlines()
+    assert [json.loads(line)["index"] for line in lines] == [0, 1, 2]
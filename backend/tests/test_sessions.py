@@ -0,0 +1,122 @@
+"""Conversation sessions: LRU bounds, idle TTL, byte caps, history compaction and opt-in creation."""
+import asyncio
+
+import pytest
+
+from app.core.settings import AppSettings
+from app.models.schemas import ChatRequest
+from app.retrieval.types import HybridContext, VectorHit
+from app.services.chat import ChatService
+from app.services.sessions import ConversationSession, SessionNotFound, SessionStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _hit(chunk_id: int, doc_id: str = "KB-0001") -> VectorHit:
+    return VectorHit(doc_id=doc_id, score=0.5, content="x" * 200, metadata={}, chunk_id=chunk_id)
+
+
+def test_lru_eviction_and_idle_ttl() -> None:
+    clock = FakeClock()
+    store = SessionStore(AppSettings(session_max_sessions=2, session_idle_ttl_seconds=60), clock=clock)
+
+    async def _run() -> None:
+        first = await store.create()
+        await store.save(first)
+        second = await store.create()
+        await store.save(second)
+        assert (await store.get(first.session_id)) is first  # refreshes recency
+        await store.save(await store.create())
+        assert len(store) == 2
+        with pytest.raises(SessionNotFound):
+            await store.get(second.session_id)  # evicted
+
+        clock.now = 120.0
+        with pytest.raises(SessionNotFound):
+            await store.get(first.session_id)  # idle past the TTL
+        assert len(store) == 0
+
+    asyncio.run(_run())
+
+
+def test_history_is_compacted_into_rolling_summary() -> None:
+    session = ConversationSession(session_id="s1")
+    for index in range(5):
+        session.record_turn(f"question {index}", f"answer {index}\nmore detail", [_hit(index)], max_turns=2)
+    assert [turn.question for turn in session.turns] == ["question 3", "question 4"]
+    assert session.summary.splitlines() == [
+        "- Q: question 0 A: answer 0",
+        "- Q: question 1 A: answer 1",
+        "- Q: question 2 A: answer 2",
+    ]
+    history = session.compact_history()
+    assert history.startswith("Earlier in this conversation:")
+    assert "User: question 4" in history
+    assert session.chunk_ids == [0, 1, 2, 3, 4]
+    assert [hit.chunk_id for hit in session.context_hits] == [4]
+
+
+def test_per_session_byte_cap() -> None:
+    store = SessionStore(AppSettings(session_max_bytes=2_000, session_summary_chars=300))
+    session = ConversationSession(session_id="capped")
+    for index in range(6):
+        session.record_turn("q" * 100, "a" * 500, [_hit(index * 10 + n) for n in range(3)], max_turns=6)
+    asyncio.run(store.save(session))
+    assert session.size_bytes() <= 2_000
+    assert len(session.summary) <= 300
+    assert session.turns
+
+
+def test_session_round_trips_through_dict() -> None:
+    session = ConversationSession(session_id="s2")
+    session.record_turn("q", "a", [_hit(7, "RB-0001")], max_turns=3)
+    restored = ConversationSession.from_dict(session.to_dict())
+    assert restored.to_dict() == session.to_dict()
+
+
+class FixedRetriever:
+    def __init__(self, hits: list[VectorHit]) -> None:
+        self.hits = hits
+
+    async def search(self, query: str, **options) -> HybridContext:
+        return HybridContext(query=query, structured_hits=[], vector_hits=list(self.hits))
+
+
+def test_stateless_questions_do_not_create_sessions() -> None:
+    settings = AppSettings(model_provider="local", local_chat_latency_ms=0)
+    store = SessionStore(settings)
+    service = ChatService(settings, retriever=FixedRetriever([_hit(1)]), sessions=store)
+
+    response = asyncio.run(service.answer(ChatRequest(question="How do I rotate keys?")))
+    assert response.session_id is None and len(store) == 0
+
+    started = asyncio.run(service.answer(ChatRequest(question="How do I rotate keys?", new_session=True)))
+    assert started.session_id and len(store) == 1
+    followed = asyncio.run(service.answer(ChatRequest(question="And for SSO?", session_id=started.session_id)))
+    assert followed.session_id == started.session_id and len(store) == 1
+
+
+def test_only_server_minted_sessions_can_be_continued() -> None:
+    settings = AppSettings(model_provider="local", local_chat_latency_ms=0)
+    store = SessionStore(settings)
+    service = ChatService(settings, retriever=FixedRetriever([_hit(1)]), sessions=store)
+
+    with pytest.raises(SessionNotFound):
+        asyncio.run(service.answer(ChatRequest(question="And for SSO?", session_id="client-chosen")))
+    started = asyncio.run(service.answer(ChatRequest(question="Hi", session_id=None, new_session=True)))
+    assert len(started.session_id) == 32 and started.session_id != "client-chosen"
+    assert len(store) == 1
+
+
+def test_cached_context_never_outranks_fresh_hits() -> None:
+    service = ChatService(AppSettings(session_context_chunks=3), retriever=FixedRetriever([]))
+    cached = [VectorHit(doc_id="OLD", score=9.0, content="", metadata={}, chunk_id=1), _hit(2)]
+    fresh = [VectorHit(doc_id="NEW", score=0.2, content="", metadata={}, chunk_id=3), _hit(2)]
+    merged = service._merge_cached_hits(fresh, cached)
+    assert [hit.chunk_id for hit in merged] == [3, 2, 1]
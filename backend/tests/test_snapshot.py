@@ -0,0 +1,112 @@
+"""Index snapshots: file format round trip, checksums, and serving from the in-process store."""
+import asyncio
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.settings import AppSettings
+from app.db.models import Policy
+from app.ingestion import snapshot as snapshot_module
+from app.ingestion.snapshot import _restore, _row, export_snapshot
+from app.providers.local import HashingEmbeddings
+from app.retrieval.active_model import TABLE_STORAGE, ActiveEmbeddingModel
+from app.retrieval.stores.snapshot import HEADER_SIZE, Snapshot, SnapshotError, SnapshotVectorStore, SnapshotWriter
+from app.retrieval.vector import VectorRetriever
+
+EMBEDDINGS = HashingEmbeddings(dimensions=64)
+CHUNKS = [
+    [0, 0, "Reset an SSO password from the admin console", {"section_path": ["SSO"]}],
+    [0, 1, "Rotate API keys every ninety days", {"section_path": ["Keys"]}],
+    [1, 0, "Refunds are issued within fourteen days", {"page_start": 2, "page_end": 2}],
+]
+RECORDS = {
+    "tables": {"policies": [{"name": "Refunds", "version": "2", "effective_date": "2024-05-01", "payload": {}}]},
+    "documents": [
+        {"doc_id": "KB-0001", "title": "Access", "doc_type": "kb", "effective_date": None},
+        {"doc_id": "POL-0001", "title": "Refunds", "doc_type": "policy", "effective_date": "2024-05-01"},
+    ],
+    "chunks": CHUNKS,
+}
+
+
+def _write(path: Path) -> np.ndarray:
+    vectors = EMBEDDINGS.embed_documents_array([chunk[2] for chunk in CHUNKS])
+    with SnapshotWriter(path) as writer:
+        writer.add(vectors[:2])
+        writer.add(vectors[2])
+        writer.finish(RECORDS, "hashing-64")
+    return vectors
+
+
+def test_snapshot_round_trips_records_and_memory_maps_vectors(tmp_path: Path) -> None:
+    path = tmp_path / "index.qlsnap"
+    vectors = _write(path)
+    snapshot = Snapshot.open(path)
+    manifest = snapshot.manifest
+    assert (manifest.embedding_model, manifest.chunks, manifest.documents) == ("hashing-64", 3, 2)
+    assert manifest.dimensions == 64
+    assert manifest.vectors.offset == HEADER_SIZE and manifest.vectors.length == vectors.nbytes
+    mapped = snapshot.vectors()
+    assert isinstance(mapped, np.memmap) and np.array_equal(mapped, vectors)
+    assert snapshot.records() == RECORDS
+    assert not path.with_name("index.qlsnap.partial").exists()
+
+
+def test_corrupt_or_foreign_files_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "index.qlsnap"
+    _write(path)
+    data = bytearray(path.read_bytes())
+    data[HEADER_SIZE + 10] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="vectors checksum"):
+        Snapshot.open(path)
+    assert Snapshot.open(path, verify=False).manifest.chunks == 3
+
+    (tmp_path / "other.bin").write_bytes(b"not a snapshot" * 8)
+    with pytest.raises(SnapshotError, match="not an index snapshot"):
+        Snapshot.open(tmp_path / "other.bin")
+
+    with pytest.raises(SnapshotError):
+        with SnapshotWriter(tmp_path / "short.qlsnap") as writer:
+            writer.add(np.zeros((1, 4), dtype=np.float32))
+            writer.finish(RECORDS, "hashing-4")
+    assert not list(tmp_path.glob("short.qlsnap*"))
+
+
+def test_store_serves_vector_search_without_postgres(tmp_path: Path) -> None:
+    path = tmp_path / "index.qlsnap"
+    _write(path)
+    store = SnapshotVectorStore.from_path(path)
+    retriever = VectorRetriever(AppSettings(mmr_oversample=1), embeddings=EMBEDDINGS, store=store)
+
+    hits = asyncio.run(retriever.search("How do I reset my SSO password?", k=2))
+    assert hits[0].doc_id == "KB-0001" and hits[0].chunk_id == 1
+    assert hits[0].metadata["section_path"] == ["SSO"]
+    assert hits[0].score > hits[1].score
+
+    hits = asyncio.run(retriever.search("refund days", k=1, exclude_chunk_ids=[3]))
+    assert hits[0].chunk_id != 3
+    policy_hit = store.nearest(EMBEDDINGS.embed_query("refunds fourteen days"), 1)[0]
+    assert policy_hit[1].effective_date == date(2024, 5, 1) and policy_hit[2] < 0.5
+
+
+def test_structured_rows_restore_their_column_types() -> None:
+    policy = _restore(Policy, RECORDS["tables"]["policies"][0])
+    assert policy.effective_date == date(2024, 5, 1)
+    assert _row(policy) == {**RECORDS["tables"]["policies"][0], "effective_date": date(2024, 5, 1)}
+
+
+def test_export_rejects_table_storage_models(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    class Resolver:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        async def get(self) -> ActiveEmbeddingModel:
+            return ActiveEmbeddingModel("wide-model", TABLE_STORAGE)
+
+    monkeypatch.setattr(snapshot_module, "ActiveModelResolver", Resolver)
+    with pytest.raises(SnapshotError, match="table storage"):
+        asyncio.run(export_snapshot(tmp_path / "index.snap", AppSettings()))
+    assert not (tmp_path / "index.snap").exists()
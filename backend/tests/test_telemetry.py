@@ -0,0 +1,37 @@
+"""Stage timing, Server-Timing headers and the /metrics endpoint."""
+from fastapi.testclient import TestClient
+
+from app.core.telemetry import begin_request, current_timings, end_request, track
+from app.main import app
+
+
+def test_track_accumulates_into_active_request() -> None:
+    timings, token = begin_request()
+    try:
+        with track("structured_plans"):
+            pass
+        with track("structured_plans"):
+            pass
+        with track("embed_query"):
+            pass
+    finally:
+        end_request(token)
+    assert list(timings.stages) == ["structured_plans", "embed_query"]
+    assert current_timings() is None
+    header = timings.server_timing()
+    assert header.startswith("structured_plans;dur=")
+    assert "total;dur=" in header
+
+
+def test_server_timing_header_and_metrics_endpoint() -> None:
+    client = TestClient(app)
+    response = client.get("/health")
+    assert "total;dur=" in response.headers["server-timing"]
+
+    with track("vector_sql"):
+        pass
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert 'quantleaves_stage_duration_seconds_count{stage="vector_sql"}' in metrics.text
+    assert 'quantleaves_http_requests_total{method="GET",route="/health",status="200"}' in metrics.text
+    assert "server-timing" not in metrics.headers
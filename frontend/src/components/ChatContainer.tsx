@@ -12,6 +12,7 @@ export default function ChatContainer() {
   const [messages, setMessages] = useState<ChatMessageType[]>([]);
   const [isTyping, setIsTyping] = useState(false);
   const [error, setError] = useState<ChatError | null>(null);
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const chatEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -51,14 +52,21 @@ export default function ChatContainer() {
       const response = await fetch(`${backendUrl}/chat`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ question: content }),
+        body: JSON.stringify({ question: content, session_id: sessionId, new_session: !sessionId }),
       });
 
       if (!response.ok) {
+        if (response.status === 404 && sessionId) {
+          // The session expired server-side; the next message starts a new one.
+          setSessionId(null);
+        }
         throw new Error(`Backend returned ${response.status}: ${response.statusText}`);
       }
 
       const data: ChatResponse = await response.json();
+      if (data.session_id) {
+        setSessionId(data.session_id);
+      }
 
       const assistantMessage: ChatMessageType = {
         id: generateMessageId(),
@@ -8,6 +8,7 @@ export interface ChatResponse {
   answer: string;
   citations: Citation[];
   structured_results: Record<string, unknown>[];
+  session_id?: string | null;
 }
 
 export interface ChatMessage {